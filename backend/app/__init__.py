@@ -25,10 +25,12 @@ def create_app(config_class=Config):
         code_file,
         diagram,
         export_job,
+        lsh_bucket,
         plagiarism_report,
         project,
         screenshot,
         section,
+        section_fingerprint,
         template,
         user,
         version,
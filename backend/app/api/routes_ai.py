@@ -1,17 +1,104 @@
 import hashlib
-from datetime import datetime
+from datetime import datetime, timedelta
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request
 
 from ..extensions import db
 from ..models.ai_job import AIJob
 from ..models.project import Project
-from ..models.section import ProjectSection
 from ..services.ai.provider_router import get_ai_provider
+from ..services.ai.single_flight import improve_flights
+from ..workers.queue import get_queue
+from ..workers.tasks_ai import apply_improvement, run_section_improvement
 
 bp = Blueprint("ai", __name__, url_prefix="/api/projects")
 
 
+def _reusable_job(checksum: str, model: str):
+    max_age = current_app.config.get("AI_JOB_REUSE_MAX_AGE", 0)
+    if max_age <= 0:
+        return None
+    return (
+        AIJob.query.filter_by(input_hash=checksum, model=model, provider="gemini", status="completed")
+        .filter(AIJob.completed_at >= datetime.utcnow() - timedelta(seconds=max_age))
+        .order_by(AIJob.completed_at.desc())
+        .first()
+    )
+
+
+def _job_payload(job: AIJob) -> dict:
+    return {
+        "job_id": job.id,
+        "project_id": job.project_id,
+        "section_key": job.section_key,
+        "status": job.status,
+        "result": job.output_jsonb if job.status == "completed" else None,
+        "error": job.error,
+        "status_url": f"/api/projects/{job.project_id}/ai/jobs/{job.id}",
+    }
+
+
+def _enqueue_improvement(project: Project, section_key: str, content: str, target_words: int, checksum: str, provider):
+    """
+    Async improve: reuse a completed or in-flight job with the same hash,
+    otherwise queue a new AIJob on the AI queue. Returns (body, status).
+    """
+    done = _reusable_job(checksum, provider.model_name)
+    if done is not None and done.output_jsonb:
+        if done.project_id != project.id:
+            # Reuse the output, not the row: the caller polls jobs under its own project.
+            done = AIJob(
+                project_id=project.id,
+                section_key=section_key,
+                provider=done.provider,
+                model=done.model,
+                status="completed",
+                input_hash=checksum,
+                output_jsonb=done.output_jsonb,
+                completed_at=datetime.utcnow(),
+            )
+            db.session.add(done)
+        apply_improvement(project.id, section_key, done.output_jsonb, content)
+        db.session.commit()
+        return _job_payload(done), 200
+    pending = (
+        AIJob.query.filter_by(project_id=project.id, input_hash=checksum, model=provider.model_name)
+        .filter(AIJob.status.in_(("queued", "running")))
+        .order_by(AIJob.created_at.desc())
+        .first()
+    )
+    if pending is not None:
+        return _job_payload(pending), 202
+
+    config = current_app.config
+    try:
+        queue = get_queue(config["AI_QUEUE_NAME"])
+        if len(queue) >= config["AI_QUEUE_MAX_DEPTH"]:
+            return {"error": "AI queue is full, try again shortly"}, 503
+    except Exception as exc:
+        return {"error": f"AI queue unavailable: {exc}"}, 503
+
+    job = AIJob(
+        project_id=project.id,
+        section_key=section_key,
+        provider="gemini" if provider.enabled else "fallback",
+        model=provider.model_name,
+        status="queued",
+        input_hash=checksum,
+        output_jsonb={},
+    )
+    db.session.add(job)
+    db.session.commit()
+    try:
+        queue.enqueue(run_section_improvement, job.id, section_key, content, target_words, job_timeout=config["AI_JOB_TIMEOUT"])
+    except Exception as exc:
+        job.status = "failed"
+        job.error = f"Queue unavailable: {exc}"
+        db.session.commit()
+        return {"error": "AI queue unavailable", **_job_payload(job)}, 503
+    return _job_payload(job), 202
+
+
 @bp.post("/<int:project_id>/sections/<section_key>/improve")
 def improve_section(project_id: int, section_key: str):
     project = Project.query.get_or_404(project_id)
@@ -20,29 +107,44 @@ def improve_section(project_id: int, section_key: str):
     target_words = int(payload.get("target_words", 220))
 
     provider = get_ai_provider()
-    result = provider.improve_section(section_key, content, target_words)
+    provider_name = "gemini" if provider.enabled else "fallback"
+    checksum = hashlib.sha256(f"{section_key}:{target_words}:{content}".encode("utf-8")).hexdigest()
 
-    checksum = hashlib.sha256(f"{section_key}:{content}".encode("utf-8")).hexdigest()
-    job = AIJob(
-        project_id=project.id,
-        section_key=section_key,
-        provider="gemini",
-        model="gemini-2.5-flash-lite",
-        status="completed",
-        input_hash=checksum,
-        output_jsonb=result,
-        completed_at=datetime.utcnow(),
-    )
-    db.session.add(job)
+    if payload.get("mode") == "async":
+        body, status = _enqueue_improvement(project, section_key, content, target_words, checksum, provider)
+        return jsonify(body), status
 
-    section = ProjectSection.query.filter_by(project_id=project.id, section_key=section_key).first()
-    if not section:
-        section = ProjectSection(project_id=project.id, section_key=section_key)
-        db.session.add(section)
+    def run():
+        previous = _reusable_job(checksum, provider.model_name)
+        if previous is not None and previous.output_jsonb:
+            return previous.output_jsonb
 
-    section.plain_text = result.get("improved_text", content)
-    section.content_jsonb = {"text": result.get("improved_text", content)}
-    section.ai_last_enhanced_at = datetime.utcnow()
+        output = provider.improve_section(section_key, content, target_words)
+        db.session.add(
+            AIJob(
+                project_id=project.id,
+                section_key=section_key,
+                provider=provider_name,
+                model=provider.model_name,
+                status="completed",
+                input_hash=checksum,
+                output_jsonb=output,
+                completed_at=datetime.utcnow(),
+            )
+        )
+        # Committed before the flight ends so later identical requests find it.
+        db.session.commit()
+        return output
 
+    # Identical requests in flight at the same time share one provider call.
+    result, _ = improve_flights.do((checksum, provider.model_name), run)
+
+    apply_improvement(project.id, section_key, result, content)
     db.session.commit()
     return jsonify(result)
+
+
+@bp.get("/<int:project_id>/ai/jobs/<int:job_id>")
+def get_ai_job(project_id: int, job_id: int):
+    job = AIJob.query.filter_by(id=job_id, project_id=project_id).first_or_404()
+    return jsonify(_job_payload(job))
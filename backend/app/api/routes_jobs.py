@@ -13,8 +13,11 @@ def get_job(job_id: int):
             "id": job.id,
             "project_id": job.project_id,
             "status": job.status,
+            "progress": job.progress,
             "export_type": job.export_type,
             "output_url": job.output_url,
+            "download_url": job.output_url if (job.output_url or "").startswith("/api/download/") else None,
             "error": job.error,
+            "report": job.report_jsonb,
         }
     )
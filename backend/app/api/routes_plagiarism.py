@@ -1,27 +1,67 @@
-from flask import Blueprint, jsonify, request
+from datetime import datetime, timedelta
+
+from flask import Blueprint, current_app, jsonify, request
 
 from ..extensions import db
 from ..models.plagiarism_report import PlagiarismReport
 from ..models.project import Project
-from ..services.plagiarism.similarity_engine import compute_similarity_report
+from ..services.plagiarism.similarity_engine import document_hash
+from ..workers.queue import get_queue
+from ..workers.tasks_plagiarism import run_plagiarism
 
 bp = Blueprint("plagiarism", __name__, url_prefix="/api/projects")
 
 
+def _report_payload(report: PlagiarismReport) -> dict:
+    return {
+        "report_id": report.id,
+        "status": report.status,
+        "result": report.result_jsonb if report.status == "completed" else None,
+        "error": report.error,
+        "status_url": f"/api/projects/{report.project_id}/plagiarism/reports/{report.id}",
+    }
+
+
 @bp.post("/<int:project_id>/plagiarism/check")
 def check_plagiarism(project_id: int):
     project = Project.query.get_or_404(project_id)
     payload = request.get_json() or {}
     document = payload.get("document") or project.document_json or {}
+    checksum = document_hash(document)
 
-    result = compute_similarity_report(document)
-    report = PlagiarismReport(
-        project_id=project.id,
-        overall_score=result["overall_similarity"],
-        flagged_jsonb=result.get("flagged_sections", []),
-        suggestions_jsonb=result.get("rewrite_suggestions", []),
+    latest = (
+        PlagiarismReport.query.filter_by(project_id=project.id, document_hash=checksum)
+        .filter(PlagiarismReport.status.in_(("queued", "running", "completed")))
+        .order_by(PlagiarismReport.created_at.desc(), PlagiarismReport.id.desc())
+        .first()
     )
+    if latest is not None and latest.status == "completed":
+        # Unchanged document: same report shape as a fresh check, no new row.
+        return jsonify({**latest.result_jsonb, "report_id": latest.id, "status": latest.status, "cached": True})
+    if latest is not None:
+        timeout = timedelta(seconds=current_app.config["PLAGIARISM_JOB_TIMEOUT"])
+        if datetime.utcnow() - latest.created_at < timeout:
+            return jsonify(_report_payload(latest)), 202
+        # The job was lost or killed without updating the report; retire it and queue a new one.
+        latest.status = "failed"
+        latest.error = "timed out"
+        latest.completed_at = datetime.utcnow()
+
+    report = PlagiarismReport(project_id=project.id, document_hash=checksum, status="queued")
     db.session.add(report)
     db.session.commit()
+    try:
+        get_queue(current_app.config["PLAGIARISM_QUEUE"]).enqueue(
+            run_plagiarism, report.id, document, job_timeout=current_app.config["PLAGIARISM_JOB_TIMEOUT"]
+        )
+    except Exception:
+        # Without Redis the check runs inline, as it did before it was queued.
+        result = run_plagiarism(report.id, document)
+        return jsonify({**result, "report_id": report.id, "status": "completed", "cached": False})
+    return jsonify(_report_payload(report)), 202
+
 
-    return jsonify(result)
+@bp.get("/<int:project_id>/plagiarism/reports/<int:report_id>")
+def get_plagiarism_report(project_id: int, report_id: int):
+    report = PlagiarismReport.query.filter_by(id=report_id, project_id=project_id).first_or_404()
+    return jsonify(_report_payload(report))
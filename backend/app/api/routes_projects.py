@@ -1,4 +1,6 @@
-from flask import Blueprint, jsonify, request
+from datetime import datetime, timedelta
+
+from flask import Blueprint, current_app, jsonify, request
 from marshmallow import ValidationError
 
 from ..extensions import db
@@ -6,6 +8,8 @@ from ..models.project import Project
 from ..models.template import Template
 from ..models.user import User
 from ..schemas.project_schema import ProjectCreateSchema, ProjectPatchSchema
+from ..workers.queue import get_queue
+from ..workers.tasks_plagiarism import run_fingerprint_update
 
 bp = Blueprint("projects", __name__, url_prefix="/api/projects")
 create_schema = ProjectCreateSchema()
@@ -22,6 +26,31 @@ def _get_or_create_default_user():
     return user
 
 
+def _schedule_fingerprint_update(project: Project):
+    """
+    Queue a plagiarism fingerprint refresh after the document changed. Only
+    the first save since the last refresh enqueues; later ones are picked
+    up by that job, unless it has been pending longer than
+    PLAGIARISM_INDEX_TIMEOUT (lost or failed), in which case it is queued again.
+    """
+    requested_at = project.fingerprint_requested_at
+    timeout = timedelta(seconds=current_app.config["PLAGIARISM_INDEX_TIMEOUT"])
+    if requested_at is not None and datetime.utcnow() - requested_at < timeout:
+        return
+    project.fingerprint_requested_at = datetime.utcnow()
+    db.session.commit()
+    try:
+        get_queue(current_app.config["PLAGIARISM_INDEX_QUEUE"]).enqueue(run_fingerprint_update, project.id)
+    except Exception:
+        # Without Redis the index is updated inline rather than left stale.
+        try:
+            run_fingerprint_update(project.id)
+        except Exception:
+            # The document is already saved; the marker stays set, so a save after
+            # PLAGIARISM_INDEX_TIMEOUT retries.
+            current_app.logger.exception("Fingerprint update failed for project %s", project.id)
+
+
 def _serialize_project(project: Project):
     return {
         "id": project.id,
@@ -82,10 +111,13 @@ def patch_project(project_id: int):
         project.guide_name = data["guide_name"]
     if "status" in data:
         project.status = data["status"]
+    document_changed = "document" in data and data["document"] != project.document_json
     if "document" in data:
         project.document_json = data["document"]
 
     db.session.commit()
+    if document_changed:
+        _schedule_fingerprint_update(project)
     return jsonify(_serialize_project(project))
 
 
@@ -94,6 +126,9 @@ def autosave(project_id: int):
     project = Project.query.get_or_404(project_id)
     payload = request.get_json() or {}
     document = payload.get("document", {})
+    document_changed = document != project.document_json
     project.document_json = document
     db.session.commit()
+    if document_changed:
+        _schedule_fingerprint_update(project)
     return jsonify({"status": "saved", "project_id": project.id})
@@ -14,3 +14,23 @@ class Config:
     MAX_CONTENT_LENGTH = 30 * 1024 * 1024
     GEMINI_API_KEY = os.getenv("GOOGLE_API_KEY", "")
     GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash-lite")
+    # Completed AI jobs with the same input hash and model are reused for this long; 0 disables reuse.
+    AI_JOB_REUSE_MAX_AGE = int(os.getenv("AI_JOB_REUSE_MAX_AGE", str(7 * 24 * 3600)))
+    # Async section improvement runs on its own RQ queue so slow model calls never hold web workers.
+    AI_QUEUE_NAME = os.getenv("AI_QUEUE_NAME", "ai")
+    AI_QUEUE_MAX_DEPTH = int(os.getenv("AI_QUEUE_MAX_DEPTH", "200"))
+    AI_JOB_TIMEOUT = int(os.getenv("AI_JOB_TIMEOUT", "180"))
+    # Minimum estimated Jaccard for two sections to count as a plagiarism match.
+    PLAGIARISM_MATCH_THRESHOLD = float(os.getenv("PLAGIARISM_MATCH_THRESHOLD", "0.3"))
+    PLAGIARISM_MAX_MATCHES = int(os.getenv("PLAGIARISM_MAX_MATCHES", "5"))
+    # RQ queue for fingerprint refreshes after autosave; served by the default worker.
+    PLAGIARISM_INDEX_QUEUE = os.getenv("PLAGIARISM_INDEX_QUEUE", "default")
+    # A refresh still pending after this many seconds is assumed lost and queued again.
+    PLAGIARISM_INDEX_TIMEOUT = int(os.getenv("PLAGIARISM_INDEX_TIMEOUT", "600"))
+    # Sampled 8-gram index of a local reference corpus (`flask build_phrase_index`).
+    PHRASE_INDEX_PATH = os.getenv("PHRASE_INDEX_PATH", os.path.join(os.path.dirname(__file__), "..", "cache", "phrase_index.npy"))
+    PHRASE_INDEX_SAMPLE = int(os.getenv("PHRASE_INDEX_SAMPLE", "4"))
+    PHRASE_CHECK_MAX_PHRASES = int(os.getenv("PHRASE_CHECK_MAX_PHRASES", "5000"))
+    # Plagiarism checks of changed documents run on this RQ queue.
+    PLAGIARISM_QUEUE = os.getenv("PLAGIARISM_QUEUE", "default")
+    PLAGIARISM_JOB_TIMEOUT = int(os.getenv("PLAGIARISM_JOB_TIMEOUT", "300"))
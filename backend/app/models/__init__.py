@@ -2,10 +2,12 @@ from .ai_job import AIJob
 from .code_file import ProjectCodeFile
 from .diagram import ProjectDiagram
 from .export_job import ExportJob
+from .lsh_bucket import LSHBucket
 from .plagiarism_report import PlagiarismReport
 from .project import Project
 from .screenshot import ProjectScreenshot
 from .section import ProjectSection
+from .section_fingerprint import SectionFingerprint
 from .template import Template
 from .user import User
 from .version import ProjectVersion
@@ -22,4 +24,6 @@ __all__ = [
     "ExportJob",
     "PlagiarismReport",
     "AIJob",
+    "SectionFingerprint",
+    "LSHBucket",
 ]
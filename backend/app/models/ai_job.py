@@ -5,6 +5,8 @@ from ..extensions import db
 
 class AIJob(db.Model):
     __tablename__ = "ai_jobs"
+    # Identical improve requests are looked up by (input_hash, model).
+    __table_args__ = (db.Index("ix_ai_jobs_input_hash_model", "input_hash", "model"),)
 
     id = db.Column(db.Integer, primary_key=True)
     project_id = db.Column(db.Integer, db.ForeignKey("projects.id"), nullable=False, index=True)
@@ -14,5 +16,6 @@ class AIJob(db.Model):
     status = db.Column(db.String(20), nullable=False, default="completed")
     input_hash = db.Column(db.String(128), nullable=False)
     output_jsonb = db.Column(db.JSON, nullable=False, default=dict)
+    error = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     completed_at = db.Column(db.DateTime, nullable=True)
@@ -7,10 +7,14 @@ class ExportJob(db.Model):
     __tablename__ = "export_jobs"
 
     id = db.Column(db.Integer, primary_key=True)
-    project_id = db.Column(db.Integer, db.ForeignKey("projects.id"), nullable=False, index=True)
+    # Null for legacy /api/generate-document jobs, which are not tied to a project.
+    project_id = db.Column(db.Integer, db.ForeignKey("projects.id"), nullable=True, index=True)
     export_type = db.Column(db.String(20), nullable=False)
     status = db.Column(db.String(20), nullable=False, default="queued")
+    progress = db.Column(db.Integer, nullable=False, default=0)
     output_url = db.Column(db.String(500), nullable=True)
     error = db.Column(db.Text, nullable=True)
+    # Per-item status for batch exports.
+    report_jsonb = db.Column(db.JSON, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     completed_at = db.Column(db.DateTime, nullable=True)
@@ -0,0 +1,15 @@
+from ..extensions import db
+
+
+class LSHBucket(db.Model):
+    """
+    One LSH band of a SectionFingerprint; sections sharing a band_key are
+    candidate near-duplicates.
+    """
+
+    __tablename__ = "lsh_buckets"
+
+    id = db.Column(db.Integer, primary_key=True)
+    fingerprint_id = db.Column(db.Integer, db.ForeignKey("section_fingerprints.id"), nullable=False, index=True)
+    project_id = db.Column(db.Integer, db.ForeignKey("projects.id"), nullable=False)
+    band_key = db.Column(db.BigInteger, nullable=False, index=True)
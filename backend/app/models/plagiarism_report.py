@@ -8,7 +8,15 @@ class PlagiarismReport(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
     project_id = db.Column(db.Integer, db.ForeignKey("projects.id"), nullable=False, index=True)
-    overall_score = db.Column(db.Float, nullable=False)
+    # Hash of the checked sections; an unchanged document reuses its latest report.
+    document_hash = db.Column(db.String(64), nullable=True, index=True)
+    status = db.Column(db.String(20), nullable=False, default="completed")
+    # Null until a queued check has run.
+    overall_score = db.Column(db.Float, nullable=True)
     flagged_jsonb = db.Column(db.JSON, nullable=False, default=list)
     suggestions_jsonb = db.Column(db.JSON, nullable=False, default=list)
+    # Full compute_similarity_report output.
+    result_jsonb = db.Column(db.JSON, nullable=True)
+    error = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    completed_at = db.Column(db.DateTime, nullable=True)
@@ -14,6 +14,8 @@ class Project(db.Model):
     template_id = db.Column(db.Integer, db.ForeignKey("templates.id"), nullable=True)
     status = db.Column(db.String(50), nullable=False, default="draft")
     document_json = db.Column(db.JSON, nullable=False, default=dict)
+    # Set when document_json changed and its plagiarism fingerprints have not caught up yet.
+    fingerprint_requested_at = db.Column(db.DateTime, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
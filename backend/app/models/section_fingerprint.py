@@ -0,0 +1,23 @@
+from datetime import datetime
+
+from ..extensions import db
+
+
+class SectionFingerprint(db.Model):
+    """
+    MinHash signature of one section of a project's document_json, used by
+    the cross-project plagiarism index.
+    """
+
+    __tablename__ = "section_fingerprints"
+
+    id = db.Column(db.Integer, primary_key=True)
+    project_id = db.Column(db.Integer, db.ForeignKey("projects.id"), nullable=False, index=True)
+    section_id = db.Column(db.String(100), nullable=False)
+    # sha256 of the section text; unchanged sections are not re-fingerprinted.
+    content_hash = db.Column(db.String(64), nullable=False)
+    signature = db.Column(db.LargeBinary, nullable=False)
+    shingle_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    __table_args__ = (db.UniqueConstraint("project_id", "section_id", name="uq_section_fingerprint"),)
@@ -0,0 +1,216 @@
+import hashlib
+from collections import defaultdict
+from datetime import datetime
+
+import numpy as np
+from flask import current_app
+from sqlalchemy import func
+
+from ...extensions import db
+from ...models.lsh_bucket import LSHBucket
+from ...models.project import Project
+from ...models.section_fingerprint import SectionFingerprint
+from .minhash import (
+    BANDS,
+    ROWS,
+    SHINGLE_SIZE,
+    band_keys,
+    estimate_similarity,
+    from_bytes,
+    shingle_hashes,
+    signature,
+    to_bytes,
+    words,
+)
+
+MAX_SPANS_PER_MATCH = 10
+SPAN_PREVIEW_CHARS = 300
+
+
+def document_sections(document: dict) -> list[tuple[str, str]]:
+    """
+    (section_id, text) for each section of a document_json; sections
+    without an id are keyed by position.
+    """
+    sections = []
+    for position, section in enumerate((document or {}).get("sections", [])):
+        section_id = str(section.get("id") or f"section-{position}")
+        sections.append((section_id, str(section.get("content") or "")))
+    return sections
+
+
+def content_hash(text: str) -> str:
+    # The band layout is part of the hash so changing it re-buckets every
+    # section on the next index run.
+    return hashlib.sha256(f"{BANDS}x{ROWS}:{text}".encode("utf-8")).hexdigest()
+
+
+def _overlap_spans(tokens: list[str], hashes: np.ndarray, other_text: str) -> list[dict]:
+    """
+    Word ranges of the query section whose shingles also occur in other_text.
+    """
+    other = shingle_hashes(words(other_text))
+    hits = np.flatnonzero(np.isin(hashes, other))
+    if not len(hits):
+        return []
+    # Shingles closer than SHINGLE_SIZE positions overlap or touch.
+    breaks = np.flatnonzero(np.diff(hits) > SHINGLE_SIZE)
+    starts = hits[np.r_[0, breaks + 1]]
+    ends = hits[np.r_[breaks, len(hits) - 1]] + SHINGLE_SIZE
+    spans = [
+        {"start_word": int(start), "end_word": int(end), "text": " ".join(tokens[start:end])[:SPAN_PREVIEW_CHARS]}
+        for start, end in zip(starts, ends)
+    ]
+    spans.sort(key=lambda span: span["end_word"] - span["start_word"], reverse=True)
+    return spans[:MAX_SPANS_PER_MATCH]
+
+
+class CorpusIndex:
+    """
+    Cross-project plagiarism index: a MinHash signature per section in
+    section_fingerprints and its LSH bands in lsh_buckets, so a check only
+    compares against sections that share at least one band.
+    """
+
+    def __init__(self):
+        self.sections_rewritten = 0
+
+    def index_project(self, project: Project) -> int:
+        """
+        Re-fingerprint the sections of project.document_json whose content
+        changed and drop removed ones. Returns the number of sections
+        rewritten; the caller commits.
+        """
+        existing = {fp.section_id: fp for fp in SectionFingerprint.query.filter_by(project_id=project.id)}
+        seen = set()
+        changed = 0
+        for section_id, text in document_sections(project.document_json):
+            seen.add(section_id)
+            digest = content_hash(text)
+            fingerprint = existing.get(section_id)
+            if fingerprint is not None and fingerprint.content_hash == digest:
+                continue
+
+            hashes = shingle_hashes(words(text))
+            if fingerprint is None:
+                fingerprint = SectionFingerprint(project_id=project.id, section_id=section_id)
+                db.session.add(fingerprint)
+            else:
+                LSHBucket.query.filter_by(fingerprint_id=fingerprint.id).delete()
+            # Sections shorter than one shingle are recorded but never bucketed.
+            sig = signature(hashes) if len(hashes) else None
+            fingerprint.content_hash = digest
+            fingerprint.signature = to_bytes(sig) if sig is not None else b""
+            fingerprint.shingle_count = len(np.unique(hashes))
+            db.session.flush()
+            if sig is not None:
+                db.session.add_all(
+                    LSHBucket(fingerprint_id=fingerprint.id, project_id=project.id, band_key=key) for key in band_keys(sig)
+                )
+            changed += 1
+
+        for section_id, fingerprint in existing.items():
+            if section_id not in seen:
+                LSHBucket.query.filter_by(fingerprint_id=fingerprint.id).delete()
+                db.session.delete(fingerprint)
+                changed += 1
+        self.sections_rewritten += changed
+        return changed
+
+    def find_matches(self, document: dict, exclude_project_id: int = None) -> list[dict]:
+        """
+        Indexed projects whose sections resemble the document's, best first:
+        [{project_id, title, similarity, sections, spans}], where similarity
+        is the share (0-100) of the document's shingles in matching sections.
+        """
+        threshold = current_app.config["PLAGIARISM_MATCH_THRESHOLD"]
+        limit = current_app.config["PLAGIARISM_MAX_MATCHES"]
+
+        queries = []
+        for section_id, text in document_sections(document):
+            tokens = words(text)
+            hashes = shingle_hashes(tokens)
+            if len(hashes):
+                sig = signature(hashes)
+                queries.append({"id": section_id, "tokens": tokens, "hashes": hashes, "sig": sig, "keys": band_keys(sig)})
+        if not queries:
+            return []
+
+        rows = db.session.query(LSHBucket.band_key, LSHBucket.fingerprint_id).filter(
+            LSHBucket.band_key.in_({key for query in queries for key in query["keys"]})
+        )
+        if exclude_project_id is not None:
+            rows = rows.filter(LSHBucket.project_id != exclude_project_id)
+        buckets = defaultdict(set)
+        for band_key, fingerprint_id in rows:
+            buckets[band_key].add(fingerprint_id)
+        if not buckets:
+            return []
+
+        candidate_ids = set().union(*buckets.values())
+        fingerprints = {fp.id: fp for fp in SectionFingerprint.query.filter(SectionFingerprint.id.in_(candidate_ids))}
+        best = defaultdict(dict)
+        for query in queries:
+            for fingerprint_id in set().union(*(buckets.get(key, ()) for key in query["keys"])):
+                fingerprint = fingerprints[fingerprint_id]
+                similarity = estimate_similarity(query["sig"], from_bytes(fingerprint.signature))
+                current = best[fingerprint.project_id].get(query["id"])
+                if similarity >= threshold and (current is None or similarity > current[0]):
+                    best[fingerprint.project_id][query["id"]] = (similarity, fingerprint)
+
+        total = sum(len(query["hashes"]) for query in queries)
+        by_id = {query["id"]: query for query in queries}
+        scored = sorted(
+            (
+                (sum(similarity * len(by_id[qid]["hashes"]) for qid, (similarity, _) in sections.items()) / total, project_id)
+                for project_id, sections in best.items()
+                if sections
+            ),
+            reverse=True,
+        )[:limit]
+        projects = {p.id: p for p in Project.query.filter(Project.id.in_([project_id for _, project_id in scored]))}
+
+        matches = []
+        for score, project_id in scored:
+            project = projects.get(project_id)
+            if project is None:
+                continue
+            texts = dict(document_sections(project.document_json))
+            sections, spans = [], []
+            for qid, (similarity, fingerprint) in best[project_id].items():
+                sections.append(
+                    {"section_id": qid, "matched_section_id": fingerprint.section_id, "similarity": round(similarity * 100, 2)}
+                )
+                query = by_id[qid]
+                for span in _overlap_spans(query["tokens"], query["hashes"], texts.get(fingerprint.section_id, "")):
+                    spans.append({"section_id": qid, "matched_section_id": fingerprint.section_id, **span})
+            matches.append(
+                {
+                    "project_id": project_id,
+                    "title": project.title,
+                    "similarity": round(score * 100, 2),
+                    "sections": sections,
+                    "spans": spans,
+                }
+            )
+        return matches
+
+    def stats(self) -> dict:
+        """
+        Index size and staleness: projects whose saved document has not been
+        re-fingerprinted yet, and how long the oldest has been waiting.
+        """
+        pending, oldest = (
+            db.session.query(func.count(Project.id), func.min(Project.fingerprint_requested_at))
+            .filter(Project.fingerprint_requested_at.isnot(None))
+            .one()
+        )
+        return {
+            "sections": SectionFingerprint.query.count(),
+            "sections_rewritten": self.sections_rewritten,
+            "stale_projects": pending,
+            "oldest_stale_seconds": round((datetime.utcnow() - oldest).total_seconds(), 1) if oldest else 0,
+        }
+
+
+corpus_index = CorpusIndex()
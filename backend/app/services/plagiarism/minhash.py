@@ -0,0 +1,82 @@
+import hashlib
+import re
+import zlib
+
+import numpy as np
+
+SHINGLE_SIZE = 5
+NUM_PERM = 128
+# Two sections become candidates with probability 1 - (1 - J^ROWS)^BANDS; the
+# S-curve's midpoint (1/BANDS)^(1/ROWS) is about 0.125 here, well under the
+# default PLAGIARISM_MATCH_THRESHOLD of 0.3, so sections at the threshold are
+# almost always compared.
+BANDS = 64
+ROWS = NUM_PERM // BANDS
+
+_MERSENNE = np.uint64((1 << 31) - 1)
+_MASK32 = np.uint64(0xFFFFFFFF)
+_ROLL = np.uint64(1000003)
+# Signature rows are computed in chunks to bound memory on very long sections.
+_CHUNK = 4096
+
+# Fixed seed: stored signatures must stay comparable across processes.
+_rng = np.random.default_rng(20240601)
+_A = _rng.integers(1, (1 << 31) - 1, size=NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, (1 << 31) - 1, size=NUM_PERM, dtype=np.uint64)
+
+
+def words(text: str) -> list[str]:
+    return re.findall(r"[a-z0-9]+", (text or "").lower())
+
+
+def shingle_hashes(tokens: list[str], size: int = SHINGLE_SIZE) -> np.ndarray:
+    """
+    32-bit hash of every word n-gram, in document order (position i covers
+    tokens[i:i + size]). Empty when the text is shorter than one shingle.
+    """
+    if len(tokens) < size:
+        return np.empty(0, dtype=np.uint64)
+    token_hashes = np.fromiter((zlib.crc32(t.encode("utf-8")) for t in tokens), dtype=np.uint64, count=len(tokens))
+    count = len(tokens) - size + 1
+    rolled = np.zeros(count, dtype=np.uint64)
+    for offset in range(size):
+        rolled = (rolled * _ROLL + token_hashes[offset:offset + count]) & _MASK32
+    return rolled
+
+
+def signature(hashes: np.ndarray) -> np.ndarray:
+    """
+    NUM_PERM minimum hash values under (a*x + b) mod (2^31 - 1); the share
+    of equal positions between two signatures estimates their Jaccard.
+    """
+    unique = np.unique(hashes)
+    result = np.full(NUM_PERM, np.iinfo(np.uint32).max, dtype=np.uint64)
+    for start in range(0, len(unique), _CHUNK):
+        chunk = unique[start:start + _CHUNK]
+        values = (np.outer(_A, chunk) + _B[:, None]) % _MERSENNE
+        result = np.minimum(result, values.min(axis=1))
+    return result.astype(np.uint32)
+
+
+def band_keys(sig: np.ndarray) -> list[int]:
+    """
+    One signed 64-bit key per LSH band (BANDS bands of ROWS rows); the band
+    index is mixed in so equal rows in different bands never collide.
+    """
+    keys = []
+    for band, rows in enumerate(sig.reshape(BANDS, ROWS)):
+        digest = hashlib.blake2b(band.to_bytes(2, "little") + rows.tobytes(), digest_size=8).digest()
+        keys.append(int.from_bytes(digest, "little", signed=True))
+    return keys
+
+
+def estimate_similarity(left: np.ndarray, right: np.ndarray) -> float:
+    return float(np.count_nonzero(left == right)) / NUM_PERM
+
+
+def to_bytes(sig: np.ndarray) -> bytes:
+    return sig.astype("<u4").tobytes()
+
+
+def from_bytes(raw: bytes) -> np.ndarray:
+    return np.frombuffer(raw, dtype="<u4")
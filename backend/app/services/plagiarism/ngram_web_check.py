@@ -1,5 +1,119 @@
-# Optional external n-gram lookup hook.
-# In production this can call search APIs to compare sampled phrases.
+# Offline stand-in for a web n-gram lookup: sampled phrases of a report are
+# checked against a phrase index built from a local reference corpus
+# (past reports, Wikipedia extracts, ...) instead of calling search APIs.
+import os
+import threading
+import zlib
 
-def web_ngram_hits(_: str) -> int:
-    return 0
+import numpy as np
+
+from ...config import Config
+from .minhash import words
+
+PHRASE_LENGTH = 8
+_ROLL = np.uint64(1099511628211)
+
+
+def _mix(values: np.ndarray) -> np.ndarray:
+    # splitmix64 finalizer: spreads the rolling hash so `% sample` is uniform.
+    values = values ^ (values >> np.uint64(30))
+    values = values * np.uint64(0xBF58476D1CE4E5B9)
+    values = values ^ (values >> np.uint64(27))
+    values = values * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+def phrase_hashes(text: str, sample: int) -> np.ndarray:
+    """
+    64-bit hashes of the text's word 8-grams, keeping only those divisible
+    by sample. Index and query use the same rule, so any copied passage of
+    a few dozen words shares sampled phrases with its source.
+    """
+    tokens = words(text)
+    if len(tokens) < PHRASE_LENGTH:
+        return np.empty(0, dtype=np.uint64)
+    token_hashes = np.fromiter((zlib.crc32(t.encode("utf-8")) for t in tokens), dtype=np.uint64, count=len(tokens))
+    count = len(tokens) - PHRASE_LENGTH + 1
+    rolled = np.zeros(count, dtype=np.uint64)
+    for offset in range(PHRASE_LENGTH):
+        rolled = rolled * _ROLL + token_hashes[offset:offset + count]
+    hashes = _mix(rolled)
+    return hashes[hashes % np.uint64(sample) == 0]
+
+
+def build_phrase_index(texts, path: str, sample: int = Config.PHRASE_INDEX_SAMPLE) -> int:
+    """
+    Write the sorted, de-duplicated sampled phrase hashes of every text to
+    path as a .npy array. Returns the number of phrases indexed.
+    """
+    chunks, pending = [], []
+    pending_size = 0
+    for text in texts:
+        hashes = phrase_hashes(text, sample)
+        pending.append(hashes)
+        pending_size += len(hashes)
+        # De-duplicate as we go so memory follows distinct phrases, not input size.
+        if pending_size >= 1_000_000:
+            chunks.append(np.unique(np.concatenate(pending)))
+            pending, pending_size = [], 0
+    chunks.append(np.unique(np.concatenate(pending)) if pending else np.empty(0, dtype=np.uint64))
+    index = np.unique(np.concatenate(chunks))
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp.npy"
+    np.save(tmp_path, index)
+    os.replace(tmp_path, path)
+    return len(index)
+
+
+class PhraseIndex:
+    """
+    Memory-mapped sorted phrase hashes; lookups are a binary search per
+    sampled phrase, so only the touched pages are read from disk.
+    """
+
+    def __init__(self, path: str, sample: int, max_phrases: int):
+        self.path = path
+        self.sample = sample
+        self.max_phrases = max_phrases
+        self._hashes = None
+        self._version = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        # Rebuilds replace the file, so the inode changes even within one mtime tick.
+        version = (stat.st_mtime_ns, stat.st_ino)
+        with self._lock:
+            if version != self._version:
+                self._hashes = np.load(self.path, mmap_mode="r")
+                self._version = version
+            return self._hashes
+
+    def lookup(self, text: str) -> dict:
+        """
+        {"phrases_checked", "phrases_found"} for the text's sampled phrases;
+        both are 0 when no index has been built.
+        """
+        index = self._load()
+        if index is None or not len(index):
+            return {"phrases_checked": 0, "phrases_found": 0}
+        phrases = phrase_hashes(text, self.sample)
+        if len(phrases) > self.max_phrases:
+            phrases = phrases[np.linspace(0, len(phrases) - 1, self.max_phrases).astype(np.int64)]
+        # Sorted queries walk the mapped pages in order.
+        phrases = np.sort(phrases)
+        positions = np.searchsorted(index, phrases)
+        found = positions < len(index)
+        found[found] = index[positions[found]] == phrases[found]
+        return {"phrases_checked": int(len(phrases)), "phrases_found": int(np.count_nonzero(found))}
+
+
+phrase_index = PhraseIndex(Config.PHRASE_INDEX_PATH, Config.PHRASE_INDEX_SAMPLE, Config.PHRASE_CHECK_MAX_PHRASES)
+
+
+def web_ngram_hits(text: str) -> int:
+    return phrase_index.lookup(text)["phrases_found"]
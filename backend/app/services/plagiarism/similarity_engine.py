@@ -1,22 +1,41 @@
-import re
-from collections import Counter
+import hashlib
+import json
 
+from .ngram_web_check import phrase_index
+from .tokenizer import lexical_diversity, ngram_counts, repeated_terms, report_tokens, section_tokens
 
-def _tokens(text: str) -> list[str]:
-    return [t for t in re.findall(r"[a-zA-Z0-9]+", text.lower()) if len(t) > 2]
+PHRASE_LENGTH = 3
 
+# Bump whenever the report changes, so reports stored for unchanged
+# documents are recomputed.
+REPORT_VERSION = "1"
 
-def compute_similarity_report(document: dict) -> dict:
+
+def document_hash(document: dict) -> str:
+    """
+    Stable hash of a document's section ids and contents.
+    """
+    sections = [[section.get("id"), section.get("content", "")] for section in document.get("sections", [])]
+    payload = json.dumps([REPORT_VERSION, sections], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def compute_similarity_report(document: dict, corpus=None, project_id: int = None) -> dict:
+    """
+    Single-document checks, plus `matches` against other projects when a
+    corpus index is given (project_id is excluded from its own matches).
+    """
     sections = document.get("sections", [])
-    joined = "\n".join(s.get("content", "") for s in sections)
-    tokens = _tokens(joined)
-    counts = Counter(tokens)
+    # Each section is tokenized once (and cached); the document-wide
+    # statistics work on its ids mapped into one report-wide id space.
+    tokens = [section_tokens(section.get("content", "")) for section in sections]
+    words, ids = report_tokens(tokens)
 
-    repeated = [{"token": token, "count": count} for token, count in counts.items() if count > 10]
+    repeated = repeated_terms(ids, words, min_count=10)
     suspicious = []
-    for section in sections:
+    for section, tokenized in zip(sections, tokens):
         text = section.get("content", "")
-        unique_ratio = len(set(_tokens(text))) / max(1, len(_tokens(text)))
+        unique_ratio = lexical_diversity(tokenized.ids)
         if unique_ratio < 0.45 and len(text) > 180:
             suspicious.append(
                 {
@@ -27,13 +46,23 @@ def compute_similarity_report(document: dict) -> dict:
             )
 
     originality = max(0.0, 100 - min(85, len(repeated) * 1.2 + len(suspicious) * 7))
+    matches = corpus.find_matches(document, exclude_project_id=project_id) if corpus is not None else []
+    if matches:
+        # Text copied from another report outweighs the in-document heuristics.
+        originality = min(originality, 100 - matches[0]["similarity"])
+    reference = phrase_index.lookup("\n".join(section.get("content", "") for section in sections))
+    reference["share"] = round(reference["phrases_found"] * 100 / max(1, reference["phrases_checked"]), 2)
+    originality = min(originality, 100 - reference["share"])
     return {
         "overall_similarity": round(100 - originality, 2),
         "originality_percentage": round(originality, 2),
         "flagged_sections": suspicious,
         "top_repeated_terms": repeated[:20],
+        "top_repeated_phrases": ngram_counts(ids, words, PHRASE_LENGTH, min_count=3)[:20],
         "rewrite_suggestions": [
             "Add concrete implementation details and dataset specifics.",
             "Replace repeated phrases with section-specific evidence.",
         ],
+        "matches": matches,
+        "reference_corpus": reference,
     }
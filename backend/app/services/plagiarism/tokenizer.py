@@ -0,0 +1,109 @@
+import re
+from collections import namedtuple
+from functools import lru_cache
+from itertools import chain
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+MIN_TOKEN_LENGTH = 3
+# Sections are re-checked on every click; most of them have not changed.
+SECTION_CACHE_SIZE = 2048
+
+SectionTokens = namedtuple("SectionTokens", ["words", "word_hashes", "ids"])
+
+
+def _first_positions(inverse: np.ndarray, count: int) -> np.ndarray:
+    first = np.empty(count, dtype=np.int64)
+    # Reversed, so the earliest position of each value is written last.
+    first[inverse[::-1]] = np.arange(len(inverse) - 1, -1, -1)
+    return first
+
+
+@lru_cache(maxsize=SECTION_CACHE_SIZE)
+def section_tokens(text: str) -> SectionTokens:
+    """
+    Tokens of one section (lower-cased alphanumeric runs of at least
+    MIN_TOKEN_LENGTH characters), cached by text: its distinct words, their
+    sorted int64 hashes, and an int32 id per token indexing both. Ids are
+    local to the section; the arrays are read-only.
+    """
+    tokens = [token for token in TOKEN_PATTERN.findall(text.lower()) if len(token) >= MIN_TOKEN_LENGTH]
+    hashes = np.fromiter(map(hash, tokens), dtype=np.int64, count=len(tokens))
+    word_hashes, ids = np.unique(hashes, return_inverse=True)
+    words = tuple(map(tokens.__getitem__, _first_positions(ids, len(word_hashes)).tolist()))
+    ids = ids.astype(np.int32)
+    word_hashes.setflags(write=False)
+    ids.setflags(write=False)
+    return SectionTokens(words, word_hashes, ids)
+
+
+def report_tokens(sections: list) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Map the local ids of several sections onto one id space scoped to this
+    report, so the id range (and n-gram packing base) follows the report
+    rather than every word the process has seen. Returns (words, ids) with
+    words[ids] the concatenated tokens.
+    """
+    if not sections:
+        return np.empty(0, dtype=object), np.empty(0, dtype=np.int32)
+    # Words are told apart by their 64-bit hash: sorting ints is far cheaper
+    # than sorting strings, and a collision within one report is negligible.
+    unique, inverse = np.unique(np.concatenate([section.word_hashes for section in sections]), return_inverse=True)
+    offsets = np.cumsum([0] + [len(section.words) for section in sections[:-1]])
+    ids = np.concatenate([inverse[offset + section.ids] for offset, section in zip(offsets, sections)])
+    flat = list(chain.from_iterable(section.words for section in sections))
+    words = np.array(list(map(flat.__getitem__, _first_positions(inverse, len(unique)).tolist())), dtype=object)
+    return words, ids.astype(np.int32)
+
+
+def lexical_diversity(ids: np.ndarray) -> float:
+    if not len(ids):
+        return 0.0
+    ordered = np.sort(ids)
+    return (1 + np.count_nonzero(ordered[1:] != ordered[:-1])) / len(ids)
+
+
+def repeated_terms(ids: np.ndarray, words: np.ndarray, min_count: int) -> list[dict]:
+    """
+    Terms occurring more than min_count times, in order of first use.
+    """
+    if not len(ids):
+        return []
+    unique, counts = np.unique(ids, return_counts=True)
+    keep = counts > min_count
+    unique, counts = unique[keep], counts[keep]
+    # First positions are only needed for the (few) repeated terms.
+    _, first = np.unique(ids[np.isin(ids, unique)], return_index=True)
+    order = np.argsort(first, kind="stable")
+    return [
+        {"token": str(words[token_id]), "count": int(count)}
+        for token_id, count in zip(unique[order], counts[order])
+    ]
+
+
+def ngram_counts(ids: np.ndarray, words: np.ndarray, n: int, min_count: int) -> list[dict]:
+    """
+    Word n-grams occurring more than min_count times, most frequent first.
+    """
+    if len(ids) < n:
+        return []
+    windows = sliding_window_view(ids, n)
+    base = len(words) + 1
+    if base ** n < 2**63:
+        # Pack each n-gram into one int64 so counting is a 1-D sort.
+        keys = np.zeros(len(windows), dtype=np.int64)
+        for column in range(n):
+            keys = keys * base + windows[:, column]
+        keys, counts = np.unique(keys, return_counts=True)
+        powers = base ** np.arange(n - 1, -1, -1, dtype=np.int64)
+        grams = (keys[:, None] // powers) % base
+    else:
+        grams, counts = np.unique(windows, axis=0, return_counts=True)
+    keep = np.flatnonzero(counts > min_count)
+    keep = keep[np.argsort(-counts[keep], kind="stable")]
+    return [
+        {"phrase": " ".join(words[grams[index]]), "count": int(counts[index])}
+        for index in keep
+    ]
@@ -1,8 +1,21 @@
+from contextlib import nullcontext
+
 import redis
 from rq import Queue
-from flask import current_app
+from flask import current_app, has_app_context
 
 
 def get_queue(name: str = "default") -> Queue:
     conn = redis.from_url(current_app.config["REDIS_URL"])
     return Queue(name, connection=conn)
+
+
+def app_context():
+    """
+    Reuse the caller's app context, or build one inside an RQ worker process.
+    """
+    if has_app_context():
+        return nullcontext()
+    from .. import create_app
+
+    return create_app().app_context()
@@ -2,19 +2,51 @@ from datetime import datetime
 
 from ..extensions import db
 from ..models.ai_job import AIJob
+from ..models.section import ProjectSection
 from ..services.ai.provider_router import get_ai_provider
+from .queue import app_context
+
+
+def apply_improvement(project_id: int, section_key: str, output: dict, content: str):
+    """
+    Store an improve result on the project's section; the caller commits.
+    """
+    section = ProjectSection.query.filter_by(project_id=project_id, section_key=section_key).first()
+    if not section:
+        section = ProjectSection(project_id=project_id, section_key=section_key)
+        db.session.add(section)
+    improved = output.get("improved_text", content)
+    section.plain_text = improved
+    section.content_jsonb = {"text": improved}
+    section.ai_last_enhanced_at = datetime.utcnow()
 
 
 def run_section_improvement(ai_job_id: int, section_title: str, content: str, target_words: int = 200):
-    provider = get_ai_provider()
-    output = provider.improve_section(section_title, content, target_words)
+    with app_context():
+        record = AIJob.query.get(ai_job_id)
+        if record:
+            record.status = "running"
+            db.session.commit()
 
-    record = AIJob.query.get(ai_job_id)
-    if not record:
-        return output
+        try:
+            provider = get_ai_provider()
+            output = provider.improve_section(section_title, content, target_words)
+        except Exception as exc:
+            if record:
+                record.status = "failed"
+                record.error = str(exc)
+                record.completed_at = datetime.utcnow()
+                db.session.commit()
+            raise
 
-    record.output_jsonb = output
-    record.status = "completed"
-    record.completed_at = datetime.utcnow()
-    db.session.commit()
-    return output
+        if not record:
+            return output
+
+        record.provider = "gemini" if provider.enabled else "fallback"
+        record.output_jsonb = output
+        record.status = "completed"
+        record.completed_at = datetime.utcnow()
+
+        apply_improvement(record.project_id, record.section_key, output, content)
+        db.session.commit()
+        return output
@@ -1,7 +1,9 @@
+import os
 from datetime import datetime
 
 from ..extensions import db
 from ..models.export_job import ExportJob
+from .queue import app_context
 
 
 def mark_export_completed(job_id: int, output_url: str):
@@ -12,3 +14,92 @@ def mark_export_completed(job_id: int, output_url: str):
     job.output_url = output_url
     job.completed_at = datetime.utcnow()
     db.session.commit()
+
+
+def run_document_generation(job_id: int, spec: dict):
+    # Legacy generator modules live at the backend root, next to app.py.
+    from services.document_service import generate_document
+    from services.file_service import load_code_items, release_generation_inputs
+
+    with app_context():
+        job = ExportJob.query.get(job_id)
+        if not job:
+            return None
+
+        def report_progress(percent: int):
+            job.progress = percent
+            db.session.commit()
+
+        job.status = "running"
+        report_progress(5)
+        try:
+            out_name, _ = generate_document(
+                template_path=spec["template_path"],
+                template_config=spec["template_config"],
+                payload=spec["payload"],
+                code_items=load_code_items(spec.get("code_files", [])),
+                screenshots=spec.get("screenshots", []),
+                diagrams=spec.get("diagrams", []),
+                plagiarism_report=spec.get("plagiarism_report"),
+                on_progress=report_progress,
+            )
+        except Exception as exc:
+            job.status = "failed"
+            job.error = str(exc)
+            job.completed_at = datetime.utcnow()
+            db.session.commit()
+            raise
+        finally:
+            release_generation_inputs(spec)
+
+        job.progress = 100
+        mark_export_completed(job.id, f"/api/download/{out_name}")
+        return out_name
+
+
+def run_batch_generation(job_id: int, spec: dict):
+    from config import GENERATED_DIR
+    from services.batch_service import generate_batch
+
+    with app_context():
+        job = ExportJob.query.get(job_id)
+        if not job:
+            return None
+
+        def report_progress(report: dict):
+            done = report["completed"] + report["failed"]
+            job.progress = int(done * 100 / max(report["total"], 1))
+            job.report_jsonb = dict(report, items=[dict(item) for item in report["items"]])
+            db.session.commit()
+
+        job.status = "running"
+        db.session.commit()
+        out_name = spec["output_name"]
+        try:
+            report = generate_batch(
+                template_path=spec["template_path"],
+                template_config=spec["template_config"],
+                students=spec["students"],
+                output_path=os.path.join(GENERATED_DIR, out_name),
+                resolve_path=_resolve_blob_key,
+                on_progress=report_progress,
+            )
+        except Exception as exc:
+            job.status = "failed"
+            job.error = str(exc)
+            job.completed_at = datetime.utcnow()
+            db.session.commit()
+            raise
+
+        report_progress(report)
+        mark_export_completed(job.id, f"/api/download/{out_name}")
+        return report
+
+
+def _resolve_blob_key(ref: str):
+    from services.blob_store import blob_store
+
+    # API manifests may only point at uploaded blobs, never at server paths.
+    if not ref or not ref.startswith("sha256/"):
+        return None
+    return blob_store.resolve(ref)
@@ -1,5 +1,69 @@
+from datetime import datetime
+
+from ..extensions import db
+from ..models.plagiarism_report import PlagiarismReport
+from ..models.project import Project
+from ..services.plagiarism.corpus_index import corpus_index
 from ..services.plagiarism.similarity_engine import compute_similarity_report
+from .queue import app_context
+
+
+def run_plagiarism(report_id: int, document: dict):
+    """
+    Compute a queued PlagiarismReport. The project's own fingerprints are
+    brought up to date first so it is excluded from, and visible to, the
+    corpus consistently.
+    """
+    with app_context():
+        report = db.session.get(PlagiarismReport, report_id)
+        if not report:
+            return compute_similarity_report(document)
+
+        report.status = "running"
+        db.session.commit()
+        try:
+            project = db.session.get(Project, report.project_id)
+            corpus_index.index_project(project)
+            result = compute_similarity_report(document, corpus=corpus_index, project_id=project.id)
+        except Exception as exc:
+            db.session.rollback()
+            report.status = "failed"
+            report.error = str(exc)
+            report.completed_at = datetime.utcnow()
+            db.session.commit()
+            raise
+
+        report.overall_score = result["overall_similarity"]
+        report.flagged_jsonb = result.get("flagged_sections", [])
+        report.suggestions_jsonb = result.get("rewrite_suggestions", [])
+        report.result_jsonb = result
+        report.status = "completed"
+        report.completed_at = datetime.utcnow()
+        db.session.commit()
+        return result
+
 
+def run_fingerprint_update(project_id: int):
+    """
+    Bring one project's section fingerprints up to date with its saved
+    document; only sections whose content hash changed are rewritten.
+    """
+    with app_context():
+        project = db.session.get(Project, project_id)
+        if not project:
+            return 0
 
-def run_plagiarism(document: dict):
-    return compute_similarity_report(document)
+        # Cleared before reading the document, so a save made while this runs
+        # schedules another update instead of being lost.
+        requested_at = project.fingerprint_requested_at
+        project.fingerprint_requested_at = None
+        db.session.commit()
+        try:
+            changed = corpus_index.index_project(project)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            project.fingerprint_requested_at = requested_at or datetime.utcnow()
+            db.session.commit()
+            raise
+        return changed
@@ -0,0 +1,59 @@
+"""
+Time figure preparation (decode, resize, re-encode) for one document's
+screenshots and diagrams, inline against the image process pool.
+
+Run from backend/:
+    python benchmarks/bench_figures.py [--figures N] [--workers N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image  # noqa: E402
+
+from services import image_service  # noqa: E402
+
+
+def _make_images(directory: str, count: int, tag: str) -> list:
+    # Noise keeps every image distinct, so none are answered by the digest cache.
+    paths = []
+    for idx in range(count):
+        path = os.path.join(directory, f"{tag}_{idx}.png")
+        Image.effect_noise((1600, 1000), 40 + idx).convert("RGB").save(path)
+        paths.append(path)
+    return paths
+
+
+def _time(paths: list, workers: int) -> float:
+    image_service.use_image_pool(workers)
+    start = time.perf_counter()
+    results = image_service.prepare_images(paths)
+    elapsed = time.perf_counter() - start
+    failed = [path for path, value in results.items() if isinstance(value, Exception)]
+    if failed:
+        raise SystemExit(f"Preparation failed for {failed}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--figures", type=int, default=6)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        inline = _time(_make_images(directory, args.figures, "inline"), 1)
+        pooled = _time(_make_images(directory, args.figures, "pooled"), args.workers)
+
+    print(f"{args.figures} figures, {os.cpu_count()} CPUs")
+    print(f"  inline:            {inline * 1000:8.1f} ms")
+    print(f"  pool ({args.workers} workers): {pooled * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
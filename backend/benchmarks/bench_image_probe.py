@@ -0,0 +1,75 @@
+"""
+Compare PIL's Image.open with the header-only probe (cold and memoized)
+for reading image dimensions.
+
+Run from backend/:
+    python benchmarks/bench_image_probe.py [FOLDER]
+
+Without FOLDER, 200 synthetic PNG/JPEG/WebP screenshots are generated in a
+temporary directory.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image  # noqa: E402
+
+from services.image_probe import _probe_cached, probe_image  # noqa: E402
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp", ".gif", ".bmp"}
+
+
+def _make_screenshots(folder: str, count: int = 200):
+    formats = [("png", {}), ("jpg", {"quality": 85}), ("webp", {})]
+    for idx in range(count):
+        ext, kwargs = formats[idx % len(formats)]
+        img = Image.new("RGB", (1920, 1080), (idx % 255, 120, 200))
+        img.save(os.path.join(folder, f"shot_{idx:03d}.{ext}"), **kwargs)
+
+
+def _time(fn, paths):
+    start = time.perf_counter()
+    for path in paths:
+        fn(path)
+    return (time.perf_counter() - start) * 1000
+
+
+def _pil_size(path):
+    with Image.open(path) as img:
+        return img.size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("folder", nargs="?")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = args.folder or tmp
+        if not args.folder:
+            _make_screenshots(folder)
+
+        paths = sorted(
+            os.path.join(folder, name)
+            for name in os.listdir(folder)
+            if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS
+        )
+
+        pil_ms = _time(_pil_size, paths)
+        _probe_cached.cache_clear()
+        cold_ms = _time(probe_image, paths)
+        warm_ms = _time(probe_image, paths)
+
+    print(f"{len(paths)} images")
+    print(f"PIL Image.open      {pil_ms:8.1f} ms")
+    print(f"header probe (cold) {cold_ms:8.1f} ms  {pil_ms / max(cold_ms, 1e-6):5.1f}x")
+    print(f"header probe (memo) {warm_ms:8.1f} ms  {pil_ms / max(warm_ms, 1e-6):5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
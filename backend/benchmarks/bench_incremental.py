@@ -0,0 +1,94 @@
+"""
+Time an edit-and-regenerate loop: a full build saved with Document.save
+against generate_document_stream, which re-renders only the changed
+section in the student's render session and reuses deflated media.
+
+Run from backend/:
+    python benchmarks/bench_incremental.py [--rounds N]
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import BASE_DIR, TEMPLATES_JSON_PATH  # noqa: E402
+from services.document_service import build_document, generate_document_stream  # noqa: E402
+from services.preview_service import DOC_KEYS  # noqa: E402
+
+TEMPLATE_FILES = ["ankit.docx", "proj.docx", "sahil.docx"]
+
+
+def _template_config(file_name: str) -> dict:
+    with open(TEMPLATES_JSON_PATH, "r", encoding="utf-8") as fh:
+        for item in json.load(fh):
+            if item.get("file") == file_name:
+                return item
+    # Templates not registered in templates.json use the default [[key]] placeholders.
+    return {"file": file_name, "old_details": {}}
+
+
+def _inputs(path: str, file_name: str, revision: int) -> dict:
+    documentation = {key: f"Generated text for {key}. " * 20 for key in DOC_KEYS}
+    documentation["doc_scope"] = f"Scope revision {revision}. " * 20
+    return {
+        "template_path": path,
+        "template_config": _template_config(file_name),
+        "payload": {
+            "studentDetails": {
+                "name": "Benchmark Student",
+                "project": "Library Management System",
+                "professor": "Prof. Example",
+                "guide": "Guide Example",
+                "year": "2025-2026",
+            },
+            "documentation": documentation,
+            "references": ["https://example.com/paper"],
+        },
+        "code_items": [{"filename": "app.py", "content": "print('hello')\n" * 200}],
+        "screenshots": [],
+        "diagrams": [],
+    }
+
+
+def _full(inputs):
+    build_document(**inputs).save(io.BytesIO())
+
+
+def _incremental(inputs):
+    _, buffer, _ = generate_document_stream(**inputs)
+    buffer.close()
+
+
+def _time(fn, path, file_name, rounds):
+    fn(_inputs(path, file_name, 0))
+    best = float("inf")
+    for revision in range(1, rounds + 1):
+        inputs = _inputs(path, file_name, revision)
+        start = time.perf_counter()
+        fn(inputs)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'template':<14}{'full ms':>10}{'incremental ms':>16}{'speedup':>10}")
+    for file_name in TEMPLATE_FILES:
+        path = os.path.join(BASE_DIR, file_name)
+        if not os.path.exists(path):
+            continue
+        full_ms = _time(_full, path, file_name, args.rounds)
+        incremental_ms = _time(_incremental, path, file_name, args.rounds)
+        print(f"{file_name:<14}{full_ms:>10.1f}{incremental_ms:>16.1f}{full_ms / max(incremental_ms, 1e-6):>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Time offline web n-gram checks: build a sampled phrase index from a
+synthetic reference corpus, then look up the sampled 8-grams of a
+100-page report against the memory-mapped index.
+
+Run from backend/:
+    python benchmarks/bench_phrase_index.py [--corpus-words N] [--pages N] [--rounds N]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.plagiarism.ngram_web_check import PhraseIndex, build_phrase_index, phrase_hashes  # noqa: E402
+
+WORDS_PER_PAGE = 450
+SAMPLE = 4
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--corpus-words", type=int, default=20_000_000)
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    vocabulary = [f"w{index}" for index in range(50_000)]
+    block = 200_000
+
+    def corpus():
+        for _ in range(args.corpus_words // block):
+            yield " ".join(rng.choices(vocabulary, k=block))
+
+    path = os.path.join(tempfile.mkdtemp(), "phrases.npy")
+    start = time.perf_counter()
+    count = build_phrase_index(corpus(), path, sample=SAMPLE)
+    print(f"built {count} phrases ({os.path.getsize(path) / 1e6:.1f} MB) in {time.perf_counter() - start:.1f}s")
+
+    report_words = rng.choices(vocabulary, k=args.pages * WORDS_PER_PAGE)
+    report = " ".join(report_words)
+    index = PhraseIndex(path, sample=SAMPLE, max_phrases=5000)
+    timings = []
+    for _ in range(args.rounds):
+        start = time.perf_counter()
+        result = index.lookup(report)
+        timings.append((time.perf_counter() - start) * 1000)
+    print(
+        f"{args.pages}-page report: median {statistics.median(timings):.1f} ms "
+        f"(first {timings[0]:.1f} ms), {result['phrases_checked']} phrases checked, {result['phrases_found']} found"
+    )
+
+    # Split out tokenizing and hashing the report from the index search.
+    start = time.perf_counter()
+    phrase_hashes(report, SAMPLE)
+    hashing = (time.perf_counter() - start) * 1000
+    print(f"  of which tokenizing and hashing the report: {hashing:.1f} ms")
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Time cross-project plagiarism matches against a synthetic corpus: index
+N projects of random academic-sounding text, then check documents that
+copy one section from a random indexed project.
+
+Run from backend/:
+    python benchmarks/bench_plagiarism.py [--projects N] [--sections N] [--checks N] [--db PATH]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from app.config import Config  # noqa: E402
+from app.extensions import db  # noqa: E402
+from app.models.project import Project  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.services.plagiarism.corpus_index import corpus_index  # noqa: E402
+
+VOCABULARY = (
+    "system module user data database server client network model training accuracy report "
+    "design implementation testing requirement feature interface security performance student "
+    "project analysis result algorithm application mobile web cloud storage query record admin "
+    "dashboard login payment booking library hospital inventory attendance prediction image"
+).split()
+
+
+def _text(rng, words):
+    return " ".join(rng.choice(VOCABULARY) for _ in range(words))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--projects", type=int, default=1000)
+    parser.add_argument("--sections", type=int, default=6)
+    parser.add_argument("--words", type=int, default=250, help="Words per section.")
+    parser.add_argument("--checks", type=int, default=20)
+    parser.add_argument("--db", default=None, help="SQLite file to reuse between runs (default: a temporary file).")
+    args = parser.parse_args()
+
+    path = args.db or os.path.join(tempfile.mkdtemp(), "plagiarism.db")
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+
+    app = create_app(BenchConfig)
+
+    with app.app_context():
+        db.create_all()
+        user = User.query.first()
+        if user is None:
+            user = User(name="Bench", email="bench@blackbook.local", role="student")
+            user.set_password("bench")
+            db.session.add(user)
+            db.session.commit()
+
+        existing = Project.query.count()
+        # Seeded by corpus size so resumed runs never regenerate the same text.
+        rng = random.Random(existing)
+        start = time.perf_counter()
+        for number in range(existing, args.projects):
+            project = Project(
+                owner_id=user.id,
+                title=f"Project {number}",
+                document_json={"sections": [{"id": f"s{i}", "content": _text(rng, args.words)} for i in range(args.sections)]},
+            )
+            db.session.add(project)
+            db.session.flush()
+            corpus_index.index_project(project)
+            if number % 200 == 0:
+                db.session.commit()
+        db.session.commit()
+        if args.projects > existing:
+            print(f"indexed {args.projects - existing} projects in {time.perf_counter() - start:.1f}s")
+
+        ids = [project_id for (project_id,) in db.session.query(Project.id)]
+        timings, found = [], 0
+        for _ in range(args.checks):
+            source = db.session.get(Project, rng.choice(ids))
+            copied = source.document_json["sections"][0]["content"]
+            document = {"sections": [{"id": "intro", "content": copied}, {"id": "scope", "content": _text(rng, args.words)}]}
+            start = time.perf_counter()
+            matches = corpus_index.find_matches(document)
+            timings.append((time.perf_counter() - start) * 1000)
+            found += bool(matches) and matches[0]["project_id"] == source.id
+
+        print(
+            f"{len(ids)} projects: median {statistics.median(timings):.1f} ms, "
+            f"max {max(timings):.1f} ms per check; source ranked first in {found}/{args.checks}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Time rendering the fallback PlantUML diagrams with each available
+renderer: Kroki over the network and the pooled local PlantUML JVM.
+The render cache is bypassed. Renderers that are not installed or not
+reachable are skipped.
+
+Run from backend/:
+    python benchmarks/bench_renderers.py [--rounds N]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests  # noqa: E402
+
+from services.diagram_renderers import KrokiRenderer, LocalPlantUMLRenderer  # noqa: E402
+from services.diagram_service import FALLBACK_DIAGRAM_TYPES, _fallback_plantuml  # noqa: E402
+
+
+def _renderers():
+    kroki = KrokiRenderer()
+    try:
+        if requests.get(f"{kroki.base_url}/health", timeout=5).ok:
+            yield kroki
+        else:
+            print("kroki: skipped (health check failed)")
+    except requests.RequestException as exc:
+        print(f"kroki: skipped ({exc.__class__.__name__})")
+
+    local = LocalPlantUMLRenderer()
+    if local.available():
+        yield local
+    else:
+        print("local: skipped (set PLANTUML_JAR and install java)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    sources = [
+        _fallback_plantuml(f"Benchmark Project {round_no}", diagram_type)
+        for round_no in range(args.rounds)
+        for diagram_type in FALLBACK_DIAGRAM_TYPES
+    ]
+    for renderer in _renderers():
+        # The first render pays for connection set-up or JVM start-up.
+        start = time.perf_counter()
+        renderer.render(sources[0])
+        first = time.perf_counter() - start
+
+        timings = []
+        for source in sources[1:]:
+            start = time.perf_counter()
+            renderer.render(source)
+            timings.append(time.perf_counter() - start)
+        print(
+            f"{renderer.name:>6}: first {first * 1000:8.1f} ms, "
+            f"median {statistics.median(timings) * 1000:8.1f} ms, "
+            f"p95 {sorted(timings)[int(len(timings) * 0.95)] * 1000:8.1f} ms over {len(timings)} diagrams"
+        )
+        if isinstance(renderer, LocalPlantUMLRenderer):
+            renderer.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Compare the legacy per-pair replacement loop with the single-pass
+PlaceholderMatcher on the shipped DOCX templates.
+
+Run from backend/:
+    python benchmarks/bench_substitution.py [--rounds N]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document  # noqa: E402
+
+from config import BASE_DIR, TEMPLATES_JSON_PATH  # noqa: E402
+from services.document_service import _sanitize_xml_text, build_replacements  # noqa: E402
+from services.placeholder_service import PlaceholderMatcher  # noqa: E402
+from services.preview_service import DOC_KEYS  # noqa: E402
+
+TEMPLATE_FILES = ["ankit.docx", "proj.docx", "sahil.docx"]
+
+SAMPLE_PAYLOAD = {
+    "studentDetails": {
+        "name": "Benchmark Student",
+        "project": "Library Management System",
+        "professor": "Prof. Example",
+        "guide": "Guide Example",
+        "year": "2025-2026",
+    },
+    "documentation": {key: f"Generated text for {key}. " * 20 for key in DOC_KEYS},
+}
+
+
+def _template_config(file_name: str) -> dict:
+    with open(TEMPLATES_JSON_PATH, "r", encoding="utf-8") as fh:
+        for item in json.load(fh):
+            if item.get("file") == file_name:
+                return item
+    # Templates not registered in templates.json use the default [[key]] placeholders.
+    return {"file": file_name, "old_details": {}}
+
+
+# The replacement loop document_service used before PlaceholderMatcher, kept
+# here as the baseline.
+def _replace_in_paragraph(paragraph, old_text: str, new_text: str):
+    if not old_text:
+        return False
+    new_text = _sanitize_xml_text(new_text)
+
+    # Prefer in-run replacement to preserve template formatting.
+    replaced = False
+    for run in paragraph.runs:
+        if old_text in run.text:
+            run.text = run.text.replace(old_text, new_text)
+            replaced = True
+
+    if replaced:
+        return True
+
+    # Handle placeholders split across multiple runs while keeping the first run style.
+    full_text = "".join(run.text for run in paragraph.runs)
+    if old_text in full_text and paragraph.runs:
+        updated = full_text.replace(old_text, new_text)
+        paragraph.runs[0].text = updated
+        for run in paragraph.runs[1:]:
+            run.text = ""
+        return True
+
+    if old_text in paragraph.text:
+        paragraph.text = paragraph.text.replace(old_text, new_text)
+        return True
+
+    return False
+
+
+def _replace_globally(doc, old_text: str, new_text: str):
+    for paragraph in doc.paragraphs:
+        _replace_in_paragraph(paragraph, old_text, new_text)
+
+    for table in doc.tables:
+        for row in table.rows:
+            for cell in row.cells:
+                for paragraph in cell.paragraphs:
+                    _replace_in_paragraph(paragraph, old_text, new_text)
+
+
+def _legacy(doc, replacements):
+    for old_text, new_text in replacements:
+        if old_text and new_text is not None:
+            _replace_globally(doc, str(old_text), str(new_text))
+
+
+def _single_pass(doc, replacements):
+    PlaceholderMatcher(replacements).substitute_document(doc)
+
+
+def _time(fn, path, replacements, rounds):
+    best = float("inf")
+    for _ in range(rounds):
+        doc = Document(path)
+        start = time.perf_counter()
+        fn(doc, replacements)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'template':<14}{'legacy ms':>12}{'single-pass ms':>16}{'speedup':>10}")
+    for file_name in TEMPLATE_FILES:
+        path = os.path.join(BASE_DIR, file_name)
+        if not os.path.exists(path):
+            continue
+        replacements = build_replacements(_template_config(file_name), SAMPLE_PAYLOAD)
+        legacy_ms = _time(_legacy, path, replacements, args.rounds)
+        single_ms = _time(_single_pass, path, replacements, args.rounds)
+        print(f"{file_name:<14}{legacy_ms:>12.1f}{single_ms:>16.1f}{legacy_ms / max(single_ms, 1e-6):>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
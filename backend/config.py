@@ -11,3 +11,50 @@ GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY", "")
 GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
 MAX_IMAGE_WIDTH_INCHES = 6.2
 MAX_IMAGE_HEIGHT_INCHES = 8.0
+TEMPLATE_CACHE_MAX_BYTES = int(os.getenv("TEMPLATE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+TEMPLATE_INDEX_PATH = os.path.join(BASE_DIR, "templates.index.json")
+GENERATION_JOB_TIMEOUT = int(os.getenv("GENERATION_JOB_TIMEOUT", "600"))
+IMAGE_TARGET_DPI = int(os.getenv("IMAGE_TARGET_DPI", "200"))
+IMAGE_CACHE_DIR = os.path.join(BASE_DIR, "cache", "images")
+IMAGE_CACHE_MAX_BYTES = int(os.getenv("IMAGE_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+STREAM_SPOOL_MAX_BYTES = int(os.getenv("STREAM_SPOOL_MAX_BYTES", str(16 * 1024 * 1024)))
+# Lives under uploads/sha256/ so /uploads/<path> never serves it.
+BLOB_INDEX_PATH = os.path.join(UPLOAD_DIR, "sha256", "index.sqlite3")
+PACKAGE_DEFLATE_CACHE_MAX_BYTES = int(os.getenv("PACKAGE_DEFLATE_CACHE_MAX_BYTES", str(128 * 1024 * 1024)))
+RENDER_SESSION_CACHE_SIZE = int(os.getenv("RENDER_SESSION_CACHE_SIZE", "8"))
+# 0 uses one worker process per CPU.
+BATCH_MAX_WORKERS = int(os.getenv("BATCH_MAX_WORKERS", "0"))
+BATCH_JOB_TIMEOUT = int(os.getenv("BATCH_JOB_TIMEOUT", "3600"))
+IMAGE_POOL_WORKERS = int(os.getenv("IMAGE_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+DIAGRAM_REQUEST_TIMEOUT = int(os.getenv("DIAGRAM_REQUEST_TIMEOUT", "120"))
+DIAGRAM_BATCH_DEADLINE = int(os.getenv("DIAGRAM_BATCH_DEADLINE", "150"))
+DIAGRAM_BATCH_WORKERS = int(os.getenv("DIAGRAM_BATCH_WORKERS", "16"))
+# Concurrent outbound calls per host (HF router, Kroki).
+DIAGRAM_HOST_CONCURRENCY = int(os.getenv("DIAGRAM_HOST_CONCURRENCY", "6"))
+DIAGRAM_CACHE_DIR = os.path.join(BASE_DIR, "cache", "diagrams")
+DIAGRAM_CACHE_MAX_BYTES = int(os.getenv("DIAGRAM_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+# "kroki", "local" (pooled PlantUML JVM) or "auto" (local when PLANTUML_JAR and java exist).
+DIAGRAM_RENDERER = os.getenv("DIAGRAM_RENDERER", "auto").strip().lower()
+KROKI_BASE_URL = os.getenv("KROKI_BASE_URL", "https://kroki.io")
+PLANTUML_JAR = os.getenv("PLANTUML_JAR", "")
+PLANTUML_JAVA = os.getenv("PLANTUML_JAVA", "java")
+PLANTUML_POOL_SIZE = int(os.getenv("PLANTUML_POOL_SIZE", "2"))
+HF_REQUEST_TIMEOUT = int(os.getenv("HF_REQUEST_TIMEOUT", str(DIAGRAM_REQUEST_TIMEOUT)))
+KROKI_REQUEST_TIMEOUT = int(os.getenv("KROKI_REQUEST_TIMEOUT", str(DIAGRAM_REQUEST_TIMEOUT)))
+HTTP_RETRY_ATTEMPTS = int(os.getenv("HTTP_RETRY_ATTEMPTS", "3"))
+HTTP_RETRY_BACKOFF = float(os.getenv("HTTP_RETRY_BACKOFF", "0.5"))
+HTTP_RETRY_MAX_BACKOFF = float(os.getenv("HTTP_RETRY_MAX_BACKOFF", "8"))
+# Consecutive failures before a host's circuit opens, and how long it stays open.
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_SECONDS = float(os.getenv("CIRCUIT_RESET_SECONDS", "30"))
+AI_CACHE_PATH = os.path.join(BASE_DIR, "cache", "ai_responses.sqlite3")
+AI_CACHE_TTL = int(os.getenv("AI_CACHE_TTL", str(30 * 24 * 3600)))
+AI_CACHE_MAX_ENTRIES = int(os.getenv("AI_CACHE_MAX_ENTRIES", "5000"))
+# Opt-in token-set Jaccard similarity (e.g. 0.8) for serving near-duplicate titles; 0 disables it.
+AI_CACHE_SIMILARITY = float(os.getenv("AI_CACHE_SIMILARITY", "0"))
+# Per-section AI generation: concurrent calls, retries per section and a shared token budget.
+AI_SECTION_CONCURRENCY = int(os.getenv("AI_SECTION_CONCURRENCY", "4"))
+AI_SECTION_RETRIES = int(os.getenv("AI_SECTION_RETRIES", "2"))
+AI_SECTION_MAX_OUTPUT_TOKENS = int(os.getenv("AI_SECTION_MAX_OUTPUT_TOKENS", "1024"))
+AI_TOKENS_PER_MINUTE = int(os.getenv("AI_TOKENS_PER_MINUTE", "250000"))
+AI_GENERATION_MODE = os.getenv("AI_GENERATION_MODE", "single").strip().lower()
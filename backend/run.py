@@ -1,8 +1,25 @@
+import json
+import os
+
+import click
+from docx import Document
+
 from app import create_app
+from app.config import Config
 from app.extensions import db
+from app.models.project import Project
 from app.models.template import Template
+from app.services.plagiarism.corpus_index import corpus_index, document_sections
+from app.services.plagiarism.ngram_web_check import PHRASE_LENGTH, build_phrase_index
+from config import BASE_DIR, GENERATED_DIR, TEMPLATES_JSON_PATH
+from services.batch_service import generate_batch
+from services.diagram_cache import diagram_cache
+from services.diagram_service import warm_fallback_cache
+from services.template_service import TemplateService
 
 app = create_app()
+# Reference dumps are read in blocks of about this many bytes.
+REFERENCE_BLOCK_BYTES = 1 << 20
 
 
 @app.cli.command("seed_templates")
@@ -31,5 +48,113 @@ def seed_templates():
     print("Templates seeded")
 
 
+@app.cli.command("generate_batch")
+@click.argument("manifest", type=click.Path(exists=True, dir_okay=False))
+@click.option("--output", "-o", default=None, help="ZIP path (default: generated/<manifest>.zip).")
+@click.option("--workers", "-w", type=int, default=None, help="Worker processes (default: BATCH_MAX_WORKERS or CPU count).")
+def generate_batch_command(manifest, output, workers):
+    """Generate one report per student in MANIFEST and bundle them in a ZIP."""
+    with open(manifest, "r", encoding="utf-8") as fh:
+        data = json.load(fh)
+
+    template_info = TemplateService(TEMPLATES_JSON_PATH).get_template(data.get("selectedTemplate", ""))
+    if not template_info:
+        raise click.ClickException("Invalid template selected")
+
+    # Media and code file paths in the manifest are relative to the manifest itself.
+    manifest_dir = os.path.dirname(os.path.abspath(manifest))
+    stem = os.path.splitext(os.path.basename(manifest))[0]
+    output = output or os.path.join(GENERATED_DIR, f"{stem}.zip")
+
+    def report_progress(report):
+        done = report["completed"] + report["failed"]
+        click.echo(f"[{done}/{report['total']}] completed={report['completed']} failed={report['failed']}")
+
+    report = generate_batch(
+        template_path=os.path.join(BASE_DIR, template_info.get("file", "")),
+        template_config=template_info,
+        students=data.get("students") or [],
+        output_path=output,
+        resolve_path=lambda ref: os.path.join(manifest_dir, ref),
+        max_workers=workers,
+        on_progress=report_progress,
+    )
+    for item in report["items"]:
+        if item["status"] == "failed":
+            click.echo(f"  #{item['index'] + 1} {item['name'] or '?'}: {item['error']}")
+    click.echo(f"Batch written to {output}")
+
+
+@app.cli.command("warm_diagram_cache")
+@click.option("--title", "-t", "titles", multiple=True, help="Project title to warm (default: every project title in the database).")
+def warm_diagram_cache_command(titles):
+    """Pre-render every fallback diagram so repeat requests skip Kroki."""
+    titles = list(titles) or [title for (title,) in db.session.query(Project.title).distinct()]
+    if not titles:
+        raise click.ClickException("No project titles to warm; pass --title")
+    rendered = warm_fallback_cache(titles)
+    stats = diagram_cache.stats()
+    click.echo(f"Rendered {rendered} diagrams for {len(titles)} titles; cache holds {stats['entries']} entries ({stats['bytes']} bytes)")
+
+
+@app.cli.command("build_plagiarism_index")
+@click.option("--batch-size", "-b", type=int, default=200, help="Projects per commit.")
+def build_plagiarism_index_command(batch_size):
+    """Fingerprint every project's sections for cross-project plagiarism matches."""
+    projects = changed = 0
+    for (project_id,) in db.session.query(Project.id).order_by(Project.id).all():
+        changed += corpus_index.index_project(db.session.get(Project, project_id))
+        projects += 1
+        if projects % batch_size == 0:
+            db.session.commit()
+    db.session.commit()
+    click.echo(f"Indexed {projects} projects; {changed} sections updated")
+
+
+def _reference_texts(paths, include_projects):
+    """
+    Text from .txt/.md files (read in blocks, for large dumps) and .docx
+    reports under the given paths, plus every project's sections when asked.
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(os.path.join(root, name) for root, _, names in os.walk(path) for name in sorted(names))
+        else:
+            files.append(path)
+    for file_path in files:
+        extension = os.path.splitext(file_path)[1].lower()
+        if extension == ".docx":
+            yield "\n".join(paragraph.text for paragraph in Document(file_path).paragraphs)
+        elif extension in (".txt", ".md"):
+            with open(file_path, encoding="utf-8", errors="ignore") as handle:
+                tail = ""
+                while True:
+                    lines = handle.readlines(REFERENCE_BLOCK_BYTES)
+                    if not lines:
+                        break
+                    text = tail + "".join(lines)
+                    yield text
+                    # Phrases spanning the block boundary need the previous block's last words.
+                    tail = " ".join(text.rsplit(None, PHRASE_LENGTH - 1)[-(PHRASE_LENGTH - 1):]) + " "
+    if include_projects:
+        for (document,) in db.session.query(Project.document_json).yield_per(200):
+            yield "\n".join(text for _, text in document_sections(document))
+
+
+@app.cli.command("build_phrase_index")
+@click.argument("paths", nargs=-1, type=click.Path(exists=True))
+# Saved projects are off by default: the index cannot exclude the project being
+# checked, so each would match its own text. Cross-project copying is covered
+# by the corpus index (build_plagiarism_index).
+@click.option("--projects/--no-projects", default=False, help="Also index every project's saved document (they will then match themselves).")
+@click.option("--output", "-o", default=None, help="Index path (default: PHRASE_INDEX_PATH).")
+def build_phrase_index_command(paths, projects, output):
+    """Build the sampled 8-gram index used by the offline web n-gram check."""
+    output = output or Config.PHRASE_INDEX_PATH
+    count = build_phrase_index(_reference_texts(paths, projects), output)
+    click.echo(f"Indexed {count} phrases into {output} ({os.path.getsize(output)} bytes)")
+
+
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5000, debug=True)
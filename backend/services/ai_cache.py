@@ -0,0 +1,168 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+
+from config import AI_CACHE_MAX_ENTRIES, AI_CACHE_PATH, AI_CACHE_SIMILARITY, AI_CACHE_TTL
+
+# Words that do not change what a project is about.
+TITLE_STOPWORDS = frozenset({"a", "an", "and", "based", "for", "in", "of", "on", "project", "system", "the", "to", "using", "with"})
+
+
+def normalize_title(title: str) -> str:
+    """
+    Exact cache key for `title`: lowercased, with punctuation and runs of
+    whitespace collapsed to single spaces. Word order and every word are
+    kept, so only the same title hits.
+    """
+    return " ".join(re.findall(r"[a-z0-9]+", (title or "").lower()))
+
+
+def title_tokens(title: str) -> set:
+    """
+    Distinct words of `title` without stopwords, for near-duplicate
+    matching only. "Face-Recognition Attendance System" and "attendance
+    using face recognition" share the same tokens.
+    """
+    words = normalize_title(title).split()
+    return {word for word in words if word not in TITLE_STOPWORDS} or set(words)
+
+
+def _similarity(left: set, right: set) -> float:
+    if not left or not right:
+        return 0.0
+    return len(left & right) / len(left | right)
+
+
+class AIResponseCache:
+    """
+    Generated documentation keyed by normalized title (normalize_title),
+    model and prompt version in a small SQLite file. Entries expire after
+    `ttl` seconds and the least recently used are dropped beyond
+    `max_entries`. Only when
+    `similarity` is set (off by default) does a miss fall back to the closest
+    cached title whose token-set Jaccard similarity reaches it.
+    """
+
+    def __init__(self, path: str, ttl: int, max_entries: int, similarity: float = 0.0):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.similarity = similarity
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _connect(self):
+        Path(os.path.dirname(self.path)).mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "model TEXT NOT NULL, prompt_version TEXT NOT NULL, title_key TEXT NOT NULL, "
+            "response TEXT NOT NULL, created_at REAL NOT NULL, used_at REAL NOT NULL, "
+            "PRIMARY KEY (model, prompt_version, title_key))"
+        )
+        return conn
+
+    def _count(self, attr: str):
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + 1)
+
+    def get(self, title: str, model: str, prompt_version: str):
+        key = normalize_title(title)
+        if not key:
+            return None
+        now = time.time()
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT title_key, response FROM responses "
+                "WHERE model = ? AND prompt_version = ? AND title_key = ? AND created_at > ?",
+                (model, prompt_version, key, now - self.ttl),
+            ).fetchone()
+            counter = "hits"
+            if row is None and self.similarity > 0:
+                nearest = self._nearest(conn, title_tokens(key), model, prompt_version, now)
+                if nearest is not None:
+                    row = conn.execute(
+                        "SELECT title_key, response FROM responses WHERE model = ? AND prompt_version = ? AND title_key = ?",
+                        (model, prompt_version, nearest),
+                    ).fetchone()
+                counter = "near_hits"
+            if row is None:
+                self._count("misses")
+                return None
+            conn.execute(
+                "UPDATE responses SET used_at = ? WHERE model = ? AND prompt_version = ? AND title_key = ?",
+                (now, model, prompt_version, row[0]),
+            )
+        self._count(counter)
+        return json.loads(row[1])
+
+    def _nearest(self, conn, tokens: set, model: str, prompt_version: str, now: float):
+        # Score on the keys alone; only the winning response is read and parsed.
+        best, best_score = None, self.similarity
+        rows = conn.execute(
+            "SELECT title_key FROM responses WHERE model = ? AND prompt_version = ? AND created_at > ?",
+            (model, prompt_version, now - self.ttl),
+        )
+        for (title_key,) in rows:
+            score = _similarity(tokens, title_tokens(title_key))
+            if score >= best_score:
+                best, best_score = title_key, score
+        return best
+
+    def put(self, title: str, model: str, prompt_version: str, response: dict):
+        key = normalize_title(title)
+        if not key:
+            return
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (model, prompt_version, title_key, response, created_at, used_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (model, prompt_version, key, json.dumps(response), now, now),
+                )
+                expired = conn.execute("DELETE FROM responses WHERE created_at <= ?", (now - self.ttl,)).rowcount
+                overflow = conn.execute(
+                    "DELETE FROM responses WHERE rowid IN ("
+                    "SELECT rowid FROM responses ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                ).rowcount
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        with self._lock:
+            self.evictions += expired + overflow
+
+    def clear(self):
+        with closing(self._connect()) as conn:
+            conn.execute("DELETE FROM responses")
+
+    def stats(self) -> dict:
+        entries = 0
+        if os.path.exists(self.path):
+            with closing(self._connect()) as conn:
+                entries = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        with self._lock:
+            lookups = self.hits + self.near_hits + self.misses
+            return {
+                "entries": entries,
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "near_hits": self.near_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.near_hits) / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+
+ai_cache = AIResponseCache(AI_CACHE_PATH, AI_CACHE_TTL, AI_CACHE_MAX_ENTRIES, AI_CACHE_SIMILARITY)
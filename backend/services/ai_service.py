@@ -1,9 +1,27 @@
 import json
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 import google.generativeai as genai
 
-from config import GEMINI_MODEL, GOOGLE_API_KEY
+from config import (
+    AI_SECTION_CONCURRENCY,
+    AI_SECTION_MAX_OUTPUT_TOKENS,
+    AI_SECTION_RETRIES,
+    GEMINI_MODEL,
+    GOOGLE_API_KEY,
+)
+from services.ai_cache import ai_cache
+from services.json_stream import ObjectStreamParser
+from services.token_budget import ai_token_budget
+
+SECTION_RETRY_BACKOFF = 0.5
+
+# Bump whenever the documentation prompt changes, so cached responses for
+# the old prompt are no longer served.
+PROMPT_VERSION = "1"
 
 DOC_KEYS = [
     "doc_introduction",
@@ -21,7 +39,15 @@ DOC_KEYS = [
 
 
 class AIService:
-    def __init__(self):
+    def __init__(self, cache=None, token_budget=None):
+        self.cache = cache or ai_cache
+        self.token_budget = token_budget or ai_token_budget
+        # Bounds section calls across all concurrent requests in the process.
+        self._section_slots = threading.BoundedSemaphore(max(1, AI_SECTION_CONCURRENCY))
+        self._stats_lock = threading.Lock()
+        self.streams = 0
+        self.first_section_ms_total = 0.0
+        self.last_first_section_ms = None
         self.enabled = bool(GOOGLE_API_KEY)
         if self.enabled:
             genai.configure(api_key=GOOGLE_API_KEY)
@@ -43,6 +69,14 @@ class AIService:
             cleaned = re.sub(r"```$", "", cleaned).strip()
         return json.loads(cleaned)
 
+    def _prompt(self, project_title: str) -> str:
+        return f"""
+You are an expert academic writer.
+Generate complete project documentation for project title: {project_title}.
+Return ONLY JSON with keys exactly: {DOC_KEYS}
+Each key should contain structured academic paragraphs.
+"""
+
     def generate_documentation(self, project_title: str):
         if not project_title:
             raise ValueError("project_title is required")
@@ -50,14 +84,11 @@ class AIService:
         if not self.enabled:
             return self._fallback(project_title)
 
-        prompt = f"""
-You are an expert academic writer.
-Generate complete project documentation for project title: {project_title}.
-Return ONLY JSON with keys exactly: {DOC_KEYS}
-Each key should contain structured academic paragraphs.
-"""
+        cached = self.cache.get(project_title, GEMINI_MODEL, PROMPT_VERSION)
+        if cached is not None:
+            return cached
 
-        response = self.model.generate_content(prompt)
+        response = self.model.generate_content(self._prompt(project_title))
         raw = getattr(response, "text", "{}")
 
         try:
@@ -65,8 +96,155 @@ Each key should contain structured academic paragraphs.
         except Exception:
             return self._fallback(project_title)
 
+        complete = True
         for key in DOC_KEYS:
             if key not in data or not str(data.get(key, "")).strip():
                 data[key] = self._fallback(project_title)[key]
+                complete = False
 
+        # Responses patched with fallback drafts are not worth keeping.
+        if complete:
+            self.cache.put(project_title, GEMINI_MODEL, PROMPT_VERSION, data)
         return data
+
+    def _section_prompt(self, project_title: str, key: str) -> str:
+        title = key.replace("doc_", "").replace("_", " ")
+        return f"""
+You are an expert academic writer.
+Write the "{title}" section of the project documentation for project title: {project_title}.
+Return ONLY JSON with exactly one key: "{key}"
+It should contain structured academic paragraphs.
+"""
+
+    def _generate_section(self, project_title: str, key: str):
+        """
+        One section on its own, retried up to AI_SECTION_RETRIES times.
+        Returns (content or None, report).
+        """
+        prompt = self._section_prompt(project_title, key)
+        # Rough prompt size (4 characters a token) plus the longest answer.
+        estimate = len(prompt) // 4 + AI_SECTION_MAX_OUTPUT_TOKENS
+        started = time.perf_counter()
+        content = None
+        attempts = 0
+        while content is None and attempts <= AI_SECTION_RETRIES:
+            if attempts:
+                time.sleep(SECTION_RETRY_BACKOFF * 2 ** (attempts - 1))
+            attempts += 1
+            self.token_budget.reserve(estimate)
+            used = None
+            try:
+                with self._section_slots:
+                    response = self.model.generate_content(prompt)
+                used = getattr(getattr(response, "usage_metadata", None), "total_token_count", None)
+                value = self._parse_json(getattr(response, "text", "{}")).get(key)
+                if str(value or "").strip():
+                    content = value
+            except Exception:
+                pass
+            finally:
+                self.token_budget.settle(estimate, used)
+        return content, {
+            "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+            "attempts": attempts,
+            "fallback": content is None,
+        }
+
+    def generate_documentation_parallel(self, project_title: str):
+        """
+        Generate each DOC_KEYS section with its own prompt, concurrently, so
+        one slow or malformed answer only costs that section. Returns the
+        same dict as generate_documentation plus a timing report.
+        """
+        if not project_title:
+            raise ValueError("project_title is required")
+
+        started = time.perf_counter()
+        report = {"mode": "parallel", "source": "fallback", "sections": {}}
+        if not self.enabled:
+            data = self._fallback(project_title)
+        else:
+            data = self.cache.get(project_title, GEMINI_MODEL, PROMPT_VERSION)
+            report["source"] = "model" if data is None else "cache"
+        if data is None:
+            with ThreadPoolExecutor(max_workers=max(1, AI_SECTION_CONCURRENCY), thread_name_prefix="ai-sections") as pool:
+                futures = {key: pool.submit(self._generate_section, project_title, key) for key in DOC_KEYS}
+            fallback = self._fallback(project_title)
+            data = {}
+            for key, future in futures.items():
+                content, section_report = future.result()
+                data[key] = fallback[key] if content is None else content
+                report["sections"][key] = section_report
+            if not any(item["fallback"] for item in report["sections"].values()):
+                self.cache.put(project_title, GEMINI_MODEL, PROMPT_VERSION, data)
+
+        report["wall_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return data, report
+
+    def stream_documentation(self, project_title: str):
+        """
+        Like generate_documentation, but yields each section as soon as
+        Gemini's streamed JSON closes it: ("section", {"key", "content",
+        "fallback"}) events, then one ("done", {"documentation", ...}).
+        """
+        if not project_title:
+            raise ValueError("project_title is required")
+
+        started = time.perf_counter()
+        first_section_ms = None
+        data = {}
+        source = "fallback"
+
+        def section(key, content, fallback=False):
+            nonlocal first_section_ms
+            if first_section_ms is None:
+                first_section_ms = round((time.perf_counter() - started) * 1000, 1)
+            data[key] = content
+            return "section", {"key": key, "content": content, "fallback": fallback}
+
+        if self.enabled:
+            cached = self.cache.get(project_title, GEMINI_MODEL, PROMPT_VERSION)
+            if cached is not None:
+                source = "cache"
+                for key in DOC_KEYS:
+                    yield section(key, cached[key])
+            else:
+                source = "model"
+                parser = ObjectStreamParser()
+                try:
+                    for chunk in self.model.generate_content(self._prompt(project_title), stream=True):
+                        for key, value in parser.feed(getattr(chunk, "text", "") or ""):
+                            if key in DOC_KEYS and key not in data and str(value).strip():
+                                yield section(key, value)
+                except Exception:
+                    # Sections that did arrive are kept; the rest use drafts below.
+                    pass
+
+        complete = source != "fallback" and all(key in data for key in DOC_KEYS)
+        fallback = self._fallback(project_title)
+        for key in DOC_KEYS:
+            if key not in data:
+                yield section(key, fallback[key], fallback=True)
+
+        if complete and source == "model":
+            self.cache.put(project_title, GEMINI_MODEL, PROMPT_VERSION, data)
+        if source == "model":
+            with self._stats_lock:
+                self.streams += 1
+                self.first_section_ms_total += first_section_ms
+                self.last_first_section_ms = first_section_ms
+
+        yield "done", {
+            "documentation": {key: data[key] for key in DOC_KEYS},
+            "source": source,
+            "time_to_first_section_ms": first_section_ms,
+            "total_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+
+    def stream_stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "streams": self.streams,
+                "avg_time_to_first_section_ms": round(self.first_section_ms_total / self.streams, 1) if self.streams else None,
+                "last_time_to_first_section_ms": self.last_first_section_ms,
+            }
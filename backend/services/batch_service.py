@@ -0,0 +1,191 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from werkzeug.utils import secure_filename
+
+from config import BATCH_MAX_WORKERS
+from services.document_service import build_document, build_replacements
+from services.file_service import guess_language, validate_documentation, validate_student_details
+from services.image_service import use_image_pool
+from services.package_writer import write_package
+from services.placeholder_service import PlaceholderMatcher
+from services.template_cache import template_cache
+from services.template_index import template_index
+
+
+def _resolve(resolve_path, ref: str, label: str) -> str:
+    path = resolve_path(ref) if ref else None
+    if not path or not os.path.isfile(path):
+        raise ValueError(f"{label} not found: {ref}")
+    return path
+
+
+def prepare_student(student: dict, resolve_path) -> dict:
+    """
+    Validate one manifest entry and turn it into generate_document inputs.
+    Media and code file references are mapped to files by `resolve_path`.
+    Raises ValueError with a message suitable for the batch report.
+    """
+    if not isinstance(student, dict):
+        raise ValueError("Manifest entry must be an object")
+
+    student_details = student.get("studentDetails") or {}
+    missing = validate_student_details(student_details)
+    if missing:
+        raise ValueError(f"Missing required student fields: {', '.join(missing)}")
+    empty = validate_documentation(student.get("documentation") or {})
+    if empty:
+        raise ValueError(f"Documentation sections cannot be empty: {', '.join(empty)}")
+
+    code_items = []
+    for item in student.get("codeFiles") or []:
+        filename = item.get("filename") or item.get("name") or "code.txt"
+        content = item.get("content")
+        if content is None:
+            with open(_resolve(resolve_path, item.get("path"), "Code file"), "r", encoding="utf-8", errors="ignore") as fh:
+                content = fh.read()
+        code_items.append({"name": filename, "filename": filename, "language": guess_language(filename), "content": content})
+
+    def media(key, label):
+        return [
+            {"name": item.get("name") or label, "path": _resolve(resolve_path, item.get("path"), label)}
+            for item in student.get(key) or []
+        ]
+
+    return {
+        "payload": {
+            "studentDetails": student_details,
+            "documentation": student.get("documentation") or {},
+            "references": student.get("references") or [],
+        },
+        "code_items": code_items,
+        "screenshots": media("screenshots", "Screenshot"),
+        "diagrams": media("diagrams", "Diagram"),
+    }
+
+
+def _output_file_name(index: int, student_details: dict) -> str:
+    stem = secure_filename(str(student_details.get("name", ""))) or "student"
+    return f"{index + 1:03d}_{stem}.docx"
+
+
+def _build_student(template_path: str, template_config: dict, index: int, inputs: dict, bundle_dir: str) -> str:
+    doc = build_document(
+        template_path=template_path,
+        template_config=template_config,
+        payload=inputs["payload"],
+        code_items=inputs["code_items"],
+        screenshots=inputs["screenshots"],
+        diagrams=inputs["diagrams"],
+    )
+    file_name = _output_file_name(index, inputs["payload"]["studentDetails"])
+    write_package(doc, os.path.join(bundle_dir, file_name))
+    return file_name
+
+
+def _warm_template(template_path: str, template_config: dict):
+    template = template_cache.get(template_path)
+    literals = PlaceholderMatcher(build_replacements(template_config, {})).mapping
+    template_index.get(template_path, template.document, literals=literals)
+
+
+def _init_worker(template_path: str, template_config: dict):
+    # Builds already run one per process; nested image pools would oversubscribe.
+    use_image_pool(1)
+    _warm_template(template_path, template_config)
+
+
+def _pool_context():
+    # Forked workers inherit the template parsed by _warm_template.
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+
+def generate_batch(
+    template_path: str,
+    template_config: dict,
+    students: list,
+    output_path: str,
+    resolve_path=None,
+    max_workers: int | None = None,
+    on_progress=None,
+) -> dict:
+    """
+    Build one DOCX per manifest entry over a process pool and bundle them
+    with build_zip. The report (also written to metadata.json in the ZIP)
+    lists the status, output file or error of every entry.
+    `on_progress(report)` is called after each entry finishes.
+    """
+    # Imported lazily: the app package loads app.py, which imports this module.
+    from app.services.export.zip_builder import build_zip
+
+    if not os.path.exists(template_path):
+        raise FileNotFoundError(f"Template not found: {template_path}")
+
+    resolve_path = resolve_path or (lambda ref: ref)
+    report_progress = on_progress or (lambda report: None)
+    items = [
+        {"index": idx, "name": str(((student or {}).get("studentDetails") or {}).get("name", "")), "status": "pending"}
+        for idx, student in enumerate(students)
+    ]
+    report = {
+        "template": template_config.get("file") or os.path.basename(template_path),
+        "total": len(items),
+        "completed": 0,
+        "failed": 0,
+        "items": items,
+    }
+
+    def finish(idx, file_name=None, error=None):
+        if error is None:
+            items[idx].update({"status": "completed", "file": file_name})
+            report["completed"] += 1
+        else:
+            items[idx].update({"status": "failed", "error": error})
+            report["failed"] += 1
+        report_progress(report)
+
+    prepared = {}
+    for idx, student in enumerate(students):
+        try:
+            prepared[idx] = prepare_student(student, resolve_path)
+        except (ValueError, OSError) as exc:
+            finish(idx, error=str(exc))
+
+    _warm_template(template_path, template_config)
+    workers = max_workers or BATCH_MAX_WORKERS or os.cpu_count() or 1
+    workers = max(1, min(workers, len(prepared) or 1))
+
+    bundle_dir = tempfile.mkdtemp(prefix="blackbook_batch_")
+    try:
+        if workers == 1:
+            for idx, inputs in prepared.items():
+                try:
+                    finish(idx, _build_student(template_path, template_config, idx, inputs, bundle_dir))
+                except Exception as exc:
+                    finish(idx, error=str(exc))
+        else:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=_pool_context(),
+                initializer=_init_worker,
+                initargs=(template_path, template_config),
+            ) as pool:
+                futures = {
+                    pool.submit(_build_student, template_path, template_config, idx, inputs, bundle_dir): idx
+                    for idx, inputs in prepared.items()
+                }
+                for future in as_completed(futures):
+                    try:
+                        finish(futures[future], future.result())
+                    except Exception as exc:
+                        finish(futures[future], error=str(exc))
+
+        build_zip(bundle_dir, output_path, report)
+    finally:
+        shutil.rmtree(bundle_dir, ignore_errors=True)
+    return report
@@ -0,0 +1,165 @@
+import hashlib
+import io
+import os
+import re
+import sqlite3
+import tempfile
+from contextlib import closing
+from pathlib import Path
+
+from werkzeug.security import safe_join
+from werkzeug.utils import secure_filename
+
+from config import BLOB_INDEX_PATH, UPLOAD_DIR
+
+CHUNK_SIZE = 1024 * 1024
+BLOB_PREFIX = "sha256"
+BLOB_KEY_PATTERN = re.compile(r"sha256/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}(\.[a-z0-9]{1,10})?")
+
+
+def _blob_extension(filename: str) -> str:
+    ext = os.path.splitext(secure_filename(filename or ""))[1].lower()
+    return ext if re.fullmatch(r"\.[a-z0-9]{1,10}", ext) else ""
+
+
+class BlobStore:
+    """
+    Content-addressed upload store. Each distinct payload is written once
+    under sha256/ab/cd/<digest><ext> and reference counted in a small SQLite
+    index, so repeated uploads of the same file share one copy on disk.
+    """
+
+    def __init__(self, root: str, index_path: str):
+        self.root = os.path.abspath(root)
+        self.index_path = index_path
+
+    def _connect(self):
+        Path(os.path.dirname(self.index_path)).mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.index_path, timeout=30, isolation_level=None)
+        conn.execute("CREATE TABLE IF NOT EXISTS blobs (key TEXT PRIMARY KEY, size INTEGER NOT NULL, refs INTEGER NOT NULL)")
+        return conn
+
+    def _key(self, ref: str):
+        """
+        Map a blob key or an absolute path inside the store onto its key.
+        """
+        if os.path.isabs(ref):
+            ref = os.path.relpath(os.path.abspath(ref), self.root).replace(os.sep, "/")
+        return ref if BLOB_KEY_PATTERN.fullmatch(ref) else None
+
+    def key_for(self, ref: str):
+        """
+        Blob key (which names the content digest) for a key or a path inside
+        the store, or None for legacy uploads and files outside it.
+        """
+        return self._key(ref) if ref else None
+
+    def put(self, stream, filename: str = "") -> tuple[str, str]:
+        """
+        Hash `stream` while copying it to a temp file, then keep it under its
+        digest unless that blob already exists. Returns (key, absolute path).
+        """
+        tmp_dir = os.path.join(self.root, BLOB_PREFIX, "tmp")
+        Path(tmp_dir).mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                for chunk in iter(lambda: stream.read(CHUNK_SIZE), b""):
+                    digest.update(chunk)
+                    fh.write(chunk)
+                    size += len(chunk)
+
+            hexdigest = digest.hexdigest()
+            key = f"{BLOB_PREFIX}/{hexdigest[:2]}/{hexdigest[2:4]}/{hexdigest}{_blob_extension(filename)}"
+            path = os.path.join(self.root, *key.split("/"))
+
+            with closing(self._connect()) as conn:
+                # BEGIN IMMEDIATE serialises put/release across processes.
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    conn.execute(
+                        "INSERT INTO blobs (key, size, refs) VALUES (?, ?, 1) "
+                        "ON CONFLICT(key) DO UPDATE SET refs = refs + 1",
+                        (key, size),
+                    )
+                    if not os.path.exists(path):
+                        Path(os.path.dirname(path)).mkdir(parents=True, exist_ok=True)
+                        os.chmod(tmp_path, 0o644)
+                        os.replace(tmp_path, path)
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return key, path
+
+    def put_bytes(self, data: bytes, filename: str = "") -> tuple[str, str]:
+        return self.put(io.BytesIO(data), filename)
+
+    def resolve(self, ref: str):
+        """
+        Return the filesystem path for a blob key or a legacy flat upload
+        name, or None if there is no such file. Absolute paths pass through.
+        """
+        if not ref:
+            return None
+        if os.path.isabs(ref):
+            return ref
+        if BLOB_KEY_PATTERN.fullmatch(ref) or "/" not in ref:
+            path = safe_join(self.root, ref)
+            if path and os.path.isfile(path):
+                return path
+        return None
+
+    def release(self, ref: str) -> bool:
+        """
+        Drop one reference; the blob is deleted when none remain. Paths that
+        are not blobs (legacy uploads, files outside the store) are ignored.
+        """
+        key = self._key(ref) if ref else None
+        if key is None:
+            return False
+
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT refs FROM blobs WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    conn.execute("ROLLBACK")
+                    return False
+                if row[0] <= 1:
+                    conn.execute("DELETE FROM blobs WHERE key = ?", (key,))
+                    path = os.path.join(self.root, *key.split("/"))
+                    if os.path.exists(path):
+                        os.remove(path)
+                else:
+                    conn.execute("UPDATE blobs SET refs = refs - 1 WHERE key = ?", (key,))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return True
+
+    def refs(self, ref: str) -> int:
+        key = self._key(ref) if ref else None
+        if key is None:
+            return 0
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT refs FROM blobs WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else 0
+
+    def stats(self) -> dict:
+        if not os.path.exists(self.index_path):
+            return {"blobs": 0, "bytes": 0, "refs": 0}
+        with closing(self._connect()) as conn:
+            blobs, total_bytes, total_refs = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(refs), 0) FROM blobs"
+            ).fetchone()
+        return {"blobs": blobs, "bytes": total_bytes, "refs": total_refs}
+
+
+blob_store = BlobStore(UPLOAD_DIR, BLOB_INDEX_PATH)
@@ -0,0 +1,138 @@
+import hashlib
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+from config import DIAGRAM_CACHE_DIR, DIAGRAM_CACHE_MAX_BYTES
+
+
+def normalize_source(source: str) -> str:
+    """
+    Line endings and trailing whitespace do not change a rendered diagram.
+    """
+    lines = (source or "").replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip()
+
+
+class DiagramRenderCache:
+    """
+    Rendered diagram images on disk, keyed by the SHA-256 of the normalized
+    diagram source and output format. Hits touch the file's mtime, and the
+    least recently used files are evicted once the cache exceeds max_bytes.
+    Several processes may share the directory; each rescans it on eviction.
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total_bytes = None
+        self._entries = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(source: str, fmt: str) -> str:
+        return hashlib.sha256(f"{fmt}\0{normalize_source(source)}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str, fmt: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.{fmt}")
+
+    def _scan(self):
+        files = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+        return files
+
+    def _ensure_totals(self):
+        if self._total_bytes is None:
+            files = self._scan()
+            self._total_bytes = sum(size for _, size, _ in files)
+            self._entries = len(files)
+
+    def get(self, source: str, fmt: str = "png"):
+        path = self._path(self.key(source, fmt), fmt)
+        try:
+            with open(path, "rb") as fh:
+                data = fh.read()
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def put(self, source: str, fmt: str, data: bytes):
+        if len(data) > self.max_bytes:
+            return
+        path = self._path(self.key(source, fmt), fmt)
+        Path(os.path.dirname(path)).mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.chmod(tmp_path, 0o644)
+
+        with self._lock:
+            self._ensure_totals()
+            existed = os.path.exists(path)
+            previous = os.path.getsize(path) if existed else 0
+            os.replace(tmp_path, path)
+            self._total_bytes += len(data) - previous
+            self._entries += 0 if existed else 1
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        files = sorted(self._scan())
+        total = sum(size for _, size, _ in files)
+        count = len(files)
+        for _, size, path in files:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            count -= 1
+            self.evictions += 1
+        self._total_bytes = total
+        self._entries = count
+
+    def render(self, source: str, fmt: str, renderer) -> bytes:
+        """
+        Return the cached image for `source`, or call renderer(source) and
+        cache what it returns.
+        """
+        data = self.get(source, fmt)
+        if data is None:
+            data = renderer(source)
+            self.put(source, fmt, data)
+        return data
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._ensure_totals()
+            lookups = self.hits + self.misses
+            return {
+                "entries": self._entries,
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+
+diagram_cache = DiagramRenderCache(DIAGRAM_CACHE_DIR, DIAGRAM_CACHE_MAX_BYTES)
@@ -0,0 +1,224 @@
+import os
+import queue
+import select
+import shutil
+import subprocess
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+
+from config import DIAGRAM_RENDERER, KROKI_BASE_URL, KROKI_REQUEST_TIMEOUT, PLANTUML_JAR, PLANTUML_JAVA, PLANTUML_POOL_SIZE
+from services import http_transport
+
+
+class BaseRenderer(ABC):
+    """
+    Turns diagram source text into image bytes.
+    """
+
+    name = "base"
+    languages = frozenset()
+
+    def available(self) -> bool:
+        return True
+
+    def supports(self, language: str) -> bool:
+        return language in self.languages
+
+    @abstractmethod
+    def render(self, source: str, language: str = "plantuml", fmt: str = "png", deadline=None) -> bytes:
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {"name": self.name}
+
+
+class KrokiRenderer(BaseRenderer):
+    """
+    Renders through a Kroki server (https://kroki.io by default).
+    """
+
+    name = "kroki"
+    languages = frozenset({"plantuml", "mermaid"})
+
+    def __init__(self, base_url: str = KROKI_BASE_URL):
+        self.base_url = base_url.rstrip("/")
+
+    def url(self, language: str, fmt: str) -> str:
+        return f"{self.base_url}/{language}/{fmt}"
+
+    def render(self, source: str, language: str = "plantuml", fmt: str = "png", deadline=None) -> bytes:
+        response = http_transport.post(
+            self.url(language, fmt),
+            deadline,
+            KROKI_REQUEST_TIMEOUT,
+            headers={"Content-Type": "text/plain"},
+            data=source.encode("utf-8"),
+        )
+        if not response.ok:
+            message = f"Kroki rendering failed with status {response.status_code}"
+            if response.text:
+                message = response.text[:300]
+            raise ValueError(message)
+        return response.content
+
+
+class _PipeProcess:
+    """
+    One long-lived `plantuml -pipe` process. Each diagram written to stdin
+    comes back on stdout followed by a delimiter line.
+    """
+
+    def __init__(self, command, fmt: str):
+        self.delimiter = f"--blackbook-{uuid.uuid4().hex}--".encode("ascii")
+        self.proc = subprocess.Popen(
+            [*command, "-pipe", f"-t{fmt}", "-charset", "UTF-8", "-pipedelimitor", self.delimiter.decode("ascii")],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        self._buffer = bytearray()
+
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def render(self, source: str, timeout: float) -> bytes:
+        self.proc.stdin.write(source.rstrip().encode("utf-8") + b"\n")
+        self.proc.stdin.flush()
+
+        fd = self.proc.stdout.fileno()
+        end = time.monotonic() + timeout
+        while True:
+            idx = self._buffer.find(self.delimiter)
+            if idx != -1:
+                data = bytes(self._buffer[:idx])
+                del self._buffer[: idx + len(self.delimiter)]
+                # Drop the newline after the delimiter and the one before it.
+                while self._buffer[:1] in (b"\r", b"\n"):
+                    del self._buffer[:1]
+                return data.strip(b"\r\n")
+            left = end - time.monotonic()
+            if left <= 0 or not select.select([fd], [], [], left)[0]:
+                raise TimeoutError("Local PlantUML rendering timed out.")
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                raise RuntimeError("Local PlantUML process exited.")
+            self._buffer += chunk
+
+    def close(self):
+        if self.alive():
+            self.proc.kill()
+        self.proc.wait()
+
+
+class LocalPlantUMLRenderer(BaseRenderer):
+    """
+    Renders PlantUML with a pool of warm `java -jar plantuml.jar -pipe`
+    processes, so each diagram skips the JVM start-up and the network.
+    """
+
+    name = "local"
+    languages = frozenset({"plantuml"})
+
+    def __init__(self, jar_path: str = PLANTUML_JAR, java: str = PLANTUML_JAVA, pool_size: int = PLANTUML_POOL_SIZE, command=None):
+        self.jar_path = jar_path
+        self.java = java
+        self.pool_size = max(1, pool_size)
+        self.command = command or [java, "-Djava.awt.headless=true", "-jar", jar_path]
+        self._idle = {}
+        self._started = {}
+        self._lock = threading.Lock()
+        self.renders = 0
+        self.restarts = 0
+
+    def available(self) -> bool:
+        if self.command[0] != self.java:
+            return True
+        return bool(self.jar_path and os.path.isfile(self.jar_path) and shutil.which(self.java))
+
+    def _checkout(self, fmt: str, timeout: float) -> _PipeProcess:
+        with self._lock:
+            idle = self._idle.setdefault(fmt, queue.LifoQueue())
+            if idle.empty() and self._started.get(fmt, 0) < self.pool_size:
+                self._started[fmt] = self._started.get(fmt, 0) + 1
+                try:
+                    return _PipeProcess(self.command, fmt)
+                except OSError:
+                    self._started[fmt] -= 1
+                    raise
+        try:
+            return idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError("Timed out waiting for a local PlantUML process.") from None
+
+    def _discard(self, fmt: str, process: _PipeProcess):
+        process.close()
+        with self._lock:
+            self._started[fmt] -= 1
+            self.restarts += 1
+
+    def render(self, source: str, language: str = "plantuml", fmt: str = "png", deadline=None) -> bytes:
+        if language != "plantuml":
+            raise ValueError(f"Local renderer does not support {language}")
+        timeout = http_transport.remaining(deadline)
+        process = self._checkout(fmt, timeout)
+        try:
+            data = process.render(source, http_transport.remaining(deadline))
+        except BaseException:
+            # Its output stream is now out of step with its input.
+            self._discard(fmt, process)
+            raise
+        if not process.alive():
+            self._discard(fmt, process)
+        else:
+            self._idle[fmt].put(process)
+        with self._lock:
+            self.renders += 1
+        return data
+
+    def close(self):
+        with self._lock:
+            for fmt, idle in self._idle.items():
+                while not idle.empty():
+                    idle.get_nowait().close()
+                    self._started[fmt] -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "name": self.name,
+                "processes": dict(self._started),
+                "pool_size": self.pool_size,
+                "renders": self.renders,
+                "restarts": self.restarts,
+            }
+
+
+_renderers = {}
+_renderers_lock = threading.Lock()
+
+
+def _build(name: str) -> BaseRenderer:
+    if name == "kroki":
+        return KrokiRenderer()
+    if name == "local":
+        return LocalPlantUMLRenderer()
+    raise ValueError(f"Unknown diagram renderer: {name}")
+
+
+def get_renderer(language: str = "plantuml") -> BaseRenderer:
+    """
+    Renderer selected by DIAGRAM_RENDERER: "kroki", "local", or "auto"
+    (local when a PlantUML jar and java are installed, else Kroki).
+    Languages the local backend cannot draw always go to Kroki.
+    """
+    choice = DIAGRAM_RENDERER
+    with _renderers_lock:
+        if choice == "auto":
+            local = _renderers.get("local") or _renderers.setdefault("local", _build("local"))
+            choice = "local" if local.available() else "kroki"
+        renderer = _renderers.get(choice) or _renderers.setdefault(choice, _build(choice))
+        if not renderer.supports(language):
+            renderer = _renderers.get("kroki") or _renderers.setdefault("kroki", _build("kroki"))
+        return renderer
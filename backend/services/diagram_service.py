@@ -0,0 +1,457 @@
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import requests
+
+from config import DIAGRAM_BATCH_DEADLINE, DIAGRAM_BATCH_WORKERS, HF_REQUEST_TIMEOUT
+from services import http_transport
+from services.blob_store import blob_store
+from services.diagram_cache import diagram_cache
+from services.diagram_renderers import get_renderer
+
+HF_ROUTER_BASE_URL = "https://router.huggingface.co/hf-inference/models"
+HF_DIAGRAM_MODEL_IDS = [
+    # Requested legacy ID.
+    "runwayml/stable-diffusion-v1-5",
+    # Current canonical ID on Hugging Face Hub.
+    "stable-diffusion-v1-5/stable-diffusion-v1-5",
+    # Fallback model currently supported by HF Inference Router.
+    "stabilityai/stable-diffusion-xl-base-1.0",
+]
+HF_PLANTUML_MODEL = "HuggingFaceH4/zephyr-7b-beta"
+# Diagram types offered by the diagrams manager, each with its own fallback.
+FALLBACK_DIAGRAM_TYPES = [
+    "Event Table",
+    "Entity Relationship Diagram",
+    "Class Diagram",
+    "Activity Diagram",
+    "Use Case Diagram",
+    "Sequence Diagram",
+    "Component Diagram",
+    "Deployment Diagram",
+    "Database Diagram",
+]
+
+_executor = ThreadPoolExecutor(max_workers=DIAGRAM_BATCH_WORKERS, thread_name_prefix="diagrams")
+
+
+def _build_plantuml_prompt(project_title: str, diagram_type: str) -> str:
+    """
+    Build a strict prompt that asks the model to return only valid PlantUML.
+    """
+    return (
+        "Generate valid PlantUML code ONLY (including @startuml and @enduml)\n"
+        f'for a {diagram_type} for a final year engineering project titled "{project_title}".\n\n'
+        "Rules:\n"
+        "- Academic style\n"
+        "- Clean UML\n"
+        "- Proper entities, actors, relationships\n"
+        "- No explanation text\n"
+        "- Return only PlantUML code"
+    )
+
+
+def _extract_text_from_hf_response(payload) -> str:
+    """
+    Normalize HF response payload into plain text.
+    """
+    if isinstance(payload, str):
+        return payload
+    if isinstance(payload, list):
+        parts = []
+        for item in payload:
+            if isinstance(item, str):
+                parts.append(item)
+            elif isinstance(item, dict):
+                parts.append(str(item.get("generated_text") or item.get("text") or item.get("summary_text") or ""))
+        return "\n".join(p for p in parts if p).strip()
+    if isinstance(payload, dict):
+        return str(
+            payload.get("generated_text")
+            or payload.get("text")
+            or payload.get("output_text")
+            or payload.get("answer")
+            or ""
+        ).strip()
+    return ""
+
+
+def _extract_plantuml_block(text: str) -> str:
+    """
+    Extract only the PlantUML block from model output.
+    """
+    if not text:
+        raise ValueError("Empty response from Hugging Face model.")
+
+    start = text.find("@startuml")
+    end = text.find("@enduml")
+    if start == -1 or end == -1 or end < start:
+        raise ValueError("Model did not return valid PlantUML with @startuml and @enduml.")
+
+    return text[start : end + len("@enduml")].strip()
+
+
+def _is_plantuml_suitable_for_type(plantuml_code: str, diagram_type: str) -> bool:
+    """
+    Validate whether generated PlantUML resembles the requested diagram type.
+    """
+    code = (plantuml_code or "").lower()
+    # Ignore title/comment lines so keyword checks do not get false positives.
+    structural = "\n".join(
+        line for line in code.splitlines() if not line.strip().startswith("title ")
+    )
+    dtype = (diagram_type or "").lower()
+
+    # Reject common generic use-case shape for non use-case requests.
+    generic_usecase = (
+        "actor " in structural
+        and "usecase " in structural
+        and "rectangle system" in structural
+    )
+    if generic_usecase and "use case" not in dtype:
+        return False
+
+    if "event table" in dtype:
+        return bool(re.search(r"^\s*class\s+eventtable\b", structural, re.MULTILINE))
+    if "entity relationship" in dtype or dtype.strip() == "er":
+        return bool(re.search(r"^\s*entity\s+[a-z0-9_]+", structural, re.MULTILINE))
+    if "class" in dtype:
+        return bool(re.search(r"^\s*class\s+[a-z0-9_]+", structural, re.MULTILINE))
+    if "activity" in dtype:
+        return "start" in structural and "stop" in structural
+    if "use case" in dtype:
+        return "usecase " in structural and "actor " in structural
+    if "sequence" in dtype:
+        return "->" in structural and "participant " in structural
+    if "component" in dtype:
+        return "[" in structural and "]" in structural
+    if "deployment" in dtype:
+        return bool(re.search(r"^\s*node\s+", structural, re.MULTILINE))
+    if "database" in dtype:
+        return bool(
+            re.search(r"^\s*database\s+", structural, re.MULTILINE)
+            or re.search(r"^\s*entity\s+[a-z0-9_]+", structural, re.MULTILINE)
+        )
+    return True
+
+
+def _fallback_plantuml(project_title: str, diagram_type: str) -> str:
+    """
+    Fallback PlantUML when model output is unavailable (e.g., model 404).
+    Keeps the HF->PlantUML->Kroki flow operational.
+    """
+    safe_title = (project_title or "Project").replace('"', "'")
+    safe_type = (diagram_type or "UML Diagram").replace('"', "'").lower()
+
+    if "event table" in safe_type:
+        return (
+            "@startuml\n"
+            f"title Event Table - {safe_title}\n"
+            "class EventTable {\n"
+            "  +Event: string\n"
+            "  +Trigger: string\n"
+            "  +Input: string\n"
+            "  +Output: string\n"
+            "}\n"
+            "note right of EventTable\n"
+            "Login | Credentials | User/Pass | Session\n"
+            "Add Entry | Form Submit | Student Data | Record\n"
+            "Generate Report | Export Click | Filters | Report\n"
+            "end note\n"
+            "@enduml"
+        )
+
+    if "entity relationship" in safe_type or "er" == safe_type:
+        return (
+            "@startuml\n"
+            f"title Entity Relationship Diagram - {safe_title}\n"
+            "entity STUDENT {\n"
+            "  *student_id : int\n"
+            "  --\n"
+            "  name : string\n"
+            "  email : string\n"
+            "}\n"
+            "entity SUBJECT {\n"
+            "  *subject_id : int\n"
+            "  subject_name : string\n"
+            "}\n"
+            "entity ATTENDANCE {\n"
+            "  *attendance_id : int\n"
+            "  date : date\n"
+            "  status : string\n"
+            "}\n"
+            "STUDENT ||--o{ ATTENDANCE : marks\n"
+            "SUBJECT ||--o{ ATTENDANCE : for\n"
+            "@enduml"
+        )
+
+    if "class" in safe_type:
+        return (
+            "@startuml\n"
+            f"title Class Diagram - {safe_title}\n"
+            "class User {\n"
+            "  +id: int\n"
+            "  +name: string\n"
+            "  +login()\n"
+            "}\n"
+            "class Student {\n"
+            "  +rollNo: string\n"
+            "  +viewReport()\n"
+            "}\n"
+            "class Admin {\n"
+            "  +uploadData()\n"
+            "  +generateReport()\n"
+            "}\n"
+            "class AttendanceService {\n"
+            "  +markAttendance()\n"
+            "  +getAttendance()\n"
+            "}\n"
+            "User <|-- Student\n"
+            "User <|-- Admin\n"
+            "Admin --> AttendanceService\n"
+            "Student --> AttendanceService\n"
+            "@enduml"
+        )
+
+    if "activity" in safe_type:
+        return (
+            "@startuml\n"
+            f"title Activity Diagram - {safe_title}\n"
+            "start\n"
+            ":User Login;\n"
+            "if (Valid?) then (Yes)\n"
+            "  :Open Dashboard;\n"
+            "  :Capture/Submit Data;\n"
+            "  :Process Attendance;\n"
+            "  :Generate Report;\n"
+            "else (No)\n"
+            "  :Show Error;\n"
+            "endif\n"
+            "stop\n"
+            "@enduml"
+        )
+
+    if "use case" in safe_type:
+        return (
+            "@startuml\n"
+            f"title Use Case Diagram - {safe_title}\n"
+            "left to right direction\n"
+            "actor Student\n"
+            "actor Admin\n"
+            "rectangle System {\n"
+            "  usecase \"Login\" as UC1\n"
+            "  usecase \"Submit Data\" as UC2\n"
+            "  usecase \"Mark Attendance\" as UC3\n"
+            "  usecase \"Generate Report\" as UC4\n"
+            "}\n"
+            "Student --> UC1\n"
+            "Student --> UC4\n"
+            "Admin --> UC1\n"
+            "Admin --> UC2\n"
+            "Admin --> UC3\n"
+            "Admin --> UC4\n"
+            "@enduml"
+        )
+
+    if "sequence" in safe_type:
+        return (
+            "@startuml\n"
+            f"title Sequence Diagram - {safe_title}\n"
+            "actor User\n"
+            "participant UI\n"
+            "participant API\n"
+            "participant DB\n"
+            "User -> UI: Submit data\n"
+            "UI -> API: POST /attendance\n"
+            "API -> DB: Save record\n"
+            "DB --> API: OK\n"
+            "API --> UI: Success response\n"
+            "UI --> User: Show confirmation\n"
+            "@enduml"
+        )
+
+    if "component" in safe_type:
+        return (
+            "@startuml\n"
+            f"title Component Diagram - {safe_title}\n"
+            "[Web UI] --> [Flask API]\n"
+            "[Flask API] --> [AI Service]\n"
+            "[Flask API] --> [Document Service]\n"
+            "[Document Service] --> [DOCX Templates]\n"
+            "[Flask API] --> [Database]\n"
+            "@enduml"
+        )
+
+    if "deployment" in safe_type:
+        return (
+            "@startuml\n"
+            f"title Deployment Diagram - {safe_title}\n"
+            "node \"Client Browser\" {\n"
+            "  component \"React Frontend\"\n"
+            "}\n"
+            "node \"Application Server\" {\n"
+            "  component \"Flask Backend\"\n"
+            "}\n"
+            "node \"Storage\" {\n"
+            "  database \"SQLite/DB\"\n"
+            "  folder \"Uploads\"\n"
+            "}\n"
+            "\"React Frontend\" --> \"Flask Backend\"\n"
+            "\"Flask Backend\" --> \"SQLite/DB\"\n"
+            "\"Flask Backend\" --> \"Uploads\"\n"
+            "@enduml"
+        )
+
+    if "database" in safe_type:
+        return (
+            "@startuml\n"
+            f"title Database Model - {safe_title}\n"
+            "entity USERS {\n"
+            "  *id : int\n"
+            "  name : string\n"
+            "  role : string\n"
+            "}\n"
+            "entity PROJECTS {\n"
+            "  *id : int\n"
+            "  title : string\n"
+            "  user_id : int\n"
+            "}\n"
+            "entity DIAGRAMS {\n"
+            "  *id : int\n"
+            "  project_id : int\n"
+            "  type : string\n"
+            "  filename : string\n"
+            "}\n"
+            "USERS ||--o{ PROJECTS\n"
+            "PROJECTS ||--o{ DIAGRAMS\n"
+            "@enduml"
+        )
+
+    return (
+        "@startuml\n"
+        f"title UML Diagram - {safe_title}\n"
+        "actor User\n"
+        "rectangle System {\n"
+        "  usecase \"Login\" as UC1\n"
+        "  usecase \"Generate Report\" as UC2\n"
+        "}\n"
+        "User --> UC1\n"
+        "User --> UC2\n"
+        "@enduml"
+    )
+
+
+def _generate_plantuml_via_hf(project_title: str, diagram_type: str, hf_api_key: str, deadline=None) -> str:
+    """
+    Call Hugging Face text model and return cleaned PlantUML.
+    """
+    prompt = _build_plantuml_prompt(project_title, diagram_type)
+    model_url = f"{HF_ROUTER_BASE_URL}/{HF_PLANTUML_MODEL}"
+    headers = {
+        "Authorization": f"Bearer {hf_api_key}",
+        "Content-Type": "application/json",
+    }
+    try:
+        response = http_transport.post(
+            model_url,
+            deadline,
+            HF_REQUEST_TIMEOUT,
+            headers=headers,
+            json={"inputs": prompt, "options": {"wait_for_model": True}},
+        )
+        if not response.ok:
+            message = f"Hugging Face request failed with status {response.status_code}"
+            try:
+                err = response.json()
+                if isinstance(err, dict):
+                    message = err.get("error") or err.get("message") or message
+            except ValueError:
+                if response.text:
+                    message = response.text[:300]
+
+            # If model is unavailable in router, use safe fallback PlantUML.
+            if response.status_code == 404:
+                return _fallback_plantuml(project_title, diagram_type)
+            raise ValueError(message)
+
+        payload = response.json()
+        raw_text = _extract_text_from_hf_response(payload)
+        candidate = _extract_plantuml_block(raw_text)
+        if not _is_plantuml_suitable_for_type(candidate, diagram_type):
+            return _fallback_plantuml(project_title, diagram_type)
+        return candidate
+    except Exception:
+        return _fallback_plantuml(project_title, diagram_type)
+
+
+def render_plantuml(plantuml_code: str, deadline=None) -> bytes:
+    """
+    PNG bytes for `plantuml_code`, from the render cache when possible,
+    otherwise from the configured renderer (see get_renderer).
+    """
+    renderer = get_renderer("plantuml")
+    return diagram_cache.render(plantuml_code, "png", lambda source: renderer.render(source, "plantuml", "png", deadline))
+
+
+def warm_fallback_cache(project_titles) -> int:
+    """
+    Pre-render every fallback diagram for `project_titles`. Fallback sources
+    embed the title, so the cache is warmed per title. Returns the number
+    of diagrams that had to be rendered.
+    """
+    renderer = get_renderer("plantuml")
+    rendered = 0
+    for title in dict.fromkeys(project_titles):
+        for diagram_type in FALLBACK_DIAGRAM_TYPES:
+            source = _fallback_plantuml(title, diagram_type)
+            if diagram_cache.get(source, "png") is None:
+                diagram_cache.put(source, "png", renderer.render(source, "plantuml", "png"))
+                rendered += 1
+    return rendered
+
+
+def generate_diagram(project_title: str, diagram_type: str, hf_api_key: str, deadline=None) -> str:
+    """
+    HF -> PlantUML -> Kroki PNG for one diagram type; returns the blob key
+    of the saved image. `deadline` is a time.monotonic() value.
+    """
+    plantuml_code = _generate_plantuml_via_hf(project_title, diagram_type, hf_api_key, deadline)
+    image_bytes = render_plantuml(plantuml_code, deadline)
+    if deadline is not None and time.monotonic() >= deadline:
+        # The caller has already reported this diagram as timed out; a stored
+        # blob would hold a reference nobody releases.
+        raise TimeoutError("Diagram generation deadline exceeded.")
+    filename, _ = blob_store.put_bytes(image_bytes, "diagram.png")
+    return filename
+
+
+def generate_diagram_set(project_title: str, diagram_types, hf_api_key: str, timeout: float = DIAGRAM_BATCH_DEADLINE) -> list:
+    """
+    Generate every requested diagram type concurrently, so a full set takes
+    about as long as its slowest diagram. Returns one result per type, in
+    request order, with either a `filename` or an `error`.
+    """
+    deadline = time.monotonic() + timeout
+    futures = [
+        _executor.submit(generate_diagram, project_title, diagram_type, hf_api_key, deadline)
+        for diagram_type in diagram_types
+    ]
+    wait(futures, timeout=timeout)
+
+    results = []
+    for diagram_type, future in zip(diagram_types, futures):
+        if not future.done():
+            # Only drops it if it has not started. A running render cannot be
+            # interrupted; it finishes in the background and, being past the
+            # deadline, skips storing its image.
+            future.cancel()
+            results.append({"diagram_type": diagram_type, "status": "error", "error": "Diagram generation deadline exceeded."})
+            continue
+        try:
+            results.append({"diagram_type": diagram_type, "status": "success", "filename": future.result()})
+        except requests.RequestException as exc:
+            results.append({"diagram_type": diagram_type, "status": "error", "error": f"External request failed: {exc}"})
+        except Exception as exc:
+            results.append({"diagram_type": diagram_type, "status": "error", "error": str(exc)})
+    return results
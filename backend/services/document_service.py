@@ -1,4 +1,8 @@
+import copy
+import hashlib
+import json
 import os
+import tempfile
 import uuid
 from pathlib import Path
 from typing import Optional
@@ -8,10 +12,18 @@ from docx.enum.text import WD_ALIGN_PARAGRAPH, WD_LINE_SPACING
 from docx.oxml import OxmlElement
 from docx.oxml.ns import qn
 from docx.shared import Inches, Pt
-from PIL import Image
-
-from config import GENERATED_DIR, MAX_IMAGE_HEIGHT_INCHES, MAX_IMAGE_WIDTH_INCHES
+from docx.text.paragraph import Paragraph
+
+from config import GENERATED_DIR, STREAM_SPOOL_MAX_BYTES
+from services.blob_store import blob_store
+from services.image_probe import probe_image
+from services.image_service import fit_image_inches, normalize_image, prepare_images
+from services.package_writer import write_package
+from services.placeholder_service import PlaceholderMatcher
 from services.preview_service import DOC_KEYS
+from services.render_sessions import RenderSession, render_sessions
+from services.template_cache import template_cache
+from services.template_index import template_index
 
 CODE_PLACEHOLDER = "[[CODE_IMPLEMENTATION_BLOCK]]"
 SCREENSHOT_PLACEHOLDER = "[[SCREENSHOT_BLOCK]]"
@@ -41,6 +53,7 @@ PLAGIARISM_PLACEHOLDERS = {
     "[[PLAGIARISM_REPORT]]",
     "[[PLAGARISM_REPORT]]",
 }
+BLOCK_PLACEHOLDERS = {CODE_PLACEHOLDER} | SCREENSHOT_PLACEHOLDERS | DIAGRAM_PLACEHOLDERS | PLAGIARISM_PLACEHOLDERS
 
 
 def _sanitize_xml_text(value):
@@ -53,48 +66,6 @@ def _sanitize_xml_text(value):
     )
 
 
-def _replace_text_paragraph(paragraph, old_text: str, new_text: str):
-    if not old_text:
-        return False
-    new_text = _sanitize_xml_text(new_text)
-
-    # Prefer in-run replacement to preserve template formatting.
-    replaced = False
-    for run in paragraph.runs:
-        if old_text in run.text:
-            run.text = run.text.replace(old_text, new_text)
-            replaced = True
-
-    if replaced:
-        return True
-
-    # Handle placeholders split across multiple runs while keeping the first run style.
-    full_text = "".join(run.text for run in paragraph.runs)
-    if old_text in full_text and paragraph.runs:
-        updated = full_text.replace(old_text, new_text)
-        paragraph.runs[0].text = updated
-        for run in paragraph.runs[1:]:
-            run.text = ""
-        return True
-
-    if old_text in paragraph.text:
-        paragraph.text = paragraph.text.replace(old_text, new_text)
-        return True
-
-    return False
-
-
-def _replace_text_globally(doc: Document, old_text: str, new_text: str):
-    for paragraph in doc.paragraphs:
-        _replace_text_paragraph(paragraph, old_text, new_text)
-
-    for table in doc.tables:
-        for row in table.rows:
-            for cell in row.cells:
-                for paragraph in cell.paragraphs:
-                    _replace_text_paragraph(paragraph, old_text, new_text)
-
-
 def _set_run_font(run, size=12, bold=False):
     run.bold = bold
     run.font.name = "Times New Roman"
@@ -124,28 +95,32 @@ def _apply_body_style(paragraph):
 
 
 def _resize_image(path: str):
-    img = Image.open(path)
-    w, h = img.size
-    if w == 0 or h == 0:
-        return MAX_IMAGE_WIDTH_INCHES, MAX_IMAGE_HEIGHT_INCHES
+    info = probe_image(path)
+    return fit_image_inches(info.width, info.height)
+
 
-    aspect = w / h
-    width = MAX_IMAGE_WIDTH_INCHES
-    height = width / aspect
+def _prepared_image(image_path, prepared=None):
+    path = blob_store.resolve(image_path)
+    result = (prepared or {}).get(path)
+    if result is None:
+        return normalize_image(path)
+    if isinstance(result, Exception):
+        raise result
+    return result
 
-    if height > MAX_IMAGE_HEIGHT_INCHES:
-        height = MAX_IMAGE_HEIGHT_INCHES
-        width = height * aspect
 
-    return width, height
+def _prepare_figures(screenshots, diagrams, plagiarism_report) -> dict:
+    items = list(screenshots) + list(diagrams) + ([plagiarism_report] if plagiarism_report else [])
+    return prepare_images(blob_store.resolve(item.get("path")) for item in items)
 
 
-def _add_figure(paragraph, image_path, caption_text, figure_no):
+def _add_figure(paragraph, image_path, caption_text, figure_no, prepared=None):
     parent = paragraph._element.getparent()
     anchor_index = parent.index(paragraph._element)
 
     p_img = paragraph._parent.add_paragraph()
     p_img.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    image_path = _prepared_image(image_path, prepared)
     width, height = _resize_image(image_path)
     run_img = p_img.add_run()
     run_img.add_picture(image_path, width=Inches(width), height=Inches(height))
@@ -159,7 +134,7 @@ def _add_figure(paragraph, image_path, caption_text, figure_no):
     parent.insert(anchor_index + 2, p_caption._element)
 
 
-def _add_screenshot_block(paragraph, image_path, title_text):
+def _add_screenshot_block(paragraph, image_path, title_text, prepared=None):
     parent = paragraph._element.getparent()
     anchor_index = parent.index(paragraph._element)
 
@@ -170,6 +145,7 @@ def _add_screenshot_block(paragraph, image_path, title_text):
 
     p_img = paragraph._parent.add_paragraph()
     p_img.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    image_path = _prepared_image(image_path, prepared)
     width, height = _resize_image(image_path)
     run_img = p_img.add_run()
     run_img.add_picture(image_path, width=Inches(width), height=Inches(height))
@@ -191,6 +167,7 @@ def _add_insert_error_note(paragraph, message):
 def _add_code_block_after(paragraph, code_items):
     parent = paragraph._element.getparent()
     anchor_index = parent.index(paragraph._element)
+    inserted = []
 
     for item in code_items:
         p_name = paragraph._parent.add_paragraph(_sanitize_xml_text(item["filename"]).upper())
@@ -207,6 +184,9 @@ def _add_code_block_after(paragraph, code_items):
         parent.insert(anchor_index + 1, p_name._element)
         parent.insert(anchor_index + 2, p_code._element)
         anchor_index += 2
+        inserted.extend([p_name._element, p_code._element])
+
+    return inserted
 
 
 def _normalize_diagram_text(value: str) -> str:
@@ -240,33 +220,42 @@ def _match_diagram_index_for_placeholder(diagrams, placeholder_token: str, used_
     return None
 
 
-def _inject_blocks(doc: Document, code_items, screenshots, diagrams, plagiarism_report):
+def _inject_blocks(doc: Document, code_items, screenshots, diagrams, plagiarism_report, anchors=None, prepared=None):
     figure_count = 1
     inserted_screenshots = False
     inserted_diagrams = False
     inserted_plagiarism = False
     used_diagram_indexes = set()
+    code_fragments = []
 
-    for paragraph in list(doc.paragraphs):
+    # Indexed templates only visit the paragraphs known to hold block placeholders.
+    paragraphs = list(doc.paragraphs) if anchors is None else [Paragraph(p, doc._body) for p in anchors]
+
+    for paragraph in paragraphs:
         text = paragraph.text.strip()
         text_lower = text.lower()
 
+        screenshot_hit = any(token.lower() in text_lower for token in SCREENSHOT_PLACEHOLDERS)
+        diagram_hit = any(token.lower() in text_lower for token in DIAGRAM_PLACEHOLDERS)
+        plagiarism_hit = any(token.lower() in text_lower for token in PLAGIARISM_PLACEHOLDERS)
+
         if CODE_PLACEHOLDER in text:
-            _add_code_block_after(paragraph, code_items)
+            inserted = _add_code_block_after(paragraph, code_items)
             paragraph.text = paragraph.text.replace(CODE_PLACEHOLDER, "")
+            # Later blocks on the same anchor are inserted in front of the code.
+            shared_anchor = screenshot_hit or diagram_hit or plagiarism_hit
+            code_fragments.append((paragraph._element, inserted, shared_anchor))
 
-        screenshot_hit = any(token.lower() in text_lower for token in SCREENSHOT_PLACEHOLDERS)
         if screenshot_hit:
             for item in screenshots:
                 try:
-                    _add_screenshot_block(paragraph, item["path"], item["name"])
+                    _add_screenshot_block(paragraph, item["path"], item["name"], prepared)
                     inserted_screenshots = True
                 except Exception:
                     _add_insert_error_note(paragraph, f"[Image skipped: {item.get('name', 'screenshot')}]")
             for token in SCREENSHOT_PLACEHOLDERS:
                 paragraph.text = paragraph.text.replace(token, "")
 
-        diagram_hit = any(token.lower() in text_lower for token in DIAGRAM_PLACEHOLDERS)
         if diagram_hit:
             matched_tokens = [token for token in DIAGRAM_PLACEHOLDERS if token.lower() in text_lower]
             generic_tokens = {"[[diagram_block]]"}
@@ -289,7 +278,7 @@ def _inject_blocks(doc: Document, code_items, screenshots, diagrams, plagiarism_
                     _set_run_font(run, size=12, bold=True)
                 paragraph._element.getparent().insert(paragraph._element.getparent().index(paragraph._element) + 1, p_title._element)
                 try:
-                    _add_figure(paragraph, item["path"], item["name"], figure_count)
+                    _add_figure(paragraph, item["path"], item["name"], figure_count, prepared)
                     figure_count += 1
                     inserted_diagrams = True
                     used_diagram_indexes.add(idx)
@@ -298,11 +287,10 @@ def _inject_blocks(doc: Document, code_items, screenshots, diagrams, plagiarism_
             for token in DIAGRAM_PLACEHOLDERS:
                 paragraph.text = paragraph.text.replace(token, "")
 
-        plagiarism_hit = any(token.lower() in text_lower for token in PLAGIARISM_PLACEHOLDERS)
         if plagiarism_hit:
             if plagiarism_report and plagiarism_report.get("path"):
                 try:
-                    _add_figure(paragraph, plagiarism_report["path"], plagiarism_report.get("title", "Plagiarism Report"), figure_count)
+                    _add_figure(paragraph, plagiarism_report["path"], plagiarism_report.get("title", "Plagiarism Report"), figure_count, prepared)
                     figure_count += 1
                     inserted_plagiarism = True
                 except Exception:
@@ -318,7 +306,7 @@ def _inject_blocks(doc: Document, code_items, screenshots, diagrams, plagiarism_
         anchor = doc.paragraphs[-1]
         for item in screenshots:
             try:
-                _add_screenshot_block(anchor, item["path"], item["name"])
+                _add_screenshot_block(anchor, item["path"], item["name"], prepared)
             except Exception:
                 _add_insert_error_note(anchor, f"[Image skipped: {item.get('name', 'screenshot')}]")
 
@@ -327,7 +315,7 @@ def _inject_blocks(doc: Document, code_items, screenshots, diagrams, plagiarism_
         anchor = doc.paragraphs[-1]
         for idx, item in enumerate(diagrams):
             try:
-                _add_figure(anchor, item["path"], item["name"], figure_count)
+                _add_figure(anchor, item["path"], item["name"], figure_count, prepared)
                 figure_count += 1
                 used_diagram_indexes.add(idx)
             except Exception:
@@ -337,10 +325,12 @@ def _inject_blocks(doc: Document, code_items, screenshots, diagrams, plagiarism_
         doc.add_paragraph(plagiarism_report.get("title", "Plagiarism Report"))
         anchor = doc.paragraphs[-1]
         try:
-            _add_figure(anchor, plagiarism_report["path"], plagiarism_report.get("title", "Plagiarism Report"), figure_count)
+            _add_figure(anchor, plagiarism_report["path"], plagiarism_report.get("title", "Plagiarism Report"), figure_count, prepared)
         except Exception:
             _add_insert_error_note(anchor, "[Plagiarism report image skipped]")
 
+    return code_fragments
+
 
 def _add_page_numbers(doc: Document):
     section = doc.sections[0]
@@ -418,14 +408,15 @@ def _resolve_plagiarism_path(plagiarism_report):
     ext = os.path.splitext(plagiarism_report["path"])[1].lower()
     if ext == ".pdf":
         # Keep generation resilient by skipping in-process PDF rendering.
-        plagiarism_report["path"] = None
+        # Copy so the caller's entry still points at the upload to release.
+        plagiarism_report = {**plagiarism_report, "path": None}
 
     return plagiarism_report
 
 
 def _append_references_section(doc: Document, references):
     if not isinstance(references, list):
-        return
+        return []
 
     normalized = []
     for item in references:
@@ -439,12 +430,12 @@ def _append_references_section(doc: Document, references):
             normalized.append({"label": label, "url": url})
 
     if not normalized:
-        return
+        return []
 
-    doc.add_paragraph("References")
-    for paragraph in doc.paragraphs[-1:]:
-        for run in paragraph.runs:
-            _set_run_font(run, size=14, bold=True)
+    heading = doc.add_paragraph("References")
+    for run in heading.runs:
+        _set_run_font(run, size=14, bold=True)
+    inserted = [heading._element]
 
     for idx, ref in enumerate(normalized, start=1):
         text = f"{idx}. {ref['label']} - {ref['url']}" if ref["label"] else f"{idx}. {ref['url']}"
@@ -452,22 +443,12 @@ def _append_references_section(doc: Document, references):
         p.alignment = WD_ALIGN_PARAGRAPH.LEFT
         for run in p.runs:
             _set_run_font(run, size=11, bold=False)
+        inserted.append(p._element)
 
+    return inserted
 
-def generate_document(
-    template_path: str,
-    template_config: dict,
-    payload: dict,
-    code_items: list,
-    screenshots: list,
-    diagrams: list,
-    plagiarism_report: dict | None = None,
-):
-    if not os.path.exists(template_path):
-        raise FileNotFoundError(f"Template not found: {template_path}")
-
-    doc = Document(template_path)
 
+def build_replacements(template_config: dict, payload: dict):
     student = payload.get("studentDetails", {})
     documentation = payload.get("documentation", {})
     old = template_config.get("old_details", {})
@@ -484,19 +465,244 @@ def generate_document(
         old_value = old.get(key, f"[[{key}]]")
         replacements.append((old_value, _sanitize_xml_text(documentation.get(key, ""))))
 
-    for old_text, new_text in replacements:
-        if old_text and new_text is not None:
-            _replace_text_globally(doc, str(old_text), str(new_text))
+    return replacements
+
+
+class RenderState:
+    """
+    A rendered document plus what incremental re-rendering needs: the
+    fingerprint of every input and the elements each text, code and
+    references input produced in the live document.
+    """
+
+    def __init__(self, doc, template_key, mapping, fingerprints, text_paragraphs, code_fragments, reference_elements):
+        self.doc = doc
+        self.template_key = template_key
+        self.mapping = mapping
+        self.fingerprints = fingerprints
+        # None when that input cannot be re-rendered in place.
+        self.text_paragraphs = text_paragraphs
+        self.code_fragments = code_fragments
+        self.reference_elements = reference_elements
+
+
+def _fingerprint(value) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _media_entry(item):
+    path = item.get("path")
+    key = blob_store.key_for(path)
+    if key:
+        # Released blobs are rewritten on re-upload with a new mtime; the key
+        # names the content, so the same file keeps the same fingerprint.
+        return [item.get("name"), item.get("title"), key]
+    resolved = blob_store.resolve(path) if path else None
+    stat = os.stat(resolved) if resolved and os.path.exists(resolved) else None
+    return [item.get("name"), item.get("title"), path, stat and [stat.st_mtime_ns, stat.st_size]]
+
+
+def _input_fingerprints(payload, code_items, screenshots, diagrams, plagiarism_report) -> dict:
+    return {
+        "code": _fingerprint([[item["filename"], item["content"]] for item in code_items]),
+        "references": _fingerprint(payload.get("references", [])),
+        "media": _fingerprint(
+            {
+                "screenshots": [_media_entry(item) for item in screenshots],
+                "diagrams": [_media_entry(item) for item in diagrams],
+                "plagiarism": _media_entry(plagiarism_report) if plagiarism_report else None,
+            }
+        ),
+    }
+
 
-    plagiarism_report = _resolve_plagiarism_path(plagiarism_report)
-    _inject_blocks(doc, code_items, screenshots, diagrams, plagiarism_report)
+def _render_full(template, index, matcher, payload, code_items, screenshots, diagrams, plagiarism_report, fingerprints, report_progress):
+    doc = template.clone()
+    # Resolve every anchor before mutating, since index paths are positional.
+    text_paths = sorted({tuple(path) for path in index.paths_for(matcher.mapping)})
+    block_paths = {tuple(path) for path in index.block_paths(BLOCK_PLACEHOLDERS)}
+    text_anchors = index.resolve(doc, text_paths)
+    block_anchors = index.resolve(doc, block_paths)
+    report_progress(15)
+
+    matcher.substitute_document(doc, text_anchors)
+    report_progress(30)
+
+    # Decode/resize/re-encode runs in parallel; inserting the XML stays serial.
+    prepared = _prepare_figures(screenshots, diagrams, plagiarism_report)
+    code_fragments = _inject_blocks(doc, code_items, screenshots, diagrams, plagiarism_report, block_anchors, prepared)
+    report_progress(70)
 
     _insert_toc_field(doc)
     _add_page_numbers(doc)
-    _append_references_section(doc, payload.get("references", []))
+    reference_elements = _append_references_section(doc, payload.get("references", []))
+    report_progress(80)
+
+    text_paragraphs = None
+    if text_anchors is not None and block_anchors is not None and not block_paths.intersection(text_paths):
+        text_paragraphs = dict(zip(text_paths, text_anchors))
+    if any(shared_anchor for _, _, shared_anchor in code_fragments):
+        code_fragments = None
+    else:
+        code_fragments = [(anchor, inserted) for anchor, inserted, _ in code_fragments]
+
+    return RenderState(
+        doc,
+        (template.path, template.mtime_ns),
+        matcher.mapping,
+        fingerprints,
+        text_paragraphs,
+        code_fragments,
+        reference_elements,
+    )
+
+
+def _render_incremental(state, template, index, matcher, payload, code_items, fingerprints, report_progress) -> bool:
+    """
+    Re-render only the changed text paragraphs, code listing and references
+    of a previous build in place. Returns False when a full build is needed;
+    the state must then be discarded, as it may be partly updated.
+    """
+    if (
+        state.template_key != (template.path, template.mtime_ns)
+        or state.fingerprints["media"] != fingerprints["media"]
+        or set(state.mapping) != set(matcher.mapping)
+    ):
+        # Figure numbering and image relationships span the whole document.
+        return False
 
+    changed_keys = [key for key, value in matcher.mapping.items() if state.mapping[key] != value]
+    code_changed = state.fingerprints["code"] != fingerprints["code"]
+    if (changed_keys and state.text_paragraphs is None) or (code_changed and state.code_fragments is None):
+        return False
+
+    doc = state.doc
+    report_progress(15)
+
+    for path in sorted({tuple(path) for path in index.paths_for(changed_keys)}):
+        live = state.text_paragraphs.get(path)
+        source = index.resolve(template.document, [path])
+        if live is None or not source:
+            return False
+        fresh = copy.deepcopy(source[0])
+        matcher.substitute_paragraph(Paragraph(fresh, doc._body))
+        live.getparent().replace(live, fresh)
+        state.text_paragraphs[path] = fresh
+    report_progress(30)
+
+    if code_changed:
+        fragments = []
+        for anchor, inserted in state.code_fragments:
+            for element in inserted:
+                element.getparent().remove(element)
+            fragments.append((anchor, _add_code_block_after(Paragraph(anchor, doc._body), code_items)))
+        state.code_fragments = fragments
+    report_progress(70)
+
+    if state.fingerprints["references"] != fingerprints["references"]:
+        # References are always the last body paragraphs, so re-append them.
+        for element in state.reference_elements:
+            element.getparent().remove(element)
+        state.reference_elements = _append_references_section(doc, payload.get("references", []))
+    report_progress(80)
+
+    state.mapping = matcher.mapping
+    state.fingerprints = fingerprints
+    return True
+
+
+def _render(
+    session,
+    template_path: str,
+    template_config: dict,
+    payload: dict,
+    code_items: list,
+    screenshots: list,
+    diagrams: list,
+    plagiarism_report: dict | None = None,
+    on_progress=None,
+):
+    if not os.path.exists(template_path):
+        raise FileNotFoundError(f"Template not found: {template_path}")
+
+    report_progress = on_progress or (lambda percent: None)
+
+    template = template_cache.get(template_path)
+    matcher = PlaceholderMatcher(build_replacements(template_config, payload))
+    index = template_index.get(template_path, template.document, literals=matcher.mapping)
+    plagiarism_report = _resolve_plagiarism_path(plagiarism_report)
+    fingerprints = _input_fingerprints(payload, code_items, screenshots, diagrams, plagiarism_report)
+
+    if session.state is not None and _render_incremental(
+        session.state, template, index, matcher, payload, code_items, fingerprints, report_progress
+    ):
+        return session.state.doc
+
+    session.state = _render_full(
+        template, index, matcher, payload, code_items, screenshots, diagrams, plagiarism_report, fingerprints, report_progress
+    )
+    return session.state.doc
+
+
+def _session_key(template_path: str, payload: dict):
+    student = payload.get("studentDetails", {})
+    return (
+        os.path.abspath(template_path),
+        str(student.get("name", "")).strip().lower(),
+        str(student.get("project", "")).strip().lower(),
+    )
+
+
+def build_document(*args, **kwargs):
+    """
+    Full build of a fresh document, bypassing render sessions.
+    """
+    return _render(RenderSession(None), *args, **kwargs)
+
+
+def _output_name() -> str:
+    return f"blackbook_{uuid.uuid4().hex[:10]}.docx"
+
+
+def generate_document(
+    template_path: str,
+    template_config: dict,
+    payload: dict,
+    code_items: list,
+    screenshots: list,
+    diagrams: list,
+    plagiarism_report: dict | None = None,
+    on_progress=None,
+):
     Path(GENERATED_DIR).mkdir(parents=True, exist_ok=True)
-    out_name = f"blackbook_{uuid.uuid4().hex[:10]}.docx"
+    out_name = _output_name()
     out_path = os.path.join(GENERATED_DIR, out_name)
-    doc.save(out_path)
+
+    # The session stays checked out until the package is written.
+    with render_sessions.checkout(_session_key(template_path, payload)) as session:
+        doc = _render(session, template_path, template_config, payload, code_items, screenshots, diagrams, plagiarism_report, on_progress)
+        write_package(doc, out_path)
     return out_name, out_path
+
+
+def generate_document_stream(
+    template_path: str,
+    template_config: dict,
+    payload: dict,
+    code_items: list,
+    screenshots: list,
+    diagrams: list,
+    plagiarism_report: dict | None = None,
+    on_progress=None,
+):
+    """
+    Build the document into a spooled buffer instead of GENERATED_DIR.
+    Returns (file name, buffer rewound to 0, size in bytes).
+    """
+    buffer = tempfile.SpooledTemporaryFile(max_size=STREAM_SPOOL_MAX_BYTES)
+    with render_sessions.checkout(_session_key(template_path, payload)) as session:
+        doc = _render(session, template_path, template_config, payload, code_items, screenshots, diagrams, plagiarism_report, on_progress)
+        write_package(doc, buffer)
+    size = buffer.tell()
+    buffer.seek(0)
+    return _output_name(), buffer, size
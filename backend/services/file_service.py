@@ -1,36 +1,58 @@
 import json
 import os
-import uuid
-from pathlib import Path
 
-from werkzeug.utils import secure_filename
+from services.blob_store import blob_store
 
 
-def _safe_unique_filename(filename: str) -> str:
-    clean = secure_filename(filename)
-    stem, ext = os.path.splitext(clean)
-    return f"{stem}_{uuid.uuid4().hex[:10]}{ext}"
-
-
-def save_uploaded_list(files, target_dir: str):
-    Path(target_dir).mkdir(parents=True, exist_ok=True)
+def save_uploaded_list(files, store=blob_store):
+    """
+    Store uploads in the content-addressed blob store. `filename` is the
+    blob key (also the /uploads/<path> URL path) and `path` its location.
+    """
     saved = []
     for file_obj in files:
         if not file_obj or not file_obj.filename:
             continue
-        final_name = _safe_unique_filename(file_obj.filename)
-        abs_path = os.path.join(target_dir, final_name)
-        file_obj.save(abs_path)
+        key, abs_path = store.put(file_obj.stream, file_obj.filename)
         saved.append(
             {
                 "original_name": file_obj.filename,
-                "filename": final_name,
+                "filename": key,
                 "path": abs_path,
             }
         )
     return saved
 
 
+def release_generation_inputs(inputs: dict, store=blob_store):
+    """
+    Drop the blob references taken by a generation request's uploads.
+    """
+    refs = [item.get("path") for item in inputs.get("code_files") or []]
+    refs += [item.get("path") for item in inputs.get("screenshots") or []]
+    refs += [item.get("path") for item in inputs.get("diagrams") or []]
+    if inputs.get("plagiarism_report"):
+        refs.append(inputs["plagiarism_report"].get("path"))
+    for ref in refs:
+        if ref:
+            store.release(ref)
+
+
+def load_code_items(saved_files):
+    code_items = []
+    for item in saved_files:
+        with open(blob_store.resolve(item["path"]), "r", encoding="utf-8", errors="ignore") as fh:
+            code_items.append(
+                {
+                    "name": item["original_name"],
+                    "filename": item["original_name"],
+                    "language": guess_language(item["original_name"]),
+                    "content": fh.read(),
+                }
+            )
+    return code_items
+
+
 def parse_json_field(raw_value, default):
     if not raw_value:
         return default
@@ -0,0 +1,207 @@
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import (
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_RESET_SECONDS,
+    DIAGRAM_HOST_CONCURRENCY,
+    DIAGRAM_REQUEST_TIMEOUT,
+    HTTP_RETRY_ATTEMPTS,
+    HTTP_RETRY_BACKOFF,
+    HTTP_RETRY_MAX_BACKOFF,
+)
+
+RETRY_STATUSES = frozenset({429, 503})
+
+
+class CircuitOpenError(requests.RequestException):
+    """
+    Raised without a network call while a host's circuit breaker is open.
+    """
+
+
+def remaining(deadline, budget: float = DIAGRAM_REQUEST_TIMEOUT) -> float:
+    """
+    Seconds left for one outbound call, capped at `budget`.
+    `deadline` is a time.monotonic() value, or None for no overall limit.
+    """
+    if deadline is None:
+        return budget
+    left = deadline - time.monotonic()
+    if left <= 0:
+        raise TimeoutError("Diagram generation deadline exceeded.")
+    return min(budget, left)
+
+
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive failures. Once `reset_after` seconds
+    have passed, one trial call is let through: success closes the breaker
+    and failure opens it again.
+    """
+
+    def __init__(self, threshold: int, reset_after: float):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+        self.times_opened = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_after:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self.trial_running:
+                self.trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def abandon(self):
+        with self._lock:
+            self.trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.trial_running or (self.opened_at is None and self.failures >= self.threshold):
+                self.opened_at = time.monotonic()
+                self.times_opened += 1
+            self.trial_running = False
+
+
+class _Host:
+    def __init__(self, pool_size: int, threshold: int, reset_after: float):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.slot = threading.BoundedSemaphore(pool_size)
+        self.breaker = CircuitBreaker(threshold, reset_after)
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self.rejected = 0
+
+
+class HttpTransport:
+    """
+    Keep-alive session and connection pool per host, with a concurrency
+    limit, jittered exponential retry on 429/503 and a circuit breaker.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = DIAGRAM_HOST_CONCURRENCY,
+        attempts: int = HTTP_RETRY_ATTEMPTS,
+        backoff: float = HTTP_RETRY_BACKOFF,
+        max_backoff: float = HTTP_RETRY_MAX_BACKOFF,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        reset_after: float = CIRCUIT_RESET_SECONDS,
+    ):
+        self.pool_size = pool_size
+        self.attempts = max(1, attempts)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _host(self, host: str) -> _Host:
+        with self._lock:
+            entry = self._hosts.get(host)
+            if entry is None:
+                entry = self._hosts[host] = _Host(self.pool_size, self.failure_threshold, self.reset_after)
+            return entry
+
+    def _delay(self, attempt: int, response) -> float:
+        retry_after = response.headers.get("Retry-After", "") if response is not None else ""
+        if retry_after.isdigit():
+            return min(float(retry_after), self.max_backoff)
+        return random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+
+    def _send(self, host: _Host, host_name: str, url: str, deadline, budget: float, kwargs):
+        if not host.slot.acquire(timeout=remaining(deadline, budget)):
+            raise TimeoutError(f"Timed out waiting for a connection slot to {host_name}.")
+        try:
+            for attempt in range(self.attempts):
+                host.requests += 1
+                response = host.session.post(url, timeout=remaining(deadline, budget), **kwargs)
+                if response.status_code not in RETRY_STATUSES or attempt == self.attempts - 1:
+                    return response
+                delay = self._delay(attempt, response)
+                if deadline is not None and time.monotonic() + delay >= deadline:
+                    return response
+                host.retries += 1
+                time.sleep(delay)
+        finally:
+            host.slot.release()
+
+    def post(self, url: str, deadline=None, budget: float = DIAGRAM_REQUEST_TIMEOUT, **kwargs):
+        host_name = urlsplit(url).netloc
+        host = self._host(host_name)
+        if not host.breaker.allow():
+            host.rejected += 1
+            raise CircuitOpenError(f"{host_name} is failing; circuit open")
+
+        try:
+            response = self._send(host, host_name, url, deadline, budget, kwargs)
+        except requests.RequestException:
+            host.failures += 1
+            host.breaker.record_failure()
+            raise
+        except BaseException:
+            # Out of time before the host answered: no verdict on its health.
+            host.breaker.abandon()
+            raise
+
+        if response.status_code in RETRY_STATUSES or response.status_code >= 500:
+            host.failures += 1
+            host.breaker.record_failure()
+        else:
+            host.breaker.record_success()
+        return response
+
+    def stats(self) -> dict:
+        with self._lock:
+            hosts = dict(self._hosts)
+        return {
+            name: {
+                "requests": host.requests,
+                "retries": host.retries,
+                "failures": host.failures,
+                "rejected": host.rejected,
+                "circuit": host.breaker.state,
+                "circuit_opened": host.breaker.times_opened,
+            }
+            for name, host in hosts.items()
+        }
+
+
+transport = HttpTransport()
+
+
+def post(url: str, deadline=None, budget: float = DIAGRAM_REQUEST_TIMEOUT, **kwargs):
+    return transport.post(url, deadline, budget, **kwargs)
@@ -0,0 +1,127 @@
+import os
+import struct
+from collections import namedtuple
+from functools import lru_cache
+
+from PIL import Image
+
+DEFAULT_DPI = 72.0
+
+ImageInfo = namedtuple("ImageInfo", ["width", "height", "dpi"])
+
+# Start-of-frame markers carry the frame size; C4/C8/CC are DHT/JPG/DAC.
+_JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def _probe_png(fh):
+    fh.seek(8)
+    length, chunk_type = struct.unpack(">I4s", fh.read(8))
+    if chunk_type != b"IHDR":
+        return None
+    width, height = struct.unpack(">II", fh.read(8))
+    fh.seek(length - 8 + 4, os.SEEK_CUR)
+
+    dpi = (DEFAULT_DPI, DEFAULT_DPI)
+    # pHYs must appear before the first IDAT chunk.
+    while True:
+        header = fh.read(8)
+        if len(header) < 8:
+            break
+        length, chunk_type = struct.unpack(">I4s", header)
+        if chunk_type in (b"IDAT", b"IEND"):
+            break
+        if chunk_type == b"pHYs" and length == 9:
+            ppu_x, ppu_y, unit = struct.unpack(">IIB", fh.read(9))
+            if unit == 1 and ppu_x and ppu_y:
+                dpi = (ppu_x * 0.0254, ppu_y * 0.0254)
+            break
+        fh.seek(length + 4, os.SEEK_CUR)
+    return ImageInfo(width, height, dpi)
+
+
+def _probe_jpeg(fh):
+    fh.seek(2)
+    dpi = (DEFAULT_DPI, DEFAULT_DPI)
+    while True:
+        byte = fh.read(1)
+        while byte and byte != b"\xff":
+            byte = fh.read(1)
+        while byte == b"\xff":
+            byte = fh.read(1)
+        if not byte:
+            return None
+
+        marker = byte[0]
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            continue
+        if marker in (0xD9, 0xDA):
+            return None
+
+        (length,) = struct.unpack(">H", fh.read(2))
+        segment = fh.read(length - 2)
+        if marker == 0xE0 and segment[:5] == b"JFIF\x00" and len(segment) >= 12:
+            unit, density_x, density_y = struct.unpack(">BHH", segment[7:12])
+            if density_x and density_y:
+                if unit == 1:
+                    dpi = (float(density_x), float(density_y))
+                elif unit == 2:
+                    dpi = (density_x * 2.54, density_y * 2.54)
+        elif marker in _JPEG_SOF_MARKERS:
+            height, width = struct.unpack(">HH", segment[1:5])
+            return ImageInfo(width, height, dpi)
+
+
+def _probe_webp(fh):
+    fh.seek(12)
+    chunk_type = fh.read(4)
+    fh.seek(4, os.SEEK_CUR)
+    data = fh.read(10)
+    if chunk_type == b"VP8X" and len(data) >= 10:
+        width = int.from_bytes(data[4:7], "little") + 1
+        height = int.from_bytes(data[7:10], "little") + 1
+    elif chunk_type == b"VP8L" and len(data) >= 5 and data[0] == 0x2F:
+        bits = int.from_bytes(data[1:5], "little")
+        width = (bits & 0x3FFF) + 1
+        height = ((bits >> 14) & 0x3FFF) + 1
+    elif chunk_type == b"VP8 " and len(data) >= 10 and data[3:6] == b"\x9d\x01\x2a":
+        width = int.from_bytes(data[6:8], "little") & 0x3FFF
+        height = int.from_bytes(data[8:10], "little") & 0x3FFF
+    else:
+        return None
+    return ImageInfo(width, height, (DEFAULT_DPI, DEFAULT_DPI))
+
+
+def _probe_with_pil(path: str):
+    with Image.open(path) as img:
+        dpi = img.info.get("dpi") or (DEFAULT_DPI, DEFAULT_DPI)
+        return ImageInfo(img.width, img.height, (float(dpi[0]), float(dpi[1])))
+
+
+def _probe_headers(path: str):
+    with open(path, "rb") as fh:
+        head = fh.read(16)
+        try:
+            if head.startswith(b"\x89PNG\r\n\x1a\n"):
+                return _probe_png(fh)
+            if head.startswith(b"\xff\xd8"):
+                return _probe_jpeg(fh)
+            if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+                return _probe_webp(fh)
+        except struct.error:
+            return None
+    return None
+
+
+@lru_cache(maxsize=4096)
+def _probe_cached(path: str, mtime_ns: int, size: int) -> ImageInfo:
+    return _probe_headers(path) or _probe_with_pil(path)
+
+
+def probe_image(path: str) -> ImageInfo:
+    """
+    Read pixel dimensions and DPI from PNG/JPEG/WebP headers without
+    decoding, falling back to PIL for other formats. Memoized per path,
+    mtime and size. Dimensions are as stored (EXIF orientation is ignored).
+    """
+    stat = os.stat(path)
+    return _probe_cached(os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
@@ -0,0 +1,252 @@
+import hashlib
+import io
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from PIL import Image, ImageOps
+
+from config import IMAGE_CACHE_DIR, IMAGE_CACHE_MAX_BYTES, IMAGE_POOL_WORKERS, IMAGE_TARGET_DPI, MAX_IMAGE_HEIGHT_INCHES, MAX_IMAGE_WIDTH_INCHES
+
+JPEG_QUALITY = 85
+# Images with at most this many colours are screenshots/diagrams: PNG only.
+PALETTE_COLOR_LIMIT = 256
+
+_pool = None
+_pool_workers = IMAGE_POOL_WORKERS
+_pool_lock = threading.Lock()
+# Bytes on disk per cache directory, scanned once per process.
+_cache_bytes = {}
+_cache_lock = threading.Lock()
+
+
+def fit_image_inches(px_width: int, px_height: int):
+    if px_width == 0 or px_height == 0:
+        return MAX_IMAGE_WIDTH_INCHES, MAX_IMAGE_HEIGHT_INCHES
+
+    aspect = px_width / px_height
+    width = MAX_IMAGE_WIDTH_INCHES
+    height = width / aspect
+
+    if height > MAX_IMAGE_HEIGHT_INCHES:
+        height = MAX_IMAGE_HEIGHT_INCHES
+        width = height * aspect
+
+    return width, height
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1024 * 1024), b""):
+            digest.update(chunk)
+    # Cache entries are only valid for the layout they were sized for.
+    digest.update(f"|{IMAGE_TARGET_DPI}|{MAX_IMAGE_WIDTH_INCHES}|{MAX_IMAGE_HEIGHT_INCHES}".encode())
+    return digest.hexdigest()
+
+
+def _cached_path(digest: str, cache_dir: str = None):
+    for ext in (".png", ".jpg"):
+        candidate = os.path.join(cache_dir or IMAGE_CACHE_DIR, digest[:2], digest + ext)
+        try:
+            # Hits touch the mtime, which orders eviction.
+            os.utime(candidate)
+        except OSError:
+            continue
+        return candidate
+    return None
+
+
+def _scan_cache(cache_dir: str):
+    files = []
+    for dirpath, _, filenames in os.walk(cache_dir):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+    return files
+
+
+def _record_cache_write(cache_dir: str, size: int):
+    """
+    Count a newly cached file and, once the directory exceeds
+    IMAGE_CACHE_MAX_BYTES, delete the least recently used files. Several
+    processes share the directory, so eviction rescans it.
+    """
+    with _cache_lock:
+        if cache_dir not in _cache_bytes:
+            _cache_bytes[cache_dir] = sum(size for _, size, _ in _scan_cache(cache_dir))
+        else:
+            _cache_bytes[cache_dir] += size
+        if _cache_bytes[cache_dir] <= IMAGE_CACHE_MAX_BYTES:
+            return
+        files = sorted(_scan_cache(cache_dir))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if total <= IMAGE_CACHE_MAX_BYTES:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+        _cache_bytes[cache_dir] = total
+
+
+def _has_alpha(img) -> bool:
+    return img.mode in ("RGBA", "LA", "PA") or (img.mode == "P" and "transparency" in img.info)
+
+
+def _encode(img):
+    """
+    Return (extension, bytes) for the smaller of PNG and JPEG. Images with
+    transparency or a small palette always stay PNG.
+    """
+    png = io.BytesIO()
+    img.save(png, format="PNG", optimize=True)
+    if _has_alpha(img) or img.getcolors(PALETTE_COLOR_LIMIT) is not None:
+        return ".png", png.getvalue()
+
+    jpeg = io.BytesIO()
+    img.convert("RGB").save(jpeg, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+    if jpeg.tell() < png.tell():
+        return ".jpg", jpeg.getvalue()
+    return ".png", png.getvalue()
+
+
+def _write_atomic(target: str, data: bytes = None, source: str = None):
+    Path(os.path.dirname(target)).mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(target))
+    with os.fdopen(fd, "wb") as fh:
+        if source:
+            with open(source, "rb") as src:
+                shutil.copyfileobj(src, fh)
+        else:
+            fh.write(data)
+    os.chmod(tmp_path, 0o644)
+    os.replace(tmp_path, target)
+
+
+def normalize_image(path: str, digest: str = None, cache_dir: str = None) -> str:
+    """
+    Return a cached copy of `path` downsampled to IMAGE_TARGET_DPI at its
+    printed size and re-encoded as PNG or JPEG, whichever is smaller.
+    Results are keyed by content hash, so re-uploads hit the cache.
+    cache_dir defaults to IMAGE_CACHE_DIR, which is kept under
+    IMAGE_CACHE_MAX_BYTES by evicting the least recently used files.
+    """
+    cache_dir = cache_dir or IMAGE_CACHE_DIR
+    digest = digest or _file_digest(path)
+    cached = _cached_path(digest, cache_dir)
+    if cached:
+        return cached
+
+    with Image.open(path) as source:
+        source_format = source.format
+        transposed = source.getexif().get(0x0112, 1) != 1
+        img = ImageOps.exif_transpose(source)
+        width_in, height_in = fit_image_inches(*img.size)
+        target = (max(1, round(width_in * IMAGE_TARGET_DPI)), max(1, round(height_in * IMAGE_TARGET_DPI)))
+        resized = img.width > target[0] or img.height > target[1]
+        if resized:
+            img = img.resize(target, Image.LANCZOS)
+        if img.mode not in ("RGB", "RGBA", "L", "LA", "P"):
+            img = img.convert("RGBA" if _has_alpha(img) else "RGB")
+        ext, data = _encode(img)
+
+    target_path = os.path.join(cache_dir, digest[:2], digest + ext)
+    original_ext = {"PNG": ".png", "JPEG": ".jpg"}.get(source_format)
+    if not resized and not transposed and original_ext and os.path.getsize(path) <= len(data):
+        # Already small enough and in an embeddable format: keep the original bytes.
+        target_path = os.path.join(cache_dir, digest[:2], digest + original_ext)
+        _write_atomic(target_path, source=path)
+    else:
+        _write_atomic(target_path, data=data)
+    _record_cache_write(cache_dir, os.path.getsize(target_path))
+    return target_path
+
+
+def use_image_pool(workers: int):
+    """
+    Set the process pool size for prepare_images; 1 or less prepares inline.
+    Batch workers, which already run one build per process, turn it off.
+    """
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None and workers != _pool_workers:
+            _pool.shutdown(wait=False)
+            _pool = None
+        _pool_workers = workers
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Never fork the (threaded) web process itself.
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _pool = ProcessPoolExecutor(max_workers=_pool_workers, mp_context=multiprocessing.get_context(method))
+        return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        _pool = None
+
+
+def prepare_images(paths) -> dict:
+    """
+    Normalize many images ahead of DOCX assembly. Cache hits are answered
+    in-process; misses are decoded, resized and re-encoded in a bounded
+    process pool. Maps each path to its normalized path, or to the
+    exception normalizing it raised.
+    """
+    results = {}
+    pending = {}
+    for path in dict.fromkeys(path for path in paths if path):
+        try:
+            digest = _file_digest(path)
+        except OSError as exc:
+            results[path] = exc
+            continue
+        cached = _cached_path(digest)
+        if cached:
+            results[path] = cached
+        else:
+            pending[path] = digest
+
+    if len(pending) > 1 and _pool_workers > 1:
+        try:
+            pool = _get_pool()
+            # Pool processes import their own config, so pass the cache directory along.
+            futures = {path: pool.submit(normalize_image, path, digest, IMAGE_CACHE_DIR) for path, digest in pending.items()}
+        except (BrokenProcessPool, RuntimeError):
+            _reset_pool()
+            futures = {}
+        for path, future in futures.items():
+            try:
+                results[path] = future.result()
+            except BrokenProcessPool:
+                _reset_pool()
+            except Exception as exc:
+                results[path] = exc
+                del pending[path]
+            else:
+                del pending[path]
+
+    # Single misses, no pool, or a pool that died: prepare inline.
+    for path, digest in pending.items():
+        try:
+            results[path] = normalize_image(path, digest)
+        except Exception as exc:
+            results[path] = exc
+    return results
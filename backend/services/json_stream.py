@@ -0,0 +1,135 @@
+import json
+
+
+class ObjectStreamParser:
+    """
+    Incremental parser for one top-level JSON object arriving in chunks.
+    feed() returns the (key, value) pairs whose values closed in that chunk,
+    so each member can be used before the rest of the object has arrived.
+    Text before the opening brace (e.g. a ``` fence) is skipped.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._state = "start"
+        self._key = None
+        self._value_start = None
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self.done = False
+
+    def _skip_whitespace(self):
+        while self._pos < len(self._buffer) and self._buffer[self._pos] in " \t\r\n":
+            self._pos += 1
+
+    def _read_string(self):
+        """
+        Scan a complete JSON string starting at self._pos; returns its end
+        index (exclusive), or None if it has not fully arrived yet.
+        """
+        idx = self._pos + 1
+        escaped = False
+        while idx < len(self._buffer):
+            char = self._buffer[idx]
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                return idx + 1
+            idx += 1
+        return None
+
+    def _scan_value(self):
+        """
+        Advance through the current value; returns True once it is complete.
+        Strings, objects and arrays close on their delimiter; numbers and
+        literals close at the next ',' or '}' at depth zero.
+        """
+        while self._pos < len(self._buffer):
+            char = self._buffer[self._pos]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 0:
+                        self._pos += 1
+                        return True
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                if self._depth == 0:
+                    return True
+                self._depth -= 1
+                if self._depth == 0:
+                    self._pos += 1
+                    return True
+            elif char == "," and self._depth == 0:
+                return True
+            self._pos += 1
+        return False
+
+    def feed(self, text: str) -> list:
+        self._buffer += text or ""
+        members = []
+        while not self.done:
+            if self._state == "start":
+                brace = self._buffer.find("{", self._pos)
+                if brace == -1:
+                    self._pos = len(self._buffer)
+                    break
+                self._pos = brace + 1
+                self._state = "key"
+            elif self._state == "key":
+                self._skip_whitespace()
+                if self._pos >= len(self._buffer):
+                    break
+                char = self._buffer[self._pos]
+                if char == "}":
+                    self._pos += 1
+                    self.done = True
+                    break
+                if char == ",":
+                    self._pos += 1
+                    continue
+                if char != '"':
+                    raise ValueError(f"Expected a key at offset {self._pos}")
+                end = self._read_string()
+                if end is None:
+                    break
+                self._key = json.loads(self._buffer[self._pos:end])
+                self._pos = end
+                self._state = "colon"
+            elif self._state == "colon":
+                self._skip_whitespace()
+                if self._pos >= len(self._buffer):
+                    break
+                if self._buffer[self._pos] != ":":
+                    raise ValueError(f"Expected ':' at offset {self._pos}")
+                self._pos += 1
+                self._state = "value"
+                self._value_start = None
+            elif self._state == "value":
+                if self._value_start is None:
+                    self._skip_whitespace()
+                    if self._pos >= len(self._buffer):
+                        break
+                    self._value_start = self._pos
+                    self._depth = 0
+                    self._in_string = False
+                    self._escaped = False
+                if not self._scan_value():
+                    break
+                members.append((self._key, json.loads(self._buffer[self._value_start:self._pos])))
+                # Completed members are never revisited.
+                self._buffer = self._buffer[self._pos:]
+                self._pos = 0
+                self._state = "key"
+        return members
@@ -0,0 +1,147 @@
+import hashlib
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+
+from docx.opc.packuri import CONTENT_TYPES_URI, PACKAGE_URI
+from docx.opc.part import XmlPart
+from docx.opc.pkgwriter import _ContentTypesItem
+
+from config import PACKAGE_DEFLATE_CACHE_MAX_BYTES
+
+_LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+_CENTRAL_HEADER = struct.Struct("<IHHHHHHIIIHHHHHII")
+_END_RECORD = struct.Struct("<IHHHHIIH")
+_ZIP_VERSION = 20
+_DEFLATED = 8
+_UTF8_FLAG = 0x800
+# 1980-01-01 00:00, so identical packages produce identical bytes.
+_DOS_DATE = (1 << 5) | 1
+_DOS_TIME = 0
+
+
+def _deflate(blob: bytes):
+    compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+    return zlib.crc32(blob), compressor.compress(blob) + compressor.flush(), len(blob)
+
+
+class DeflateCache:
+    """
+    LRU of deflated binary part blobs (template media, fonts, normalized
+    uploads) keyed by content hash, so each save only compresses the XML
+    parts that were actually rendered.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, blob: bytes):
+        key = hashlib.sha1(blob).digest()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        entry = _deflate(blob)
+        if len(entry[1]) > self.max_bytes:
+            return entry
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = entry
+                self.total_bytes += len(entry[1])
+            while self.total_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.total_bytes -= len(evicted[1])
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+class _ZipWriter:
+    """
+    Minimal sequential ZIP writer that accepts already-deflated members.
+    """
+
+    def __init__(self, fh):
+        self.fh = fh
+        self.offset = 0
+        self.central = []
+
+    def write(self, name: str, crc: int, data: bytes, size: int):
+        encoded = name.encode("utf-8")
+        flags = 0 if encoded.isascii() else _UTF8_FLAG
+        header = _LOCAL_HEADER.pack(
+            0x04034B50, _ZIP_VERSION, flags, _DEFLATED, _DOS_TIME, _DOS_DATE, crc, len(data), size, len(encoded), 0
+        )
+        self.fh.write(header)
+        self.fh.write(encoded)
+        self.fh.write(data)
+        self.central.append(
+            _CENTRAL_HEADER.pack(
+                0x02014B50, _ZIP_VERSION, _ZIP_VERSION, flags, _DEFLATED, _DOS_TIME, _DOS_DATE,
+                crc, len(data), size, len(encoded), 0, 0, 0, 0, 0, self.offset,
+            )
+            + encoded
+        )
+        self.offset += len(header) + len(encoded) + len(data)
+
+    def close(self):
+        directory = b"".join(self.central)
+        self.fh.write(directory)
+        count = len(self.central)
+        self.fh.write(_END_RECORD.pack(0x06054B50, 0, 0, count, count, len(directory), self.offset, 0))
+
+
+def write_package(doc, target, cache=None):
+    """
+    Save `doc` like Document.save, to a path or a writable file object.
+    Binary parts reuse their cached deflated bytes.
+    """
+    cache = cache or deflate_cache
+    package = doc.part.package
+    parts = package.parts
+    for part in parts:
+        part.before_marshal()
+
+    fh = open(target, "wb") if isinstance(target, str) else target
+    try:
+        writer = _ZipWriter(fh)
+        writer.write(CONTENT_TYPES_URI.membername, *_deflate(_ContentTypesItem.from_parts(parts).blob))
+        writer.write(PACKAGE_URI.rels_uri.membername, *_deflate(package.rels.xml))
+        for part in parts:
+            if isinstance(part, XmlPart):
+                writer.write(part.partname.membername, *_deflate(part.blob))
+            else:
+                writer.write(part.partname.membername, *cache.get(part.blob))
+            if len(part.rels):
+                writer.write(part.partname.rels_uri.membername, *_deflate(part.rels.xml))
+        writer.close()
+    finally:
+        if fh is not target:
+            fh.close()
+
+
+deflate_cache = DeflateCache(PACKAGE_DEFLATE_CACHE_MAX_BYTES)
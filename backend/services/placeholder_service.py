@@ -0,0 +1,104 @@
+import re
+from bisect import bisect_right
+
+from docx.oxml.ns import qn
+from docx.text.paragraph import Paragraph
+
+
+class PlaceholderMatcher:
+    """
+    Replace every template placeholder in a single pass.
+
+    All placeholder strings are compiled into one regex alternation (longest
+    first, so overlapping keys resolve to the most specific one) and each
+    paragraph of the document is visited exactly once.
+    """
+
+    def __init__(self, replacements):
+        self.mapping = {}
+        for old_text, new_text in replacements:
+            if old_text and new_text is not None:
+                # First mapping wins, matching the old sequential replace order.
+                self.mapping.setdefault(str(old_text), str(new_text))
+
+        keys = sorted(self.mapping, key=len, reverse=True)
+        self.pattern = re.compile("|".join(re.escape(key) for key in keys)) if keys else None
+
+    def _lookup(self, match) -> str:
+        return self.mapping[match.group(0)]
+
+    def has_match(self, p_element) -> bool:
+        """
+        Cheap pre-check on the raw <w:t> text before building run proxies.
+        """
+        if self.pattern is None:
+            return False
+        text = "".join(t.text or "" for t in p_element.iter(qn("w:t")))
+        return bool(self.pattern.search(text))
+
+    def substitute_paragraph(self, paragraph) -> bool:
+        if self.pattern is None:
+            return False
+
+        runs = paragraph.runs
+        texts = [run.text for run in runs]
+        full_text = "".join(texts)
+        matches = list(self.pattern.finditer(full_text))
+
+        if not matches:
+            # Text living outside direct runs (e.g. hyperlinks) falls back to a flat rewrite.
+            text = paragraph.text
+            if self.pattern.search(text):
+                paragraph.text = self.pattern.sub(self._lookup, text)
+                return True
+            return False
+
+        starts = []
+        offset = 0
+        for text in texts:
+            starts.append(offset)
+            offset += len(text)
+
+        new_texts = list(texts)
+        # Walk matches right-to-left so earlier offsets stay valid.
+        for match in reversed(matches):
+            first = bisect_right(starts, match.start()) - 1
+            last = bisect_right(starts, match.end() - 1) - 1
+            replacement = self._lookup(match)
+            head = new_texts[first][: match.start() - starts[first]]
+
+            if first == last:
+                tail = new_texts[first][match.end() - starts[first] :]
+                new_texts[first] = head + replacement + tail
+                continue
+
+            # Placeholder split across runs: keep the first run's formatting.
+            new_texts[first] = head + replacement
+            for idx in range(first + 1, last):
+                new_texts[idx] = ""
+            new_texts[last] = new_texts[last][match.end() - starts[last] :]
+
+        for run, old_text, new_text in zip(runs, texts, new_texts):
+            if old_text != new_text:
+                run.text = new_text
+        return True
+
+    def substitute_document(self, doc, p_elements=None) -> int:
+        """
+        Rewrite every body paragraph (including table cells) once.
+        When `p_elements` is given (anchors from the template index), only
+        those paragraphs are visited. Returns the number of paragraphs changed.
+        """
+        if self.pattern is None:
+            return 0
+
+        if p_elements is None:
+            p_elements = list(doc.element.body.iter(qn("w:p")))
+
+        changed = 0
+        for p_element in p_elements:
+            if not self.has_match(p_element):
+                continue
+            if self.substitute_paragraph(Paragraph(p_element, doc._body)):
+                changed += 1
+        return changed
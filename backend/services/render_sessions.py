@@ -0,0 +1,67 @@
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from config import RENDER_SESSION_CACHE_SIZE
+
+
+class RenderSession:
+    def __init__(self, key, state=None):
+        self.key = key
+        self.state = state
+
+
+class RenderSessionCache:
+    """
+    Last rendered document per (template, student), so an edit-and-regenerate
+    loop can re-render only the inputs that changed. A session is checked
+    out exclusively for the whole build and save, then put back.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @contextmanager
+    def checkout(self, key):
+        with self._lock:
+            state = self._entries.pop(key, None) if key is not None else None
+            if state is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        session = RenderSession(key, state)
+        # A failed build may leave the document half-updated, so only a
+        # clean exit returns the session to the cache.
+        yield session
+
+        if key is None or session.state is None or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = session.state
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+render_sessions = RenderSessionCache(RENDER_SESSION_CACHE_SIZE)
@@ -0,0 +1,120 @@
+import copy
+import os
+import threading
+import zipfile
+from collections import OrderedDict
+
+from docx import Document
+from docx.opc.part import XmlPart
+from docx.parts.numbering import NumberingPart
+from docx.parts.styles import StylesPart
+
+from config import TEMPLATE_CACHE_MAX_BYTES
+
+# Parts that generate_document only reads. Clones share them with the cached
+# template instead of copying their XML; every other XML part is deep-copied.
+SHARED_XML_PARTS = (NumberingPart, StylesPart)
+
+
+def _clone_part(part, package):
+    if not isinstance(part, XmlPart) or isinstance(part, SHARED_XML_PARTS):
+        # Binary parts (images, fonts) are immutable blobs and safe to share.
+        return part
+    return type(part)(part.partname, part.content_type, copy.deepcopy(part.element), package)
+
+
+def _load_rels(source, target, parts):
+    for rel in source.rels.values():
+        ref = rel.target_ref if rel.is_external else parts[rel.target_part]
+        target.load_rel(rel.reltype, ref, rel.rId, rel.is_external)
+
+
+class TemplateEntry:
+    def __init__(self, path: str, mtime_ns: int, nbytes: int, document):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.nbytes = nbytes
+        self.document = document
+
+    def clone(self):
+        """
+        Return a private Document backed by copies of the writable XML parts.
+        The cached document itself is never handed out or mutated.
+        """
+        source = self.document.part.package
+        package = type(source)()
+
+        parts = {part: _clone_part(part, package) for part in source.iter_parts()}
+        _load_rels(source, package, parts)
+        for part, clone in parts.items():
+            if clone is not part:
+                _load_rels(part, clone, parts)
+
+        package.after_unmarshal()
+        return package.main_document_part.document
+
+
+class TemplateCache:
+    """
+    Process-level cache of parsed DOCX templates, keyed by path and mtime,
+    with LRU eviction by uncompressed package size.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(entry.nbytes for entry in self._entries.values())
+
+    def _load(self, path: str, mtime_ns: int) -> TemplateEntry:
+        with zipfile.ZipFile(path) as archive:
+            nbytes = sum(info.file_size for info in archive.infolist())
+        return TemplateEntry(path, mtime_ns, nbytes, Document(path))
+
+    def get(self, template_path: str) -> TemplateEntry:
+        path = os.path.abspath(template_path)
+        mtime_ns = os.stat(path).st_mtime_ns
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry and entry.mtime_ns == mtime_ns:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        entry = self._load(path, mtime_ns)
+        if entry.nbytes > self.max_bytes:
+            return entry
+
+        with self._lock:
+            self._entries[path] = entry
+            self._entries.move_to_end(path)
+            while self.total_bytes > self.max_bytes:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+template_cache = TemplateCache(TEMPLATE_CACHE_MAX_BYTES)
@@ -0,0 +1,165 @@
+import json
+import os
+import re
+import tempfile
+import threading
+
+from docx.oxml.ns import qn
+
+from config import BASE_DIR, TEMPLATE_INDEX_PATH
+
+TOKEN_PATTERN = re.compile(r"\[\[[^\[\]]+\]\]")
+
+
+def _paragraph_text(p_element) -> str:
+    return "".join(t.text or "" for t in p_element.iter(qn("w:t")))
+
+
+def _element_path(element, root) -> list[int]:
+    path = []
+    while element is not root:
+        parent = element.getparent()
+        path.append(parent.index(element))
+        element = parent
+    path.reverse()
+    return path
+
+
+def compile_template_index(document, literals=()) -> dict:
+    """
+    Record the body element path of every paragraph holding a [[...]] token
+    or one of the given literal placeholder strings.
+    """
+    body = document.element.body
+    literals = sorted({str(value) for value in literals if value})
+    tokens = {}
+    found_literals = {value: [] for value in literals}
+
+    for p_element in body.iter(qn("w:p")):
+        text = _paragraph_text(p_element)
+        if not text:
+            continue
+        matched_tokens = set(TOKEN_PATTERN.findall(text))
+        matched_literals = [value for value in literals if value in text]
+        if not matched_tokens and not matched_literals:
+            continue
+
+        path = _element_path(p_element, body)
+        for token in matched_tokens:
+            tokens.setdefault(token, []).append(path)
+        for value in matched_literals:
+            found_literals[value].append(path)
+
+    return {"tokens": tokens, "literals": found_literals}
+
+
+class TemplateIndex:
+    def __init__(self, data: dict):
+        self.tokens = data.get("tokens", {})
+        self.literals = data.get("literals", {})
+
+    def paths_for(self, keys) -> list[list[int]]:
+        paths = []
+        for key in keys:
+            paths.extend(self.tokens.get(key) or self.literals.get(key) or [])
+        return paths
+
+    def block_paths(self, block_tokens) -> list[list[int]]:
+        """
+        Top-level paragraphs holding any of the given tokens (case-insensitive).
+        """
+        wanted = {token.lower() for token in block_tokens}
+        paths = []
+        for token, token_paths in self.tokens.items():
+            if token.lower() in wanted:
+                paths.extend(path for path in token_paths if len(path) == 1)
+        return paths
+
+    @staticmethod
+    def resolve(doc, paths) -> list:
+        """
+        Map element paths onto `doc` in document order, without duplicates.
+        Must run before the document is mutated, since paths are positional.
+        """
+        body = doc.element.body
+        resolved = []
+        for path in sorted({tuple(path) for path in paths}):
+            element = body
+            try:
+                for idx in path:
+                    element = element[idx]
+            except IndexError:
+                return None
+            if element.tag != qn("w:p"):
+                return None
+            resolved.append(element)
+        return resolved
+
+
+class TemplateIndexStore:
+    """
+    Placeholder indexes compiled once per template and persisted as JSON
+    next to templates.json. Entries are recompiled when the DOCX mtime or
+    size changes, or when a placeholder literal was not indexed yet.
+    """
+
+    def __init__(self, index_path: str):
+        self.index_path = index_path
+        self._entries = None
+        self._lock = threading.Lock()
+
+    def _key(self, template_path: str) -> str:
+        path = os.path.abspath(template_path)
+        if path.startswith(BASE_DIR + os.sep):
+            return os.path.relpath(path, BASE_DIR)
+        return path
+
+    def _load_raw(self) -> dict:
+        if not os.path.exists(self.index_path):
+            return {}
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_raw(self, entries: dict):
+        directory = os.path.dirname(self.index_path) or "."
+        fd, tmp_path = tempfile.mkstemp(prefix=".templates.index.", dir=directory)
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(entries, fh)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, self.index_path)
+
+    def get(self, template_path: str, document, literals=()) -> TemplateIndex:
+        stat = os.stat(template_path)
+        key = self._key(template_path)
+        literals = {str(value) for value in literals if value and not TOKEN_PATTERN.fullmatch(str(value))}
+
+        with self._lock:
+            if self._entries is None:
+                self._entries = self._load_raw()
+
+            entry = self._entries.get(key)
+            fresh = (
+                entry is not None
+                and entry.get("mtime_ns") == stat.st_mtime_ns
+                and entry.get("size") == stat.st_size
+                and literals.issubset(entry.get("literals", {}))
+            )
+            if not fresh:
+                if entry and entry.get("mtime_ns") == stat.st_mtime_ns and entry.get("size") == stat.st_size:
+                    literals |= set(entry.get("literals", {}))
+                entry = compile_template_index(document, literals)
+                entry.update({"mtime_ns": stat.st_mtime_ns, "size": stat.st_size})
+                self._entries[key] = entry
+                try:
+                    self._save_raw(self._entries)
+                except OSError:
+                    # A read-only deploy still benefits from the in-memory index.
+                    pass
+
+            return TemplateIndex(entry)
+
+
+template_index = TemplateIndexStore(TEMPLATE_INDEX_PATH)
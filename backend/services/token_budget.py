@@ -0,0 +1,74 @@
+import threading
+import time
+
+from config import AI_TOKENS_PER_MINUTE
+
+
+class TokenBudget:
+    """
+    Tokens-per-minute limiter shared by every model call in the process.
+    Callers reserve an estimate before calling and settle it with the real
+    usage afterwards; reservations wait until the bucket has refilled.
+    A budget of 0 or less disables the limit. `clock` returns seconds and
+    defaults to time.monotonic.
+    """
+
+    def __init__(self, tokens_per_minute: int, clock=time.monotonic):
+        self.capacity = tokens_per_minute
+        self._clock = clock
+        self._available = float(tokens_per_minute)
+        self._refilled_at = clock()
+        self._cond = threading.Condition()
+        self.reserved = 0
+        self.waited_seconds = 0.0
+
+    def _refill(self):
+        now = self._clock()
+        self._available = min(self.capacity, self._available + (now - self._refilled_at) * self.capacity / 60.0)
+        self._refilled_at = now
+
+    def reserve(self, tokens: int, timeout: float = None):
+        if self.capacity <= 0:
+            return
+        # A single call larger than the whole budget waits for a full bucket.
+        tokens = min(tokens, self.capacity)
+        started = self._clock()
+        with self._cond:
+            while True:
+                self._refill()
+                if self._available >= tokens:
+                    self._available -= tokens
+                    self.reserved += tokens
+                    self.waited_seconds += self._clock() - started
+                    return
+                wait = (tokens - self._available) * 60.0 / self.capacity
+                if timeout is not None:
+                    left = timeout - (self._clock() - started)
+                    if left <= 0:
+                        raise TimeoutError("Token budget exhausted.")
+                    wait = min(wait, left)
+                self._cond.wait(wait)
+
+    def settle(self, reserved: int, used: int):
+        """
+        Return the unused part of a reservation, or charge the overrun.
+        """
+        if self.capacity <= 0 or used is None:
+            return
+        with self._cond:
+            self._refill()
+            self._available = min(self.capacity, self._available + min(reserved, self.capacity) - used)
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        with self._cond:
+            self._refill()
+            return {
+                "tokens_per_minute": self.capacity,
+                "available": int(self._available),
+                "reserved": self.reserved,
+                "waited_seconds": round(self.waited_seconds, 3),
+            }
+
+
+ai_token_budget = TokenBudget(AI_TOKENS_PER_MINUTE)
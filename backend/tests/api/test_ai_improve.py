@@ -0,0 +1,107 @@
+from app.api import routes_ai
+from app.extensions import db
+from app.models.ai_job import AIJob
+from app.models.project import Project
+from app.models.section import ProjectSection
+from app.models.user import User
+from app.workers import tasks_ai
+
+
+class FakeProvider:
+    enabled = True
+    model_name = "fake-model"
+
+    def __init__(self):
+        self.calls = 0
+
+    def improve_section(self, section_title, content, target_words):
+        self.calls += 1
+        return {"improved_text": f"{content} ({target_words} words)", "changes_summary": "rewritten"}
+
+
+def _project():
+    project = Project(owner_id=User.query.first().id, title="Library System")
+    db.session.add(project)
+    db.session.commit()
+    return project
+
+
+def test_identical_improve_requests_reuse_completed_job(client, monkeypatch):
+    project = _project()
+
+    provider = FakeProvider()
+    monkeypatch.setattr(routes_ai, "get_ai_provider", lambda: provider)
+    url = f"/api/projects/{project.id}/sections/doc_introduction/improve"
+
+    first = client.post(url, json={"content": "draft", "target_words": 200}).get_json()
+    second = client.post(url, json={"content": "draft", "target_words": 200}).get_json()
+    assert first == second == {"improved_text": "draft (200 words)", "changes_summary": "rewritten"}
+    assert provider.calls == 1
+    assert AIJob.query.count() == 1
+    assert AIJob.query.first().model == "fake-model"
+
+    client.post(url, json={"content": "draft", "target_words": 300})
+    assert provider.calls == 2
+
+    client.application.config["AI_JOB_REUSE_MAX_AGE"] = 0
+    client.post(url, json={"content": "draft", "target_words": 200})
+    assert provider.calls == 3
+
+
+def test_async_improve_queues_one_job_and_polls_result(client, monkeypatch, fake_queue):
+    project = _project()
+    provider = FakeProvider()
+    monkeypatch.setattr(routes_ai, "get_ai_provider", lambda: provider)
+    monkeypatch.setattr(tasks_ai, "get_ai_provider", lambda: provider)
+    url = f"/api/projects/{project.id}/sections/doc_scope/improve"
+    body = {"content": "draft", "target_words": 150, "mode": "async"}
+
+    first = client.post(url, json=body)
+    again = client.post(url, json=body)
+    assert first.status_code == again.status_code == 202
+    assert first.get_json()["job_id"] == again.get_json()["job_id"]
+    assert len(fake_queue) == 1 and provider.calls == 0
+
+    status_url = first.get_json()["status_url"]
+    assert client.get(status_url).get_json()["status"] == "queued"
+
+    func, args = fake_queue.jobs[0]
+    func(*args)
+
+    polled = client.get(status_url).get_json()
+    assert polled["status"] == "completed"
+    assert polled["result"]["improved_text"] == "draft (150 words)"
+    section = ProjectSection.query.filter_by(project_id=project.id, section_key="doc_scope").first()
+    assert section.plain_text == "draft (150 words)"
+
+    # Completed jobs are served without queueing again.
+    done = client.post(url, json=body)
+    assert done.status_code == 200 and len(fake_queue) == 1
+
+
+def test_async_improve_reuses_another_projects_result_under_the_callers_project(client, monkeypatch, fake_queue):
+    provider = FakeProvider()
+    monkeypatch.setattr(routes_ai, "get_ai_provider", lambda: provider)
+    other, mine = _project(), _project()
+    body = {"content": "draft", "target_words": 150}
+    client.post(f"/api/projects/{other.id}/sections/doc_scope/improve", json=body)
+
+    response = client.post(f"/api/projects/{mine.id}/sections/doc_scope/improve", json={**body, "mode": "async"})
+    assert response.status_code == 200
+    payload = response.get_json()
+    assert payload["project_id"] == mine.id and payload["status_url"].startswith(f"/api/projects/{mine.id}/")
+    assert len(fake_queue) == 0 and provider.calls == 1
+
+    polled = client.get(payload["status_url"])
+    assert polled.status_code == 200
+    assert polled.get_json()["result"]["improved_text"] == "draft (150 words)"
+
+
+def test_async_improve_rejects_when_queue_is_full(client, monkeypatch, fake_queue):
+    project = _project()
+    fake_queue.jobs = [None] * 3
+    client.application.config["AI_QUEUE_MAX_DEPTH"] = 3
+    monkeypatch.setattr(routes_ai, "get_ai_provider", FakeProvider)
+
+    response = client.post(f"/api/projects/{project.id}/sections/doc_scope/improve", json={"content": "x", "mode": "async"})
+    assert response.status_code == 503
@@ -0,0 +1,33 @@
+import json
+
+from app import app as legacy_app
+from services.ai_service import DOC_KEYS
+
+# app.py is loaded by path, so reach its module globals through a view.
+ai_service = legacy_app.view_functions["api_generate_ai_stream"].__globals__["ai_service"]
+
+
+def _events(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_generate_ai_stream_sends_sections_then_done(monkeypatch):
+    # Without GOOGLE_API_KEY the service streams fallback drafts.
+    monkeypatch.setattr(ai_service, "enabled", False)
+    response = legacy_app.test_client().get("/api/generate-ai/stream?project_title=Library%20Management")
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+    events = _events(response.get_data(as_text=True))
+    assert [data["key"] for event, data in events[:-1]] == DOC_KEYS
+    assert events[-1][0] == "done"
+    assert events[-1][1]["source"] == "fallback"
+
+
+def test_generate_ai_stream_requires_a_title():
+    response = legacy_app.test_client().post("/api/generate-ai/stream", json={})
+    assert response.status_code == 400
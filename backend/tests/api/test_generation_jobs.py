@@ -0,0 +1,94 @@
+import json
+import os
+
+import pytest
+from docx import Document
+
+from app import app as legacy_app
+from app.extensions import db
+from app.models.export_job import ExportJob
+from app.workers.tasks_export import run_document_generation
+from services import document_service
+from services.file_service import validate_documentation
+
+# app.py is loaded by path, so reach its module globals through a view.
+template_service = legacy_app.view_functions["api_generate_document"].__globals__["template_service"]
+
+
+@pytest.fixture()
+def generated_dir(tmp_path, monkeypatch):
+    path = tmp_path / "generated"
+    monkeypatch.setattr(document_service, "GENERATED_DIR", str(path))
+    return path
+
+
+@pytest.fixture()
+def template_path(tmp_path):
+    path = tmp_path / "template.docx"
+    doc = Document()
+    doc.add_paragraph("[[student_name]] - [[doc_introduction]]")
+    doc.save(path)
+    return path
+
+
+def _generation_form(monkeypatch, template_path):
+    # os.path.join(BASE_DIR, file) keeps an absolute template path as is.
+    monkeypatch.setattr(template_service, "get_template", lambda name: {"file": str(template_path), "old_details": {}})
+    documentation = {key: f"Text for {key}" for key in validate_documentation({})}
+    documentation["doc_introduction"] = "Intro text"
+    return {
+        "async": "1",
+        "selectedTemplate": "Test Template",
+        "studentDetails": json.dumps({"name": "Asha", "project": "Library", "professor": "P", "guide": "G", "year": "2024"}),
+        "documentation": json.dumps(documentation),
+    }
+
+
+def test_generation_job_reports_progress_and_download(client, template_path, generated_dir):
+    job = ExportJob(export_type="docx", status="queued")
+    db.session.add(job)
+    db.session.commit()
+
+    spec = {
+        "template_path": str(template_path),
+        "template_config": {"file": "template.docx", "old_details": {}},
+        "payload": {
+            "studentDetails": {"name": "Asha"},
+            "documentation": {"doc_introduction": "Intro text"},
+        },
+    }
+    out_name = run_document_generation(job.id, spec)
+
+    body = client.get(f"/api/jobs/{job.id}").get_json()
+    assert body["status"] == "completed"
+    assert body["progress"] == 100
+    assert body["download_url"] == f"/api/download/{out_name}"
+
+    assert Document(generated_dir / out_name).paragraphs[0].text == "Asha - Intro text"
+
+
+# app_instance creates the tables that app.py's export jobs are written to.
+def test_async_generate_document_enqueues_a_job(app_instance, monkeypatch, fake_queue, template_path, generated_dir):
+    legacy = legacy_app.test_client()
+    response = legacy.post("/api/generate-document", data=_generation_form(monkeypatch, template_path))
+
+    assert response.status_code == 202
+    data = response.get_json()["data"]
+    assert data["status"] == "queued" and data["status_url"] == f"/api/jobs/{data['job_id']}"
+    assert len(fake_queue) == 1
+
+    func, args = fake_queue.jobs[0]
+    out_name = func(*args)
+    assert legacy.get(data["status_url"]).get_json()["status"] == "completed"
+    assert Document(generated_dir / out_name).paragraphs[0].text == "Asha - Intro text"
+
+
+def test_async_generate_document_reports_an_unavailable_queue(app_instance, monkeypatch, fake_queue, template_path, generated_dir):
+    fake_queue.unavailable = True
+    legacy = legacy_app.test_client()
+    response = legacy.post("/api/generate-document", data=_generation_form(monkeypatch, template_path))
+
+    assert response.status_code == 503
+    job_id = response.get_json()["data"]["job_id"]
+    assert legacy.get(f"/api/jobs/{job_id}").get_json()["status"] == "failed"
+    assert not os.path.exists(generated_dir)
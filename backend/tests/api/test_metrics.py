@@ -0,0 +1,27 @@
+from sqlalchemy.exc import OperationalError
+
+from app import app as legacy_app
+
+# app.py is loaded by path, so reach its module globals through a view.
+corpus_index = legacy_app.view_functions["api_metrics"].__globals__["corpus_index"]
+
+
+def test_metrics_survive_missing_plagiarism_tables(monkeypatch, isolated_stores):
+    def missing_tables():
+        raise OperationalError("SELECT count(*) FROM projects", {}, Exception("no such table: projects"))
+
+    monkeypatch.setattr(corpus_index, "stats", missing_tables)
+    response = legacy_app.test_client().get("/api/metrics")
+
+    assert response.status_code == 200
+    data = response.get_json()["data"]
+    assert data["plagiarism_index"] == {"error": "no such table: projects"}
+    assert "template_cache" in data
+
+
+def test_metrics_report_empty_stores_without_creating_them(isolated_stores, tmp_path):
+    data = legacy_app.test_client().get("/api/metrics").get_json()["data"]
+
+    assert data["uploads"] == {"blobs": 0, "bytes": 0, "refs": 0}
+    assert data["ai_cache"]["entries"] == 0
+    assert not any(tmp_path.iterdir())
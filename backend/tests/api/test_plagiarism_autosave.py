@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta
+
+from app.extensions import db
+from app.models.project import Project
+from app.models.section_fingerprint import SectionFingerprint
+from app.models.user import User
+from app.services.plagiarism.corpus_index import corpus_index
+
+INTRO = "the attendance system records student presence with face recognition and exports monthly reports " * 2
+
+
+def _document(intro, scope="the scope covers three departments and two semesters of classes"):
+    return {"sections": [{"id": "intro", "content": intro}, {"id": "scope", "content": scope}]}
+
+
+def _project():
+    project = Project(owner_id=User.query.first().id, title="Attendance")
+    db.session.add(project)
+    db.session.commit()
+    return project
+
+
+def test_autosave_queues_one_refresh_and_reports_staleness(client, fake_queue):
+    project = _project()
+    url = f"/api/projects/{project.id}/autosave"
+
+    client.post(url, json={"document": _document(INTRO)})
+    client.post(url, json={"document": _document(INTRO + " updated")})
+    assert len(fake_queue.jobs) == 1
+    assert corpus_index.stats()["stale_projects"] == 1
+
+    func, args = fake_queue.jobs[0]
+    assert func(*args) == 2
+    stats = corpus_index.stats()
+    assert stats["stale_projects"] == 0 and stats["oldest_stale_seconds"] == 0
+
+    # Only the edited section is fingerprinted again; unchanged saves queue nothing.
+    edited = _document(INTRO + " updated", "a new scope for the whole college campus")
+    client.patch(f"/api/projects/{project.id}", json={"document": edited})
+    client.post(url, json={"document": edited})
+    assert len(fake_queue.jobs) == 2
+    func, args = fake_queue.jobs[1]
+    assert func(*args) == 1
+
+
+def test_autosave_updates_inline_when_queue_is_unavailable(client, fake_queue):
+    project = _project()
+    fake_queue.unavailable = True
+    client.post(f"/api/projects/{project.id}/autosave", json={"document": _document(INTRO)})
+
+    assert SectionFingerprint.query.filter_by(project_id=project.id).count() == 2
+    assert corpus_index.stats()["stale_projects"] == 0
+
+
+def test_stale_refresh_request_is_queued_again(client, fake_queue):
+    project = _project()
+    url = f"/api/projects/{project.id}/autosave"
+
+    client.post(url, json={"document": _document(INTRO)})
+    client.post(url, json={"document": _document(INTRO + " again")})
+    assert len(fake_queue.jobs) == 1
+
+    # The queued job was lost; once the request outlives the timeout the next save re-enqueues.
+    timeout = client.application.config["PLAGIARISM_INDEX_TIMEOUT"]
+    project.fingerprint_requested_at = datetime.utcnow() - timedelta(seconds=timeout + 1)
+    db.session.commit()
+    client.post(url, json={"document": _document(INTRO + " once more")})
+    assert len(fake_queue.jobs) == 2
+
+
+def test_inline_refresh_failure_does_not_fail_the_save(client, monkeypatch, fake_queue):
+    project = _project()
+    fake_queue.unavailable = True
+
+    def broken(project):
+        raise RuntimeError("index unavailable")
+
+    monkeypatch.setattr(corpus_index, "index_project", broken)
+    response = client.post(f"/api/projects/{project.id}/autosave", json={"document": _document(INTRO)})
+
+    assert response.status_code == 200
+    assert db.session.get(Project, project.id).document_json == _document(INTRO)
+    assert corpus_index.stats()["stale_projects"] == 1
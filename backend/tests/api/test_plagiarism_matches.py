@@ -0,0 +1,54 @@
+from app.extensions import db
+from app.models.lsh_bucket import LSHBucket
+from app.models.project import Project
+from app.models.section_fingerprint import SectionFingerprint
+from app.models.user import User
+from app.services.plagiarism.corpus_index import corpus_index
+from app.services.plagiarism.minhash import BANDS
+
+COPIED = (
+    "the proposed system uses a convolutional neural network trained on labelled leaf images "
+    "to detect crop disease early and recommends treatment based on the predicted class and "
+    "the severity estimated from the infected area of each leaf sample collected in the field"
+)
+
+
+def _project(title, sections):
+    project = Project(
+        owner_id=User.query.first().id,
+        title=title,
+        document_json={"sections": [{"id": key, "content": text} for key, text in sections.items()]},
+    )
+    db.session.add(project)
+    db.session.commit()
+    return project
+
+
+def test_check_reports_copied_sections_from_other_projects(client):
+    source = _project("Crop Disease Detection", {"intro": COPIED, "scope": "farmers in rural districts " * 3})
+    _project("Hostel Booking", {"intro": "a web portal for booking hostel rooms with online payments and room allocation " * 2})
+    corpus_index.index_project(source)
+    db.session.commit()
+
+    suspect = _project("Plant Health", {"overview": "Introduction. " + COPIED + " using a mobile app"})
+    body = client.post(f"/api/projects/{suspect.id}/plagiarism/check", json={}).get_json()
+
+    assert [match["project_id"] for match in body["matches"]] == [source.id]
+    match = body["matches"][0]
+    assert match["sections"][0]["matched_section_id"] == "intro"
+    assert match["spans"][0]["text"].startswith("the proposed system uses")
+    assert body["overall_similarity"] >= match["similarity"] > 50
+    # The checked project is indexed too, but never matches itself.
+    assert SectionFingerprint.query.filter_by(project_id=suspect.id).count() == 1
+
+
+def test_reindex_only_rewrites_changed_sections(client):
+    project = _project("Crop Disease Detection", {"intro": COPIED, "scope": COPIED[::-1]})
+    assert corpus_index.index_project(project) == 2
+    assert corpus_index.index_project(project) == 0
+
+    project.document_json = {"sections": [{"id": "intro", "content": COPIED + " again"}]}
+    assert corpus_index.index_project(project) == 2
+    db.session.commit()
+    assert SectionFingerprint.query.filter_by(project_id=project.id).count() == 1
+    assert LSHBucket.query.filter_by(project_id=project.id).count() == BANDS
@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta
+
+from app.extensions import db
+from app.models.plagiarism_report import PlagiarismReport
+from app.models.project import Project
+from app.models.user import User
+
+
+def _document(scope):
+    return {"sections": [{"id": "intro", "content": "an inventory tracker for small shops " * 4}, {"id": "scope", "content": scope}]}
+
+
+def _project():
+    project = Project(owner_id=User.query.first().id, title="Inventory")
+    db.session.add(project)
+    db.session.commit()
+    return project
+
+
+def test_check_is_queued_once_and_reused_while_unchanged(client, fake_queue):
+    project = _project()
+    url = f"/api/projects/{project.id}/plagiarism/check"
+
+    first = client.post(url, json={"document": _document("one store")})
+    again = client.post(url, json={"document": _document("one store")})
+    assert first.status_code == again.status_code == 202
+    assert first.get_json()["report_id"] == again.get_json()["report_id"]
+    assert len(fake_queue.jobs) == 1
+
+    status_url = first.get_json()["status_url"]
+    assert client.get(status_url).get_json()["status"] == "queued"
+    func, args = fake_queue.jobs[0]
+    func(*args)
+
+    polled = client.get(status_url).get_json()
+    assert polled["status"] == "completed"
+    assert "originality_percentage" in polled["result"]
+
+    cached = client.post(url, json={"document": _document("one store")})
+    assert cached.status_code == 200
+    assert cached.get_json()["cached"] is True
+    assert cached.get_json()["originality_percentage"] == polled["result"]["originality_percentage"]
+    assert PlagiarismReport.query.count() == 1
+
+    changed = client.post(url, json={"document": _document("three stores")})
+    assert changed.status_code == 202 and len(fake_queue.jobs) == 2
+
+
+def test_stale_queued_report_is_failed_and_queued_again(client, fake_queue):
+    project = _project()
+    url = f"/api/projects/{project.id}/plagiarism/check"
+
+    lost = client.post(url, json={"document": _document("one store")}).get_json()
+    report = db.session.get(PlagiarismReport, lost["report_id"])
+    timeout = client.application.config["PLAGIARISM_JOB_TIMEOUT"]
+    report.created_at = datetime.utcnow() - timedelta(seconds=timeout + 1)
+    db.session.commit()
+
+    retried = client.post(url, json={"document": _document("one store")})
+    assert retried.status_code == 202
+    assert retried.get_json()["report_id"] != lost["report_id"]
+    assert len(fake_queue.jobs) == 2
+    assert client.get(lost["status_url"]).get_json()["status"] == "failed"
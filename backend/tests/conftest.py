@@ -1,8 +1,30 @@
 import pytest
 
+from app import app as legacy_app
 from app import create_app
+from app.api import routes_ai, routes_plagiarism, routes_projects
 from app.extensions import db
 from app.models.user import User
+from services.ai_cache import ai_cache
+from services.blob_store import blob_store
+from services.template_index import template_index
+
+
+@pytest.fixture(autouse=True)
+def isolated_template_index(tmp_path, monkeypatch):
+    # Document builds compile their template's placeholder index and persist
+    # it; keep that out of the real backend/templates.index.json.
+    monkeypatch.setattr(template_index, "index_path", str(tmp_path / "templates.index.json"))
+    monkeypatch.setattr(template_index, "_entries", None)
+
+
+@pytest.fixture()
+def isolated_stores(tmp_path, monkeypatch):
+    # Keep the AI response cache and the upload blob index out of the real
+    # backend/cache and backend/uploads.
+    monkeypatch.setattr(ai_cache, "path", str(tmp_path / "ai_responses.sqlite3"))
+    monkeypatch.setattr(blob_store, "root", str(tmp_path / "uploads"))
+    monkeypatch.setattr(blob_store, "index_path", str(tmp_path / "uploads" / "sha256" / "index.sqlite3"))
 
 
 @pytest.fixture()
@@ -27,3 +49,34 @@ def app_instance():
 @pytest.fixture()
 def client(app_instance):
     return app_instance.test_client()
+
+
+class FakeQueue:
+    """
+    Records enqueued jobs instead of sending them to Redis; tests run them
+    by hand with `func, args = queue.jobs[i]; func(*args)`. Setting
+    `unavailable` makes enqueue fail like a queue without Redis.
+    """
+
+    def __init__(self):
+        self.jobs = []
+        self.unavailable = False
+
+    def __len__(self):
+        return len(self.jobs)
+
+    def enqueue(self, func, *args, **kwargs):
+        if self.unavailable:
+            raise ConnectionError("redis down")
+        self.jobs.append((func, args))
+
+
+@pytest.fixture()
+def fake_queue(monkeypatch):
+    queue = FakeQueue()
+    for module in (routes_ai, routes_plagiarism, routes_projects):
+        monkeypatch.setattr(module, "get_queue", lambda name="default": queue)
+    # app.py is loaded by path; patch its module globals through a view.
+    legacy_globals = legacy_app.view_functions["api_generate_document"].__globals__
+    monkeypatch.setitem(legacy_globals, "get_queue", lambda name="default": queue)
+    return queue
@@ -0,0 +1,80 @@
+import json
+
+from services.ai_cache import AIResponseCache, normalize_title, title_tokens
+from services.ai_service import DOC_KEYS, AIService
+
+
+class _FakeModel:
+    def __init__(self, payload):
+        self.payload = payload
+        self.calls = 0
+
+    def generate_content(self, prompt):
+        self.calls += 1
+        return type("Response", (), {"text": json.dumps(self.payload)})()
+
+
+def _service(tmp_path, payload):
+    service = AIService(cache=AIResponseCache(str(tmp_path / "ai.sqlite3"), ttl=3600, max_entries=10, similarity=0.8))
+    service.enabled = True
+    service.model = _FakeModel(payload)
+    return service
+
+
+def test_exact_key_keeps_word_order_and_every_word():
+    assert normalize_title("  Face-Recognition   Attendance System!") == "face recognition attendance system"
+    assert normalize_title("Attendance using Face Recognition") != normalize_title("Face Recognition Attendance")
+    assert title_tokens("Face-Recognition Attendance System") == title_tokens("attendance using face recognition")
+
+
+def test_cache_hits_exact_and_near_duplicate_titles(tmp_path):
+    cache = AIResponseCache(str(tmp_path / "ai.sqlite3"), ttl=3600, max_entries=10, similarity=0.8)
+    cache.put("College Library Book Management System", "gemini", "1", {"doc_scope": "Books"})
+
+    assert cache.get("college-library book  management SYSTEM", "gemini", "1") == {"doc_scope": "Books"}
+    assert cache.get("College Library Book Management Portal", "gemini", "1") == {"doc_scope": "Books"}
+    assert cache.get("Hospital Management", "gemini", "1") is None
+    assert cache.get("College Library Book Management", "gemini", "2") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["near_hits"], stats["misses"]) == (1, 1, 2)
+
+
+def test_near_duplicate_titles_are_opt_in(tmp_path):
+    cache = AIResponseCache(str(tmp_path / "ai.sqlite3"), ttl=3600, max_entries=10)
+    cache.put("College Library Book Management System", "gemini", "1", {"doc_scope": "Books"})
+
+    assert cache.get("College Library Book Management Portal", "gemini", "1") is None
+    # Reordered or stopword-only differences are different titles too.
+    assert cache.get("System for College Library Book Management", "gemini", "1") is None
+    assert cache.stats()["near_hits"] == 0
+
+
+def test_cache_expires_and_bounds_entries(tmp_path):
+    cache = AIResponseCache(str(tmp_path / "ai.sqlite3"), ttl=3600, max_entries=2)
+    for title in ("Alpha Tracker", "Beta Tracker", "Gamma Tracker"):
+        cache.put(title, "gemini", "1", {"title": title})
+
+    assert cache.get("Alpha Tracker", "gemini", "1") is None
+    assert cache.stats()["entries"] == 2
+
+    cache.ttl = -1
+    assert cache.get("Gamma Tracker", "gemini", "1") is None
+
+
+def test_generate_documentation_caches_complete_model_responses(tmp_path):
+    service = _service(tmp_path, {key: f"Text for {key}" for key in DOC_KEYS})
+
+    first = service.generate_documentation("Face Recognition Attendance")
+    second = service.generate_documentation("face recognition attendance system")
+
+    assert first == second
+    assert service.model.calls == 1
+
+
+def test_generate_documentation_does_not_cache_fallback_content(tmp_path):
+    service = _service(tmp_path, {"doc_introduction": "Only one section"})
+
+    service.generate_documentation("Face Recognition Attendance")
+    service.generate_documentation("Face Recognition Attendance")
+
+    assert service.model.calls == 2
@@ -0,0 +1,100 @@
+import json
+import re
+import threading
+
+from services import ai_service as ai_module
+from services.ai_cache import AIResponseCache
+from services.ai_service import DOC_KEYS, AIService
+from services.token_budget import TokenBudget
+
+
+class _SectionModel:
+    def __init__(self, malformed_once=(), always_fail=(), together=2):
+        self.malformed_once = set(malformed_once)
+        self.always_fail = set(always_fail)
+        # The first `together` calls only return once they are all in flight,
+        # which cannot happen if sections run one at a time.
+        self.together = threading.Barrier(together, timeout=5)
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt):
+        key = re.search(r'exactly one key: "(doc_\w+)"', prompt).group(1)
+        with self._lock:
+            self.calls += 1
+            first = self.calls <= self.together.parties
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        if first:
+            self.together.wait()
+        with self._lock:
+            self.active -= 1
+        if key in self.always_fail:
+            raise RuntimeError("model overloaded")
+        if key in self.malformed_once:
+            self.malformed_once.discard(key)
+            return type("Response", (), {"text": "{not json"})()
+        return type("Response", (), {"text": json.dumps({key: f"Text for {key}"})})()
+
+
+def _service(tmp_path, model, budget=0):
+    service = AIService(
+        cache=AIResponseCache(str(tmp_path / "ai.sqlite3"), ttl=3600, max_entries=10),
+        token_budget=TokenBudget(budget),
+    )
+    service.enabled = True
+    service.model = model
+    return service
+
+
+def test_sections_run_concurrently_and_retry_on_their_own(tmp_path, monkeypatch):
+    monkeypatch.setattr(ai_module, "SECTION_RETRY_BACKOFF", 0)
+    model = _SectionModel(malformed_once={"doc_scope"}, always_fail={"doc_modules"})
+    service = _service(tmp_path, model)
+
+    data, report = service.generate_documentation_parallel("Library Management")
+
+    assert list(data) == DOC_KEYS
+    assert data["doc_scope"] == "Text for doc_scope"
+    assert data["doc_modules"] == service._fallback("Library Management")["doc_modules"]
+    assert report["sections"]["doc_scope"]["attempts"] == 2
+    assert report["sections"]["doc_modules"]["fallback"] is True
+    assert not model.together.broken
+    assert 1 < model.peak <= ai_module.AI_SECTION_CONCURRENCY
+    # A result patched with drafts is not cached.
+    assert service.cache.get("Library Management", ai_module.GEMINI_MODEL, ai_module.PROMPT_VERSION) is None
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_budget_waits_for_refill_and_refunds_unused_tokens():
+    clock = _Clock()
+    budget = TokenBudget(6000, clock=clock)
+    budget.reserve(6000)
+    budget.settle(6000, 1000)
+
+    # The refund covers this reservation without waiting.
+    budget.reserve(5000)
+    assert budget.waited_seconds == 0
+
+    granted = threading.Event()
+    waiter = threading.Thread(target=lambda: (budget.reserve(50), granted.set()))
+    waiter.start()
+    # With the clock stopped the bucket never refills.
+    assert not granted.wait(0.05)
+
+    # 6000 tokens a minute refill at 100 a second.
+    clock.now += 0.5
+    # settle() wakes waiting reservations so they re-check the bucket.
+    budget.settle(0, 0)
+    assert granted.wait(5)
+    waiter.join()
+    assert budget.waited_seconds == 0.5
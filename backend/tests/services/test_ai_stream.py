@@ -0,0 +1,66 @@
+import json
+
+from config import GEMINI_MODEL
+from services.ai_cache import AIResponseCache
+from services.ai_service import DOC_KEYS, PROMPT_VERSION, AIService
+from services.json_stream import ObjectStreamParser
+
+
+class _StreamingModel:
+    def __init__(self, text, chunk_size=7, fail_after=None):
+        self.text = text
+        self.chunk_size = chunk_size
+        self.fail_after = fail_after
+
+    def generate_content(self, prompt, stream=False):
+        assert stream
+        for idx in range(0, len(self.text), self.chunk_size):
+            if self.fail_after is not None and idx >= self.fail_after:
+                raise RuntimeError("stream reset")
+            yield type("Chunk", (), {"text": self.text[idx : idx + self.chunk_size]})()
+
+
+def _service(tmp_path, model):
+    service = AIService(cache=AIResponseCache(str(tmp_path / "ai.sqlite3"), ttl=3600, max_entries=10))
+    service.enabled = True
+    service.model = model
+    return service
+
+
+def test_parser_emits_members_as_they_close_across_chunks():
+    text = '```json\n{"a": "x \\"quoted\\", y}", "b": {"n": [1, 2]}, "c": 3, "d": "\\u00e9"}\n```'
+    parser = ObjectStreamParser()
+    members = []
+    for char in text:
+        members.extend(parser.feed(char))
+
+    assert members == [("a", 'x "quoted", y}'), ("b", {"n": [1, 2]}), ("c", 3), ("d", "é")]
+    assert parser.done
+
+
+def test_stream_yields_sections_in_arrival_order_and_caches(tmp_path):
+    payload = {key: f"Text for {key}" for key in reversed(DOC_KEYS)}
+    service = _service(tmp_path, _StreamingModel(json.dumps(payload)))
+
+    events = list(service.stream_documentation("Library Management"))
+
+    sections = [data["key"] for event, data in events if event == "section"]
+    assert sections == list(reversed(DOC_KEYS))
+    event, done = events[-1]
+    assert event == "done"
+    assert done["source"] == "model"
+    assert done["documentation"] == payload
+    assert done["time_to_first_section_ms"] <= done["total_ms"]
+    assert service.stream_stats()["streams"] == 1
+    assert service.generate_documentation("Library Management") == payload
+
+
+def test_stream_fills_sections_lost_mid_stream_with_drafts(tmp_path):
+    text = json.dumps({key: f"Text for {key}" for key in DOC_KEYS})
+    service = _service(tmp_path, _StreamingModel(text, fail_after=len(text) // 2))
+
+    events = list(service.stream_documentation("Library Management"))
+
+    fallback = [data["key"] for event, data in events if event == "section" and data["fallback"]]
+    assert fallback and fallback[-1] == DOC_KEYS[-1]
+    assert service.cache.get("Library Management", GEMINI_MODEL, PROMPT_VERSION) is None
@@ -0,0 +1,46 @@
+import json
+import zipfile
+
+from docx import Document
+
+from services.batch_service import generate_batch
+from services.preview_service import DOC_KEYS
+
+
+def _student(name):
+    return {
+        "studentDetails": {"name": name, "project": "P", "professor": "X", "guide": "G", "year": "2025"},
+        "documentation": {key: f"{name} {key}" for key in DOC_KEYS},
+        "codeFiles": [{"filename": "main.py", "content": "print(1)"}],
+    }
+
+
+def test_batch_bundles_reports_and_records_failures(tmp_path):
+    template_path = tmp_path / "template.docx"
+    doc = Document()
+    doc.add_paragraph("[[student_name]]")
+    doc.save(template_path)
+
+    students = [_student("Asha"), {"studentDetails": {"name": "Ravi"}}, _student("Meera")]
+    progress = []
+    output = tmp_path / "cohort.zip"
+
+    report = generate_batch(
+        str(template_path),
+        {"file": "template.docx", "old_details": {}},
+        students,
+        str(output),
+        max_workers=2,
+        on_progress=lambda r: progress.append(r["completed"] + r["failed"]),
+    )
+
+    assert (report["completed"], report["failed"]) == (2, 1)
+    assert progress[-1] == 3
+    assert report["items"][1]["status"] == "failed"
+    assert "project" in report["items"][1]["error"]
+
+    with zipfile.ZipFile(output) as archive:
+        assert sorted(archive.namelist()) == ["001_Asha.docx", "003_Meera.docx", "metadata.json"]
+        assert json.loads(archive.read("metadata.json"))["failed"] == 1
+        with archive.open("003_Meera.docx") as fh:
+            assert Document(fh).paragraphs[0].text == "Meera"
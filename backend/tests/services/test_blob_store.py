@@ -0,0 +1,33 @@
+import io
+import os
+
+from services.blob_store import BlobStore
+
+
+def test_identical_uploads_share_one_blob_until_released(tmp_path):
+    store = BlobStore(str(tmp_path), str(tmp_path / "sha256" / "index.sqlite3"))
+
+    key, path = store.put(io.BytesIO(b"print('hi')\n"), "main.PY")
+    again, same_path = store.put(io.BytesIO(b"print('hi')\n"), "copy.py")
+
+    assert again == key and same_path == path
+    assert key.startswith("sha256/") and key.endswith(".py")
+    assert store.refs(key) == 2
+    assert store.resolve(key) == path
+    assert store.stats() == {"blobs": 1, "bytes": 12, "refs": 2}
+
+    store.release(path)
+    assert os.path.exists(path)
+    store.release(key)
+    assert not os.path.exists(path)
+    assert store.resolve(key) is None
+
+
+def test_resolve_rejects_names_outside_the_store(tmp_path):
+    store = BlobStore(str(tmp_path / "uploads"), str(tmp_path / "uploads" / "sha256" / "index.sqlite3"))
+    store.put(io.BytesIO(b"x"), "a.txt")
+    (tmp_path / "secret.txt").write_text("no")
+
+    assert store.resolve("../secret.txt") is None
+    assert store.resolve("sha256/index.sqlite3") is None
+    assert store.release("../secret.txt") is False
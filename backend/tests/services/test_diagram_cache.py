@@ -0,0 +1,33 @@
+import os
+import time
+
+from services.diagram_cache import DiagramRenderCache
+
+
+def test_cache_key_ignores_line_endings_and_trailing_space(tmp_path):
+    cache = DiagramRenderCache(str(tmp_path), 1024)
+    cache.put("@startuml\nA -> B\n@enduml", "png", b"png-bytes")
+
+    assert cache.get("@startuml  \r\nA -> B\r\n@enduml\r\n", "png") == b"png-bytes"
+    assert cache.get("@startuml\nA -> B\n@enduml", "svg") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = DiagramRenderCache(str(tmp_path), 250)
+    for name in ("a", "b"):
+        cache.put(name, "png", b"x" * 100)
+    # Age both entries, then touch "a" so "b" is the least recently used.
+    for dirpath, _, filenames in os.walk(tmp_path):
+        for filename in filenames:
+            os.utime(os.path.join(dirpath, filename), (time.time() - 60, time.time() - 60))
+    assert cache.get("a", "png") is not None
+
+    cache.put("c", "png", b"x" * 100)
+
+    assert cache.get("b", "png") is None
+    assert cache.get("a", "png") is not None
+    assert cache.get("c", "png") is not None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] == 200
@@ -0,0 +1,84 @@
+import io
+import shutil
+import sys
+import textwrap
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+from PIL import Image, ImageChops, ImageStat
+
+from config import PLANTUML_JAR
+from services.diagram_renderers import KrokiRenderer, LocalPlantUMLRenderer
+from services.diagram_service import FALLBACK_DIAGRAM_TYPES, _fallback_plantuml
+
+# Speaks the `plantuml -pipe -pipedelimitor X` protocol without a JVM.
+FAKE_PLANTUML = textwrap.dedent(
+    """
+    import os, sys
+    delimiter = sys.argv[sys.argv.index("-pipedelimitor") + 1].encode()
+    lines = []
+    for line in sys.stdin.buffer:
+        lines.append(line)
+        if line.strip() == b"@enduml":
+            out = sys.stdout.buffer
+            out.write(b"IMG:%d:" % os.getpid() + b"".join(lines).strip() + b"\\n" + delimiter + b"\\n")
+            out.flush()
+            lines = []
+    """
+)
+
+
+@pytest.fixture
+def fake_renderer(tmp_path):
+    script = tmp_path / "fake_plantuml.py"
+    script.write_text(FAKE_PLANTUML)
+    renderer = LocalPlantUMLRenderer(pool_size=2, command=[sys.executable, str(script)])
+    yield renderer
+    renderer.close()
+
+
+def test_local_renderer_reuses_warm_processes(fake_renderer):
+    first = fake_renderer.render("@startuml\nA -> B\n@enduml")
+    second = fake_renderer.render("@startuml\nB -> C\n@enduml")
+
+    assert first.endswith(b"@startuml\nA -> B\n@enduml")
+    assert second.endswith(b"@startuml\nB -> C\n@enduml")
+    # Both diagrams went through the same long-lived process.
+    assert first.split(b":")[1] == second.split(b":")[1]
+    assert fake_renderer.stats()["processes"] == {"png": 1}
+
+
+def test_local_renderer_pool_is_bounded(fake_renderer):
+    sources = [f"@startuml\nA -> B{idx}\n@enduml" for idx in range(8)]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(fake_renderer.render, sources))
+
+    assert [result.split(b":", 2)[2] for result in results] == [source.encode() for source in sources]
+    assert fake_renderer.stats()["processes"]["png"] <= 2
+    assert fake_renderer.stats()["renders"] == 8
+
+
+def _kroki_reachable(renderer):
+    try:
+        return requests.get(f"{renderer.base_url}/health", timeout=5).ok
+    except requests.RequestException:
+        return False
+
+
+@pytest.mark.skipif(not (PLANTUML_JAR and shutil.which("java")), reason="PLANTUML_JAR and java are required")
+def test_local_output_matches_kroki_for_fallback_diagrams():
+    kroki = KrokiRenderer()
+    if not _kroki_reachable(kroki):
+        pytest.skip("Kroki is unreachable")
+    local = LocalPlantUMLRenderer()
+    try:
+        for diagram_type in FALLBACK_DIAGRAM_TYPES:
+            source = _fallback_plantuml("Smart Attendance", diagram_type)
+            with Image.open(io.BytesIO(local.render(source))) as ours, Image.open(io.BytesIO(kroki.render(source))) as theirs:
+                assert ours.size == theirs.size, diagram_type
+                diff = ImageChops.difference(ours.convert("RGB"), theirs.convert("RGB"))
+                # Font hinting may differ between PlantUML builds; the layout may not.
+                assert max(ImageStat.Stat(diff).mean) < 8, diagram_type
+    finally:
+        local.close()
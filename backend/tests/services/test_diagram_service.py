@@ -0,0 +1,105 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from services import diagram_service, http_transport
+from services.blob_store import BlobStore
+from services.diagram_cache import DiagramRenderCache
+from services.diagram_renderers import KrokiRenderer
+
+
+@pytest.fixture(autouse=True)
+def render_cache(tmp_path, monkeypatch):
+    cache = DiagramRenderCache(str(tmp_path / "diagrams"), 1024 * 1024)
+    monkeypatch.setattr(diagram_service, "diagram_cache", cache)
+    store = BlobStore(str(tmp_path / "uploads"), str(tmp_path / "uploads" / "sha256" / "index.sqlite3"))
+    monkeypatch.setattr(diagram_service, "blob_store", store)
+    monkeypatch.setattr(diagram_service, "get_renderer", lambda language: KrokiRenderer())
+    monkeypatch.setattr(http_transport, "transport", http_transport.HttpTransport())
+    # A private executor, drained before the patches above are undone, so no
+    # render outlives the test and writes to the real stores.
+    executor = ThreadPoolExecutor(max_workers=8)
+    monkeypatch.setattr(diagram_service, "_executor", executor)
+    yield cache
+    executor.shutdown(wait=True)
+
+
+class _FakeResponse:
+    def __init__(self, status_code, content=b""):
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self.content = content
+        self.text = ""
+        self.headers = {}
+
+    def json(self):
+        return {"error": "model not found"}
+
+
+def _fake_post(delay, kroki_delay=None):
+    def post(session, url, timeout=None, **kwargs):
+        if url.endswith("/plantuml/png"):
+            time.sleep(delay if kroki_delay is None else kroki_delay)
+            return _FakeResponse(200, b"\x89PNG\r\n\x1a\n" + kwargs["data"])
+        time.sleep(delay)
+        # A 404 from the router falls back to the built-in PlantUML.
+        return _FakeResponse(404)
+
+    return post
+
+
+def test_diagram_set_runs_types_concurrently(monkeypatch):
+    types = ["Class Diagram", "Activity Diagram", "Sequence Diagram", "Use Case Diagram"]
+    # Every router call waits until all types are in flight; run serially, the barrier times out.
+    barrier = threading.Barrier(len(types), timeout=5)
+    post = _fake_post(0.0)
+
+    def concurrent_post(session, url, **kwargs):
+        if not url.endswith("/plantuml/png"):
+            barrier.wait()
+        return post(session, url, **kwargs)
+
+    monkeypatch.setattr(requests.Session, "post", concurrent_post)
+    results = diagram_service.generate_diagram_set("Smart Attendance", types, "key")
+
+    assert not barrier.broken
+    assert [item["diagram_type"] for item in results] == types
+    assert all(item["status"] == "success" and item["filename"].startswith("sha256/") for item in results)
+
+
+def test_diagram_set_reports_types_past_the_deadline(monkeypatch):
+    release = threading.Event()
+    post = _fake_post(0.0)
+
+    def blocked_kroki(session, url, **kwargs):
+        if url.endswith("/plantuml/png"):
+            release.wait(5)
+        return post(session, url, **kwargs)
+
+    monkeypatch.setattr(requests.Session, "post", blocked_kroki)
+    results = diagram_service.generate_diagram_set("Smart Attendance", ["Class Diagram"], "key", timeout=0.1)
+
+    assert results == [{"diagram_type": "Class Diagram", "status": "error", "error": "Diagram generation deadline exceeded."}]
+    # Let the orphaned render finish; past its deadline it must not store a blob.
+    release.set()
+    diagram_service._executor.shutdown(wait=True)
+    assert diagram_service.blob_store.stats()["blobs"] == 0
+
+
+def test_repeat_diagrams_are_served_from_the_render_cache(monkeypatch, render_cache):
+    monkeypatch.setattr(requests.Session, "post", _fake_post(0.0))
+    diagram_service.generate_diagram_set("Smart Attendance", ["Class Diagram"], "key")
+
+    def offline(session, url, **kwargs):
+        if url.endswith("/plantuml/png"):
+            raise requests.ConnectionError("Kroki is unreachable")
+        return _FakeResponse(404)
+
+    monkeypatch.setattr(requests.Session, "post", offline)
+    results = diagram_service.generate_diagram_set("Smart Attendance", ["Class Diagram"], "key")
+
+    assert results[0]["status"] == "success"
+    assert render_cache.stats()["hits"] == 1
@@ -0,0 +1,53 @@
+import os
+import tempfile
+
+from docx import Document
+
+from app import app as legacy_app
+from config import GENERATED_DIR
+from services.document_service import generate_document_stream
+
+
+def test_stream_returns_complete_package_without_persisting(tmp_path):
+    template_path = tmp_path / "template.docx"
+    doc = Document()
+    doc.add_paragraph("[[student_name]]")
+    doc.save(template_path)
+    before = set(os.listdir(GENERATED_DIR)) if os.path.isdir(GENERATED_DIR) else set()
+
+    out_name, buffer, size = generate_document_stream(
+        template_path=str(template_path),
+        template_config={"file": "template.docx", "old_details": {}},
+        payload={"studentDetails": {"name": "Asha"}, "documentation": {}},
+        code_items=[],
+        screenshots=[],
+        diagrams=[],
+    )
+
+    with buffer:
+        data = buffer.read()
+        assert len(data) == size
+        buffer.seek(0)
+        assert Document(buffer).paragraphs[0].text == "Asha"
+
+    assert out_name.endswith(".docx")
+    after = set(os.listdir(GENERATED_DIR)) if os.path.isdir(GENERATED_DIR) else set()
+    assert after == before
+
+
+def test_streamed_response_reads_an_in_memory_buffer_without_spilling_it():
+    # app.py is loaded by path, so reach its module globals through a view.
+    stream_docx = legacy_app.view_functions["api_generate_document"].__globals__["_stream_docx"]
+    payload = os.urandom(200 * 1024)
+    buffer = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    buffer.write(payload)
+    buffer.seek(0)
+
+    with legacy_app.test_request_context():
+        response = stream_docx("report.docx", buffer, len(payload))
+        assert b"".join(response.response) == payload
+        assert not buffer._rolled
+        response.close()
+
+    assert buffer.closed
+    assert response.content_length == len(payload)
@@ -0,0 +1,82 @@
+import io
+import zipfile
+
+from docx import Document
+from PIL import Image
+
+from services import image_service
+from services.document_service import DIAGRAM_PLACEHOLDER, SCREENSHOT_PLACEHOLDER, build_document
+from services.package_writer import write_package
+
+
+def _members(doc):
+    buffer = io.BytesIO()
+    write_package(doc, buffer)
+    with zipfile.ZipFile(buffer) as archive:
+        return {name: archive.read(name) for name in archive.namelist()}
+
+
+def test_pooled_figures_keep_order_and_numbering(tmp_path, monkeypatch):
+    template_path = tmp_path / "template.docx"
+    doc = Document()
+    doc.add_paragraph("[[student_name]]")
+    doc.add_paragraph(SCREENSHOT_PLACEHOLDER)
+    doc.add_paragraph(DIAGRAM_PLACEHOLDER)
+    doc.save(template_path)
+
+    def images(prefix, colors):
+        items = []
+        for idx, color in enumerate(colors):
+            path = tmp_path / f"{prefix}_{idx}.png"
+            Image.new("RGB", (320 + idx, 200), color).save(path)
+            items.append({"name": f"{prefix.title()} {idx}", "path": str(path)})
+        return items
+
+    kwargs = {
+        "template_path": str(template_path),
+        "template_config": {"file": "template.docx", "old_details": {}},
+        "payload": {"studentDetails": {"name": "Asha", "project": "Attendance"}, "documentation": {}},
+        "code_items": [],
+        "screenshots": images("shot", ["red", "green"]),
+        "diagrams": images("diagram", ["blue", "yellow", "purple"]),
+    }
+
+    submitted = []
+    get_pool = image_service._get_pool
+
+    class SpyPool:
+        def submit(self, *args):
+            future = get_pool().submit(*args)
+            submitted.append(future)
+            return future
+
+    monkeypatch.setattr(image_service, "_get_pool", SpyPool)
+    workers = image_service._pool_workers
+    try:
+        image_service.use_image_pool(2)
+        monkeypatch.setattr(image_service, "IMAGE_CACHE_DIR", str(tmp_path / "pooled"))
+        pooled = build_document(**kwargs)
+        image_service.use_image_pool(1)
+        monkeypatch.setattr(image_service, "IMAGE_CACHE_DIR", str(tmp_path / "inline"))
+        inline = build_document(**kwargs)
+    finally:
+        image_service.use_image_pool(workers)
+
+    # All five figures were normalized by pool processes, into the test's cache.
+    assert len(submitted) == 5 and all(future.exception() is None for future in submitted)
+    assert all(future.result().startswith(str(tmp_path / "pooled")) for future in submitted)
+    assert len(list((tmp_path / "inline").rglob("*.png"))) == 5
+
+    # Blocks are inserted directly after their placeholder, so each group reads last to first.
+    figures = [p.text for p in pooled.paragraphs if p.text.startswith(("Shot", "Diagram", "Figure"))]
+    assert figures == [
+        "Shot 1",
+        "Shot 0",
+        "Figure 3: Diagram 2",
+        "Diagram 2",
+        "Figure 2: Diagram 1",
+        "Diagram 1",
+        "Figure 1: Diagram 0",
+        "Diagram 0",
+    ]
+    assert _members(pooled) == _members(inline)
@@ -0,0 +1,72 @@
+import pytest
+import requests
+
+from services import diagram_service, http_transport
+from services.http_transport import CircuitOpenError, HttpTransport
+
+
+class _Response:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self.headers = {}
+        self.text = ""
+
+
+def _scripted(monkeypatch, statuses):
+    calls = []
+
+    def post(session, url, timeout=None, **kwargs):
+        calls.append(url)
+        status = statuses.pop(0)
+        if isinstance(status, Exception):
+            raise status
+        return _Response(status)
+
+    monkeypatch.setattr(requests.Session, "post", post)
+    return calls
+
+
+def test_retries_429_and_503_then_succeeds(monkeypatch):
+    calls = _scripted(monkeypatch, [429, 503, 200])
+    transport = HttpTransport(attempts=3, backoff=0, max_backoff=0)
+
+    response = transport.post("https://kroki.example/plantuml/png")
+
+    assert response.status_code == 200
+    assert len(calls) == 3
+    stats = transport.stats()["kroki.example"]
+    assert stats["retries"] == 2
+    assert stats["circuit"] == "closed"
+
+
+def test_circuit_opens_after_repeated_failures_and_recovers(monkeypatch):
+    calls = _scripted(monkeypatch, [requests.ConnectionError("down"), 500, 200])
+    transport = HttpTransport(attempts=1, failure_threshold=2, reset_after=60)
+    url = "https://router.example/model"
+
+    with pytest.raises(requests.ConnectionError):
+        transport.post(url)
+    assert transport.post(url).status_code == 500
+    with pytest.raises(CircuitOpenError):
+        transport.post(url)
+    assert len(calls) == 2
+
+    # After the reset window one trial call is let through.
+    transport._host("router.example").breaker.opened_at -= 60
+    assert transport.post(url).status_code == 200
+    assert transport.stats()["router.example"]["circuit"] == "closed"
+
+
+def test_open_circuit_switches_straight_to_fallback_plantuml(monkeypatch):
+    transport = HttpTransport(failure_threshold=1, reset_after=60)
+    monkeypatch.setattr(http_transport, "transport", transport)
+    host = transport._host("router.huggingface.co")
+    host.breaker.record_failure()
+    calls = _scripted(monkeypatch, [])
+
+    code = diagram_service._generate_plantuml_via_hf("Smart Attendance", "Class Diagram", "key")
+
+    assert code == diagram_service._fallback_plantuml("Smart Attendance", "Class Diagram")
+    assert calls == []
+    assert transport.stats()["router.huggingface.co"]["rejected"] == 1
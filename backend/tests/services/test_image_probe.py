@@ -0,0 +1,25 @@
+import pytest
+from PIL import Image
+
+from services.image_probe import probe_image
+
+
+@pytest.mark.parametrize(
+    "name,save_kwargs",
+    [
+        ("shot.png", {"dpi": (144, 144)}),
+        ("photo.jpg", {"dpi": (300, 300), "quality": 80}),
+        ("lossy.webp", {"lossless": False}),
+        ("lossless.webp", {"lossless": True}),
+        ("legacy.gif", {}),
+    ],
+)
+def test_probe_matches_pil(tmp_path, name, save_kwargs):
+    path = tmp_path / name
+    Image.new("RGB", (321, 123), "navy").save(path, **save_kwargs)
+
+    info = probe_image(str(path))
+
+    assert (info.width, info.height) == (321, 123)
+    if "dpi" in save_kwargs:
+        assert round(info.dpi[0]) == save_kwargs["dpi"][0]
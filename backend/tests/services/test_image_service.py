@@ -0,0 +1,69 @@
+import os
+
+from PIL import Image
+
+from services import image_service
+from services.image_service import normalize_image
+
+
+def _photo(path, size, orientation=1):
+    # Noise keeps the image out of the small-palette PNG path.
+    image = Image.effect_noise(size, 64).convert("RGB")
+    exif = Image.Exif()
+    exif[0x0112] = orientation
+    image.save(path, format="JPEG", quality=95, exif=exif)
+    return str(path)
+
+
+def test_large_image_is_downsampled_to_target_dpi(tmp_path, monkeypatch):
+    monkeypatch.setattr(image_service, "IMAGE_CACHE_DIR", str(tmp_path / "cache"))
+    source = _photo(tmp_path / "wide.jpg", (2000, 500))
+
+    result = normalize_image(source)
+
+    assert result.startswith(str(tmp_path / "cache"))
+    with Image.open(result) as image:
+        assert image.width == round(image_service.MAX_IMAGE_WIDTH_INCHES * image_service.IMAGE_TARGET_DPI)
+        assert abs(image.width / image.height - 4) < 0.01
+
+
+def test_exif_orientation_is_applied(tmp_path, monkeypatch):
+    monkeypatch.setattr(image_service, "IMAGE_CACHE_DIR", str(tmp_path / "cache"))
+    # Orientation 6: stored landscape, displayed rotated 90 degrees.
+    source = _photo(tmp_path / "phone.jpg", (300, 200), orientation=6)
+
+    with Image.open(normalize_image(source)) as image:
+        assert image.size == (200, 300)
+        assert image.getexif().get(0x0112, 1) == 1
+
+
+def test_cached_result_is_reused(tmp_path, monkeypatch):
+    monkeypatch.setattr(image_service, "IMAGE_CACHE_DIR", str(tmp_path / "cache"))
+    source = _photo(tmp_path / "shot.jpg", (400, 300))
+    first = normalize_image(source)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("cache hit should not decode the image")
+
+    monkeypatch.setattr(image_service.Image, "open", fail)
+    assert normalize_image(source) == first
+
+
+def test_least_recently_used_images_are_evicted(tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / "cache")
+    monkeypatch.setattr(image_service, "IMAGE_CACHE_DIR", cache_dir)
+    sources = [_photo(tmp_path / f"{name}.jpg", (300, 300)) for name in "abc"]
+    first = normalize_image(sources[0])
+    size = os.path.getsize(first)
+    monkeypatch.setattr(image_service, "IMAGE_CACHE_MAX_BYTES", int(size * 2.5))
+    monkeypatch.setattr(image_service, "_cache_bytes", {})
+
+    second = normalize_image(sources[1])
+    # Age both entries, then hit "a" so "b" is the least recently used.
+    for path in (first, second):
+        os.utime(path, (os.path.getmtime(path) - 60,) * 2)
+    assert normalize_image(sources[0]) == first
+    third = normalize_image(sources[2])
+
+    assert os.path.exists(first) and os.path.exists(third)
+    assert not os.path.exists(second)
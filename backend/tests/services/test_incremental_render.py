@@ -0,0 +1,104 @@
+import io
+import zipfile
+
+from docx import Document
+from PIL import Image
+
+from services import document_service, image_service
+from services.blob_store import BlobStore
+from services.document_service import CODE_PLACEHOLDER, SCREENSHOT_PLACEHOLDER, build_document, generate_document_stream
+from services.package_writer import write_package
+from services.render_sessions import render_sessions
+
+
+def _members(buffer):
+    with zipfile.ZipFile(buffer) as archive:
+        return {name: archive.read(name) for name in archive.namelist()}
+
+
+def _render_full(**kwargs):
+    buffer = io.BytesIO()
+    write_package(build_document(**kwargs), buffer)
+    return _members(buffer)
+
+
+def test_regeneration_splices_changes_and_matches_full_build(tmp_path):
+    template_path = tmp_path / "template.docx"
+    doc = Document()
+    doc.add_paragraph("[[student_name]]")
+    doc.add_paragraph("[[doc_introduction]]")
+    doc.add_paragraph(CODE_PLACEHOLDER)
+    doc.add_paragraph("[[doc_conclusion]]")
+    doc.save(template_path)
+
+    base = {
+        "template_path": str(template_path),
+        "template_config": {"file": "template.docx", "old_details": {}},
+        "screenshots": [],
+        "diagrams": [],
+    }
+    first = {
+        "payload": {
+            "studentDetails": {"name": "Asha", "project": "Attendance"},
+            "documentation": {"doc_introduction": "Intro", "doc_conclusion": "End"},
+            "references": ["https://a.example"],
+        },
+        "code_items": [{"filename": "main.py", "content": "print(1)"}],
+    }
+    second = {
+        "payload": {
+            "studentDetails": {"name": "Asha", "project": "Attendance"},
+            "documentation": {"doc_introduction": "New intro", "doc_conclusion": "End"},
+            "references": ["https://a.example", "https://b.example"],
+        },
+        "code_items": [{"filename": "main.py", "content": "print(2)"}, {"filename": "util.py", "content": "x = 1"}],
+    }
+
+    render_sessions.clear()
+    generate_document_stream(**base, **first)
+    hits = render_sessions.stats()["hits"]
+    _, buffer, _ = generate_document_stream(**base, **second)
+
+    assert render_sessions.stats()["hits"] == hits + 1
+    assert _members(buffer) == _render_full(**base, **second)
+    buffer.seek(0)
+    texts = [p.text for p in Document(buffer).paragraphs]
+    assert "New intro" in texts and "print(2)" in texts and "2. https://b.example" in texts
+
+
+def test_reuploaded_screenshot_keeps_the_render_incremental(tmp_path, monkeypatch):
+    store = BlobStore(str(tmp_path / "uploads"), str(tmp_path / "uploads" / "sha256" / "index.sqlite3"))
+    monkeypatch.setattr(document_service, "blob_store", store)
+    monkeypatch.setattr(image_service, "IMAGE_CACHE_DIR", str(tmp_path / "images"))
+    full_builds = []
+    render_full = document_service._render_full
+    monkeypatch.setattr(document_service, "_render_full", lambda *args: full_builds.append(1) or render_full(*args))
+
+    template_path = tmp_path / "template.docx"
+    doc = Document()
+    doc.add_paragraph("[[doc_introduction]]")
+    doc.add_paragraph(SCREENSHOT_PLACEHOLDER)
+    doc.save(template_path)
+    image = io.BytesIO()
+    Image.new("RGB", (40, 30), "blue").save(image, format="PNG")
+
+    def generate(introduction):
+        # Each generation uploads the screenshot and releases it afterwards.
+        _, path = store.put_bytes(image.getvalue(), "screen.png")
+        generate_document_stream(
+            template_path=str(template_path),
+            template_config={"file": "template.docx", "old_details": {}},
+            payload={"studentDetails": {"name": "Asha", "project": "Attendance"}, "documentation": {"doc_introduction": introduction}},
+            code_items=[],
+            screenshots=[{"name": "Login", "path": path}],
+            diagrams=[],
+        )
+        store.release(path)
+        return path
+
+    render_sessions.clear()
+    first_path = generate("Intro")
+    assert not (tmp_path / "uploads" / store.key_for(first_path)).exists()
+    generate("New intro")
+
+    assert len(full_builds) == 1
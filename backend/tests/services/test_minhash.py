@@ -0,0 +1,41 @@
+import numpy as np
+
+from app.config import Config
+from app.services.plagiarism.minhash import NUM_PERM, band_keys, estimate_similarity, shingle_hashes, signature, words
+
+BASE = (
+    "the library management system lets students reserve books online and tracks due dates "
+    "with automatic email reminders while librarians manage inventory from a single dashboard "
+    "that also reports overdue items fines and popular titles for each academic term"
+)
+
+
+def test_signature_similarity_tracks_jaccard():
+    left = shingle_hashes(words(BASE))
+    right = shingle_hashes(words(BASE.replace("email", "sms").replace("dashboard", "console")))
+    exact = len(np.intersect1d(left, right)) / len(np.union1d(left, right))
+
+    estimate = estimate_similarity(signature(left), signature(right))
+    assert abs(estimate - exact) < 0.15
+    assert estimate_similarity(signature(left), signature(left)) == 1.0
+
+
+def test_identical_text_shares_every_band_and_short_text_has_no_shingles():
+    sig = signature(shingle_hashes(words(BASE)))
+    assert sig.shape == (NUM_PERM,)
+    assert band_keys(sig) == band_keys(signature(shingle_hashes(words(BASE.upper()))))
+    assert len(shingle_hashes(words("too short"))) == 0
+
+
+def test_sections_at_the_match_threshold_almost_always_share_a_band():
+    # Two shingle sets whose Jaccard is the match threshold (0.3 by default).
+    shared = round(1000 * Config.PLAGIARISM_MATCH_THRESHOLD)
+    rng = np.random.default_rng(7)
+    trials = 200
+    candidates = 0
+    for _ in range(trials):
+        pool = rng.choice(1 << 32, size=1000, replace=False).astype(np.uint64)
+        left, right = pool[:(1000 + shared) // 2], pool[(1000 - shared) // 2:]
+        if set(band_keys(signature(left))) & set(band_keys(signature(right))):
+            candidates += 1
+    assert candidates / trials >= 0.95
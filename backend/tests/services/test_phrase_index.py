@@ -0,0 +1,67 @@
+import numpy as np
+
+from app.services.plagiarism.ngram_web_check import PhraseIndex, build_phrase_index, phrase_hashes
+
+REFERENCE = (
+    "photosynthesis is the process by which green plants and some other organisms use sunlight "
+    "to synthesize foods from carbon dioxide and water generating oxygen as a by product "
+) * 3
+
+
+def test_copied_text_is_found_in_built_index(tmp_path):
+    path = str(tmp_path / "phrases.npy")
+    count = build_phrase_index([REFERENCE, "a second unrelated reference document about rivers and lakes " * 4], path, sample=2)
+    stored = np.load(path)
+    assert len(stored) == count and np.all(stored[1:] > stored[:-1])
+
+    index = PhraseIndex(path, sample=2, max_phrases=1000)
+    copied = index.lookup("In our report: " + REFERENCE[:400])
+    assert copied["phrases_checked"] > 0
+    # Only the (at most 3) phrases that include the added prefix can miss.
+    assert copied["phrases_found"] >= copied["phrases_checked"] - 3
+    assert index.lookup("students build a hostel booking portal with online payments and room allocation")["phrases_found"] == 0
+
+
+def test_missing_index_reports_nothing(tmp_path):
+    index = PhraseIndex(str(tmp_path / "absent.npy"), sample=4, max_phrases=10)
+    assert index.lookup(REFERENCE) == {"phrases_checked": 0, "phrases_found": 0}
+
+
+def test_reference_blocks_keep_phrases_across_boundaries(tmp_path, monkeypatch):
+    import run
+
+    reference = tmp_path / "dump.txt"
+    reference.write_text("".join(f"line {index} of the reference dump about rivers\n" for index in range(200)))
+    monkeypatch.setattr(run, "REFERENCE_BLOCK_BYTES", 256)
+
+    blocks = list(run._reference_texts([str(reference)], include_projects=False))
+    assert len(blocks) > 10
+    found = set(np.concatenate([phrase_hashes(block, 1) for block in blocks]).tolist())
+    assert found == set(phrase_hashes(reference.read_text(), 1).tolist())
+
+
+def test_cli_does_not_index_saved_projects_by_default(app_instance, tmp_path, monkeypatch):
+    import run
+    from app.extensions import db
+    from app.models.project import Project
+    from app.models.user import User
+    from app.services.plagiarism import similarity_engine
+
+    document = {"sections": [{"id": "intro", "content": REFERENCE}]}
+    db.session.add(Project(owner_id=User.query.first().id, title="Photosynthesis", document_json=document))
+    db.session.commit()
+    reference = tmp_path / "rivers.txt"
+    reference.write_text("a reference document about rivers lakes and the water cycle of the planet " * 4)
+    path = str(tmp_path / "phrases.npy")
+    monkeypatch.setattr(similarity_engine, "phrase_index", PhraseIndex(path, sample=4, max_phrases=1000))
+    runner = app_instance.test_cli_runner()
+
+    result = runner.invoke(run.build_phrase_index_command, [str(reference), "-o", path])
+    assert result.exit_code == 0, result.output
+    report = similarity_engine.compute_similarity_report(document)
+    assert report["reference_corpus"]["phrases_found"] == 0
+    assert report["originality_percentage"] > 0
+
+    # Opting in indexes the project, which then matches its own text.
+    runner.invoke(run.build_phrase_index_command, [str(reference), "--projects", "-o", path])
+    assert similarity_engine.compute_similarity_report(document)["reference_corpus"]["share"] == 100.0
@@ -0,0 +1,42 @@
+import threading
+
+import pytest
+
+from app.services.ai.single_flight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    flights = SingleFlight()
+    release = threading.Event()
+    calls = []
+    results = []
+
+    def work():
+        calls.append(1)
+        release.wait(5)
+        return "answer"
+
+    threads = [threading.Thread(target=lambda: results.append(flights.do("k", work))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    while flights.shared < 4:
+        threading.Event().wait(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert sorted(results) == [("answer", False)] + [("answer", True)] * 4
+    # The key is released afterwards, so a new call runs again.
+    assert flights.do("k", lambda: "again") == ("again", False)
+
+
+def test_errors_propagate_to_the_caller():
+    flights = SingleFlight()
+
+    def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        flights.do("k", fail)
+    assert flights.do("k", lambda: 1) == (1, False)
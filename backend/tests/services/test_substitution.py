@@ -0,0 +1,35 @@
+from docx import Document
+
+from services.placeholder_service import PlaceholderMatcher
+
+
+def test_single_pass_replaces_split_runs_and_tables():
+    doc = Document()
+    paragraph = doc.add_paragraph()
+    paragraph.add_run("Intro: [[doc_")
+    paragraph.add_run("introduction]] by ")
+    bold = paragraph.add_run("[[student_name]]")
+    bold.bold = True
+    doc.add_table(rows=1, cols=1).cell(0, 0).text = "Guide: [[guide_name]]"
+
+    matcher = PlaceholderMatcher(
+        [
+            ("[[doc_introduction]]", "Hello"),
+            ("[[student_name]]", "Asha"),
+            ("[[guide_name]]", "Dr. Rao"),
+        ]
+    )
+    assert matcher.substitute_document(doc) == 2
+
+    assert paragraph.text == "Intro: Hello by Asha"
+    assert paragraph.runs[2].bold is True
+    assert doc.tables[0].cell(0, 0).text == "Guide: Dr. Rao"
+
+
+def test_replacement_text_is_not_rescanned():
+    doc = Document()
+    paragraph = doc.add_paragraph("[[doc_scope]] [[doc_objective]]")
+
+    PlaceholderMatcher([("[[doc_scope]]", "[[doc_objective]]"), ("[[doc_objective]]", "goal")]).substitute_document(doc)
+
+    assert paragraph.text == "[[doc_objective]] goal"
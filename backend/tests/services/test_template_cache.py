@@ -0,0 +1,40 @@
+from docx import Document
+
+from services.template_cache import TemplateCache
+
+
+def _make_template(path, text):
+    doc = Document()
+    doc.add_paragraph(text)
+    doc.save(path)
+
+
+def test_clones_are_independent_and_counted(tmp_path):
+    template_path = tmp_path / "template.docx"
+    _make_template(template_path, "[[student_name]]")
+    cache = TemplateCache(max_bytes=10 * 1024 * 1024)
+
+    first = cache.get(str(template_path)).clone()
+    first.paragraphs[0].text = "changed"
+    second = cache.get(str(template_path)).clone()
+
+    assert second.paragraphs[0].text == "[[student_name]]"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_eviction_by_size(tmp_path):
+    paths = []
+    for idx in range(3):
+        path = tmp_path / f"t{idx}.docx"
+        _make_template(path, f"template {idx}")
+        paths.append(str(path))
+
+    entry_bytes = TemplateCache(max_bytes=10**9).get(paths[0]).nbytes
+    cache = TemplateCache(max_bytes=entry_bytes * 2 + entry_bytes // 2)
+    for path in paths:
+        cache.get(path)
+
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["evictions"] == 1
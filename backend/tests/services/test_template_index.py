@@ -0,0 +1,31 @@
+import os
+
+from docx import Document
+
+from services.template_index import TemplateIndex, TemplateIndexStore
+
+
+def test_index_is_persisted_and_invalidated(tmp_path):
+    template_path = tmp_path / "template.docx"
+    doc = Document()
+    doc.add_paragraph("Intro")
+    doc.add_paragraph("[[doc_scope]] by Old Name")
+    doc.add_table(rows=1, cols=1).cell(0, 0).text = "[[SCREENSHOT_BLOCK]]"
+    doc.save(template_path)
+
+    store = TemplateIndexStore(str(tmp_path / "templates.index.json"))
+    index = store.get(str(template_path), doc, literals=["Old Name"])
+
+    anchors = TemplateIndex.resolve(doc, index.paths_for(["[[doc_scope]]", "Old Name"]))
+    assert len(anchors) == 1
+    assert anchors[0] is doc.paragraphs[1]._element
+    assert index.block_paths({"[[screenshot_block]]"}) == []
+    assert os.path.exists(tmp_path / "templates.index.json")
+
+    reloaded = TemplateIndexStore(str(tmp_path / "templates.index.json"))
+    assert reloaded.get(str(template_path), doc, literals=["Old Name"]).tokens == index.tokens
+
+    doc.add_paragraph("[[doc_modules]]")
+    doc.save(template_path)
+    os.utime(template_path, ns=(0, 1))
+    assert "[[doc_modules]]" in reloaded.get(str(template_path), doc).tokens
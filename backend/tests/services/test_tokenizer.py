@@ -0,0 +1,36 @@
+from app.services.plagiarism.similarity_engine import compute_similarity_report
+from app.services.plagiarism.tokenizer import lexical_diversity, ngram_counts, repeated_terms, report_tokens, section_tokens
+
+
+def test_section_tokens_are_cached_and_skip_short_tokens():
+    tokens = section_tokens("An API for the Library and the library")
+    assert section_tokens("An API for the Library and the library") is tokens
+    assert sorted(tokens.words) == ["and", "api", "for", "library", "the"]
+    ids = tokens.ids
+    assert len(ids) == 7
+    assert ids[2] == ids[5] and ids[3] == ids[6]
+    assert [tokens.words[token_id] for token_id in ids] == ["api", "for", "the", "library", "and", "the", "library"]
+    assert lexical_diversity(ids) == 5 / 7
+
+
+def test_report_ids_are_scoped_to_the_report():
+    first, second = section_tokens("alpha beta gamma"), section_tokens("gamma delta alpha")
+    words, ids = report_tokens([first, second])
+    assert sorted(words) == ["alpha", "beta", "delta", "gamma"]
+    assert list(words[ids]) == ["alpha", "beta", "gamma", "gamma", "delta", "alpha"]
+    assert ids.max() < len(words)
+
+
+def test_repeated_terms_and_phrases():
+    words, ids = report_tokens([section_tokens("zeta alpha beta gamma " * 5 + "alpha beta")])
+    assert repeated_terms(ids, words, min_count=5) == [{"token": "alpha", "count": 6}, {"token": "beta", "count": 6}]
+    phrases = ngram_counts(ids, words, 3, min_count=4)
+    assert sorted(item["phrase"] for item in phrases) == ["alpha beta gamma", "zeta alpha beta"]
+    assert {item["count"] for item in phrases} == {5}
+    assert ngram_counts(ids, words, 3, min_count=5) == []
+
+
+def test_report_lists_repeated_phrases():
+    report = compute_similarity_report({"sections": [{"id": "intro", "content": "the proposed system improves accuracy " * 6}]})
+    assert report["top_repeated_phrases"][0]["count"] >= 5
+    assert report["flagged_sections"][0]["section_id"] == "intro"
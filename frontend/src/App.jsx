@@ -13,7 +13,7 @@ import StudentDetailsForm from "./components/StudentDetailsForm";
 import SuccessPanel from "./components/SuccessPanel";
 import TabNavigation from "./components/TabNavigation";
 import TemplateSelector from "./components/TemplateSelector";
-import { downloadFile, fetchTemplates, generateDocument, requestAIContent, requestPreview } from "./services/api";
+import { downloadFile, fetchTemplates, generateDocument, requestPreview, streamAIContent } from "./services/api";
 
 const defaultDocumentation = {
   doc_introduction: "",
@@ -223,7 +223,8 @@ export default function App() {
 
     try {
       setLoadingAI(true);
-      const aiDocs = await requestAIContent(projectTitle);
+      // Sections are filled in as they stream in.
+      const aiDocs = await streamAIContent(projectTitle, setDocField);
       setState((prev) => ({ ...prev, documentation: { ...prev.documentation, ...aiDocs } }));
       pushToast("success", "AI content generated successfully.");
     } catch (error) {
@@ -63,6 +63,74 @@ export default function ProjectDiagramsManager({ projectTitle, diagrams, setDiag
     });
   };
 
+  const applyGenerated = async (diagramKey, diagramLabel, filename) => {
+    const fileResponse = await fetch(toApiUrl(`/uploads/${encodeURIComponent(filename)}`));
+    if (!fileResponse.ok) {
+      throw new Error("Generated image could not be fetched.");
+    }
+    const blob = await fileResponse.blob();
+    const file = new File([blob], filename, { type: blob.type || "image/png" });
+
+    setAiFilenames((prev) => ({ ...prev, [diagramKey]: filename }));
+    updateDiagram(diagramKey, {
+      diagramKey,
+      name: diagramLabel.replace(/^[A-I]\.\s+/, ""),
+      file,
+      source: "ai",
+      aiFilename: filename,
+      previewUrl: toApiUrl(`/uploads/${encodeURIComponent(filename)}?t=${Date.now()}`),
+    });
+    setMessage(diagramKey, "success", "Diagram generated successfully.");
+  };
+
+  const handleGenerateAll = async () => {
+    const title = (projectTitle || "").trim();
+    if (!title) {
+      DIAGRAM_TYPES.forEach((item) => setMessage(item.key, "error", "Enter Project Title first."));
+      return;
+    }
+
+    const pending = DIAGRAM_TYPES.filter((item) => diagramByKey[item.key]?.source !== "manual");
+    if (!pending.length) return;
+    setLoadingKey("all");
+    pending.forEach((item) => setMessage(item.key, "info", "Generating diagram..."));
+
+    try {
+      const response = await fetch(toApiUrl("/generate_diagrams/batch"), {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({
+          project_title: title,
+          diagram_types: pending.map((item) => item.label.replace(/^[A-I]\.\s+/, "")),
+        }),
+      });
+
+      const payload = await response.json();
+      const results = payload.diagrams || [];
+      if (!results.length) {
+        throw new Error(payload.error || "Diagram generation failed.");
+      }
+
+      await Promise.all(
+        pending.map(async (item, index) => {
+          const result = results[index];
+          try {
+            if (!result || result.status !== "success") {
+              throw new Error(result?.error || "Diagram generation failed.");
+            }
+            await applyGenerated(item.key, item.label, result.filename);
+          } catch (error) {
+            setMessage(item.key, "error", error.message || "Diagram generation failed.");
+          }
+        })
+      );
+    } catch (error) {
+      pending.forEach((item) => setMessage(item.key, "error", error.message || "Diagram generation failed."));
+    } finally {
+      setLoadingKey("");
+    }
+  };
+
   const handleGenerate = async (diagramKey, diagramLabel) => {
     const title = (projectTitle || "").trim();
     if (!title) {
@@ -88,24 +156,7 @@ export default function ProjectDiagramsManager({ projectTitle, diagrams, setDiag
         throw new Error(payload.error || "Diagram generation failed.");
       }
 
-      const filename = payload.filename;
-      const fileResponse = await fetch(toApiUrl(`/uploads/${encodeURIComponent(filename)}`));
-      if (!fileResponse.ok) {
-        throw new Error("Generated image could not be fetched.");
-      }
-      const blob = await fileResponse.blob();
-      const file = new File([blob], filename, { type: blob.type || "image/png" });
-
-      setAiFilenames((prev) => ({ ...prev, [diagramKey]: filename }));
-      updateDiagram(diagramKey, {
-        diagramKey,
-        name: diagramLabel.replace(/^[A-I]\.\s+/, ""),
-        file,
-        source: "ai",
-        aiFilename: filename,
-        previewUrl: toApiUrl(`/uploads/${encodeURIComponent(filename)}?t=${Date.now()}`),
-      });
-      setMessage(diagramKey, "success", "Diagram generated successfully.");
+      await applyGenerated(diagramKey, diagramLabel, payload.filename);
     } catch (error) {
       setMessage(diagramKey, "error", error.message || "Diagram generation failed.");
     } finally {
@@ -115,11 +166,22 @@ export default function ProjectDiagramsManager({ projectTitle, diagrams, setDiag
 
   return (
     <div className="space-y-3">
-      <h3 className="text-base font-bold text-slate-900">📊 Project Diagrams Manager</h3>
+      <div className="flex items-center justify-between gap-2">
+        <h3 className="text-base font-bold text-slate-900">📊 Project Diagrams Manager</h3>
+        <button
+          type="button"
+          disabled={Boolean(loadingKey)}
+          onClick={handleGenerateAll}
+          className="inline-flex items-center justify-center gap-2 rounded-lg border border-indigo-600 px-3 py-2 text-sm font-semibold text-indigo-600 disabled:opacity-60"
+        >
+          {loadingKey === "all" ? spinner() : null}
+          {loadingKey === "all" ? "Generating all..." : "Generate all with AI"}
+        </button>
+      </div>
       {DIAGRAM_TYPES.map((item) => {
         const data = diagramByKey[item.key];
         const msg = messages[item.key];
-        const isLoading = loadingKey === item.key;
+        const isLoading = loadingKey === item.key || (loadingKey === "all" && data?.source !== "manual");
         const inputId = `diagram-upload-${item.key}`;
         const previewSrc = data?.previewUrl || "";
 
@@ -48,6 +48,31 @@ export async function requestAIContent(projectTitle) {
   }
 }
 
+export function streamAIContent(projectTitle, onSection) {
+  if (typeof EventSource === "undefined") {
+    return requestAIContent(projectTitle);
+  }
+
+  return new Promise((resolve, reject) => {
+    const query = new URLSearchParams({ project_title: projectTitle });
+    const source = new EventSource(toApiUrl(`/api/generate-ai/stream?${query}`));
+
+    source.addEventListener("section", (event) => {
+      const section = JSON.parse(event.data);
+      onSection?.(section.key, section.content);
+    });
+    source.addEventListener("done", (event) => {
+      source.close();
+      resolve(JSON.parse(event.data).documentation || {});
+    });
+    source.addEventListener("error", (event) => {
+      source.close();
+      const payload = event.data ? JSON.parse(event.data) : {};
+      reject(new Error(payload.error || payload.message || "AI generation failed"));
+    });
+  });
+}
+
 export async function uploadFiles(formData) {
   try {
     const response = await api.post("/upload-files", formData, {